@@ -1,9 +1,13 @@
 import os
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 
+from .services.load_shedding import TimedQueuePool
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -21,16 +25,61 @@ DB_SCHEMA = os.getenv("DB_SCHEMA", "public")
 # Construct database URL
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"options": f"-csearch_path={DB_SCHEMA}"},
-    pool_pre_ping=True,
-    echo=os.getenv("SQL_ECHO", "false").lower() == "true"
-)
+# The engine is created on first use rather than at import, so importing the
+# app (workers, CLIs, tests) never loads the driver or touches the database
+_engine = None
+_engine_lock = threading.Lock()
+
+# Create a session factory; bound to the engine when the engine is created
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+def engine_options() -> dict:
+    """
+    Connection settings shared by every engine on the application database
+    """
+    return {
+        "connect_args": {"options": f"-csearch_path={DB_SCHEMA}"},
+        # Logs every statement; under load use the slow-query log instead
+        "echo": os.getenv("SQL_ECHO", "false").lower() == "true",
+    }
+
+def get_engine():
+    """
+    Return the SQLAlchemy engine, creating it on first call
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(
+                    DATABASE_URL,
+                    pool_pre_ping=True,
+                    # Records checkout waits for load shedding and db_pool_wait_seconds
+                    poolclass=TimedQueuePool,
+                    **engine_options()
+                )
+                SessionLocal.configure(bind=_engine)
+    return _engine
 
-# Create a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def create_unpooled_engine():
+    """
+    An engine on the application database, with the same connection
+    settings, whose connections are opened and closed on their own rather
+    than taken from the request pool
+    """
+    return create_engine(DATABASE_URL, poolclass=NullPool, **engine_options())
+
+def current_engine():
+    """
+    The engine if it has been created, without creating it
+    """
+    return _engine
+
+def __getattr__(name):
+    # Keeps `from app.db import engine` working for scripts
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Create a base class for declarative models
 Base = declarative_base()
@@ -41,16 +90,41 @@ def get_db():
     Dependency function to get a DB session that will be used in FastAPI endpoints.
     The session is closed automatically after the endpoint function returns.
     """
+    get_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
+# Dependency to get the session factory itself
+def get_session_factory():
+    """
+    Dependency for handlers that run several queries concurrently.
+    Each concurrent task must open (and close) its own session from this factory.
+    """
+    get_engine()
+    return SessionLocal
+
 # Function to initialize the database
 def init_db():
     """
     Initialize the database by creating all tables.
     Call this function once at application startup.
     """
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    Base.metadata.create_all(bind=get_engine())
+
+def check_db(db) -> None:
+    """
+    Round trip to the database; raises if it is unreachable
+    """
+    db.execute(text("SELECT 1"))
+
+def warm_pool(size: int):
+    """
+    Open `size` pooled connections up front so the first requests skip the handshake
+    """
+    engine = get_engine()
+    connections = [engine.connect() for _ in range(size)]
+    for connection in connections:
+        connection.close() 
\ No newline at end of file
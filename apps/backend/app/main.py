@@ -1,15 +1,123 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+import os
 
-from .routers import auth, users, employer_reviews, peer_reviews, points, realtime
-from .db import init_db
+from .routers import auth, users, employer_reviews, peer_reviews, points, realtime, analytics, admin, me, sync, health, metrics
+from .db import SessionLocal, create_unpooled_engine, current_engine, get_engine, init_db, warm_pool
+from .middleware.compression import CompressionMiddleware
+from .middleware.load_shedding import LoadSheddingMiddleware
+from .middleware.metrics import MetricsMiddleware
+from .middleware.profiler import ProfilerMiddleware
+from .middleware.query_budget import QueryBudgetMiddleware
+from .services import profiler, query_budget, slow_queries
+from .services.jwks import JWKS_REFRESH_SECONDS, JWKSFetchError
+from .services.load_shedding import start_loop_lag_probe
+from .services.rollups import reconcile_rollups
+from .services.scheduler import SCHEDULER_ENABLED, LeaderElection, Scheduler
+from .services.metrics import instrument_engines, pool_gauge
+from .services.search import search_users
 
-app = FastAPI(title="Performance Review API")
+logger = logging.getLogger(__name__)
 
-# Initialize database
-init_db()
+# Optional warm-up before taking traffic: pre-fill the pool and prime caches
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() == "true"
+STARTUP_WARM_POOL_SIZE = int(os.getenv("STARTUP_WARM_POOL_SIZE", "5"))
+ROLLUP_RECONCILE_INTERVAL = float(os.getenv("ROLLUP_RECONCILE_HOURS", "24")) * 3600
 
-# Configure CORS
+# Periodic work; leader_only jobs run in one worker per cluster
+scheduler = Scheduler(LeaderElection(get_engine, create_unpooled_engine))
+scheduler.add_job(
+    "likes_snapshot",
+    realtime.publish_likes_snapshot,
+    interval=realtime.LIKES_SNAPSHOT_INTERVAL,
+    timeout=10,
+    leader_only=True,
+)
+scheduler.add_job("likes_broadcast", realtime.broadcast_likes_snapshot, interval=realtime.LIKES_SNAPSHOT_INTERVAL, timeout=10)
+scheduler.add_job(
+    "rollup_reconciliation",
+    reconcile_rollups,
+    interval=ROLLUP_RECONCILE_INTERVAL,
+    timeout=600,
+    leader_only=True,
+)
+if auth.cognito_jwks is not None:
+    # Keeps Cognito token verification local; unknown key ids also trigger a refresh
+    scheduler.add_job("jwks_refresh", auth.cognito_jwks.refresh, interval=JWKS_REFRESH_SECONDS, timeout=30)
+
+def prepare_database() -> bool:
+    """
+    Create missing tables. A database that is down does not stop startup;
+    /readyz reports it and finishes the setup once the database is back.
+    """
+    try:
+        init_db()
+        return True
+    except SQLAlchemyError as e:
+        logger.warning("Database unavailable at startup, deferring schema setup: %s", e)
+        return False
+
+def warm_up():
+    warm_pool(STARTUP_WARM_POOL_SIZE)
+    db = SessionLocal()
+    try:
+        # Builds the in-process search index, or warms the trigram index on PostgreSQL
+        search_users(db, "a", 1, version=users.users_version(db))
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.schema_ready = await run_in_threadpool(prepare_database)
+    if auth.cognito_jwks is not None:
+        # Load the signing keys now; the refresh job first runs an interval later
+        try:
+            await run_in_threadpool(auth.cognito_jwks.refresh)
+        except JWKSFetchError:
+            logger.warning("Cognito signing keys unavailable at startup, retrying when a token needs them")
+    if STARTUP_WARMUP and app.state.schema_ready:
+        try:
+            await run_in_threadpool(warm_up)
+        except SQLAlchemyError as e:
+            logger.warning("Startup warm-up skipped: %s", e)
+    
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+    loop_lag_probe = start_loop_lag_probe()
+    yield
+    loop_lag_probe.cancel()
+    await scheduler.stop()
+
+app = FastAPI(title="Performance Review API", default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Compress large JSON bodies for mobile clients; WebSocket traffic is left alone
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=1024,
+    exclude_paths=["/realtime"],
+)
+
+# Sample single requests when an admin sends X-Profile: 1
+app.add_middleware(ProfilerMiddleware)
+profiler.install()
+
+# Count SQL statements per request and WebSocket; logs N+1 patterns and budget overruns
+app.add_middleware(QueryBudgetMiddleware)
+query_budget.install()
+
+# Refuse requests with 503 while the pool or event loop is saturated
+app.add_middleware(LoadSheddingMiddleware, exclude_paths=["/healthz", "/readyz", "/metrics"])
+
+# Record per-route latency and status codes; wraps compression so it is timed too
+app.add_middleware(MetricsMiddleware, exclude_paths=["/metrics"])
+
+# Configure CORS; added last so it is outermost and shed (503) responses
+# carry CORS headers too, letting browser clients read them
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # For production, replace with actual origins
@@ -18,6 +126,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Time every SQL statement; the pool gauge stays empty until the engine exists
+instrument_engines()
+pool_gauge(current_engine)
+
+# Keep statements slower than SLOW_QUERY_THRESHOLD_MS, with their plans, for /admin/slow-queries
+slow_queries.install()
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
@@ -25,6 +140,12 @@ app.include_router(employer_reviews.router, prefix="/reviews/employer", tags=["E
 app.include_router(peer_reviews.router, prefix="/reviews/peer", tags=["Peer Reviews"])
 app.include_router(points.router, prefix="/points", tags=["Points & Gamification"])
 app.include_router(realtime.router, prefix="/realtime", tags=["Real-time Updates"])
+app.include_router(analytics.router, prefix="/analytics/reviews", tags=["Review Analytics"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(me.router, prefix="/me", tags=["Me"])
+app.include_router(sync.router, prefix="/sync", tags=["Sync"])
+app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Health"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,190 @@
+"""
+Negotiated gzip/brotli response compression.
+
+Bodies below `minimum_size` and non-text content types are sent as-is. Routes
+opt out either through `exclude_paths` or by depending on `skip_compression`.
+Brotli is used when the optional `brotli` package is installed and the client
+prefers it; otherwise gzip.
+"""
+import zlib
+from typing import Optional, Sequence
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+class GzipCompressor:
+    encoding = "gzip"
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class BrotliCompressor:
+    encoding = "br"
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header, honouring q-values
+    """
+    preferences = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        preferences[coding] = quality
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    wildcard = preferences.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = preferences.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+async def skip_compression(request: Request):
+    """
+    Route dependency that sends the response uncompressed
+    """
+    request.state.skip_compression = True
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        exclude_paths: Sequence[str] = (),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+class CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send, encoding: str):
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.initial_message: Message = {}
+        self.compressor = None
+        self.passthrough = False
+        self.started = False
+
+    def _should_skip(self) -> bool:
+        headers = Headers(raw=self.initial_message["headers"])
+        if "content-encoding" in headers:
+            return True
+        if self.scope.get("state", {}).get("skip_compression"):
+            return True
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            # Hold the headers until the first body chunk decides the encoding
+            self.initial_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if self._should_skip() or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self.downstream(self.initial_message)
+                await self.downstream(message)
+                return
+
+            self.compressor = self.middleware.compressor(self.encoding)
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            # The compressed bytes are a different representation with their own validator
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body) + self.compressor.flush()
+            else:
+                message["body"] = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.downstream(self.initial_message)
+            await self.downstream(message)
+            return
+
+        # Later chunks of a streaming response
+        if more_body:
+            message["body"] = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            message["body"] = self.compressor.compress(body) + self.compressor.finish()
+        await self.downstream(message)
@@ -0,0 +1,44 @@
+"""
+Refuses new HTTP requests with 503 while the process is overloaded.
+
+See app.services.load_shedding for the signals. Health probes and metrics
+stay reachable so the overload remains observable.
+"""
+from typing import Sequence
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..services.load_shedding import overload_reason
+from ..services.metrics import REQUESTS_SHED
+
+RETRY_AFTER_SECONDS = 1
+
+class LoadSheddingMiddleware:
+    def __init__(self, app: ASGIApp, exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+        # Only touched on the event loop, so no lock is needed
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        reason = overload_reason(self.in_flight)
+        if reason is not None:
+            REQUESTS_SHED.inc(reason=reason)
+            response = JSONResponse(
+                {"detail": "Server overloaded, retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
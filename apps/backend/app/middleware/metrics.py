@@ -0,0 +1,62 @@
+"""
+Per-route HTTP latency and status metrics.
+
+Requests are labelled with the matched route template (`/users/{user_id}`),
+never the raw path, so label cardinality is bounded by the route table.
+Paths that match no route share the "unmatched" label.
+"""
+import time
+from typing import Dict, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+
+UNMATCHED_ROUTE = "unmatched"
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, exclude_paths: Sequence[str] = ()):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router records the matched endpoint on the shared scope
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status_code)
+
+# Route endpoint -> path template
+_templates: Dict[object, str] = {}
+
+def route_template(scope: Scope) -> str:
+    """
+    The path template of the route that handled `scope`, once routing has run
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    template = _templates.get(endpoint)
+    if template is None:
+        # Route tables are fixed after startup, so build the lookup once
+        for route in scope["app"].routes:
+            route_endpoint = getattr(route, "endpoint", None)
+            if route_endpoint is not None:
+                _templates.setdefault(route_endpoint, route.path)
+        template = _templates.get(endpoint, UNMATCHED_ROUTE)
+    return template
@@ -0,0 +1,49 @@
+"""
+Profiles single requests on demand for admins.
+
+See app.services.profiler for how sampling is started and what is recorded.
+"""
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..services.profiler import RequestProfile, profile_store, request_profile, reset_requested_profile
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "profile"
+TRUE_VALUES = ("1", "true", "yes")
+
+def profiling_requested(scope: Scope) -> bool:
+    if Headers(scope=scope).get(PROFILE_HEADER, "").lower() in TRUE_VALUES:
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(value.lower() in TRUE_VALUES for value in query.get(PROFILE_QUERY_PARAM, []))
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+
+        async def send_wrapper(message: Message):
+            # The handler and serialization are done once the response starts
+            if message["type"] == "http.response.start" and profile.running:
+                profile.stop()
+                profile_store.add(profile)
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Id"] = profile.id
+                headers["Server-Timing"] = profile.server_timing()
+            await send(message)
+
+        token = request_profile(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_requested_profile(token)
+            profile.stop()
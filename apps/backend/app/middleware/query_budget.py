@@ -0,0 +1,28 @@
+"""
+Tracks the SQL statements of each HTTP request and WebSocket connection.
+
+See app.services.query_budget for what is reported and enforced.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from ..services.query_budget import start_tracking, stop_tracking
+from .metrics import route_template
+
+class QueryBudgetMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        tracker, token = start_tracking(scope["path"])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stop_tracking(token)
+
+        # Routing has run by now: label by template and apply the route's budget
+        tracker.label = f"{scope.get('method', 'WS')} {route_template(scope)}"
+        tracker.report(getattr(scope.get("endpoint"), "query_budget", None))
@@ -1,11 +1,10 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, Text
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Boolean, Text, Index
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 import uuid
 
-Base = declarative_base()
+from ..db import Base
 
 class PeerReview(Base):
     __tablename__ = "peer_reviews"
@@ -22,6 +21,23 @@ class PeerReview(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Serves the duplicate-review check and the swipe deck anti-join
+        Index("ix_peer_reviews_reviewer_employee", "reviewer_id", "employee_id"),
+        # Serve delta sync range scans, per employee and org-wide
+        Index("ix_peer_reviews_employee_updated", "employee_id", "updated_at"),
+        Index("ix_peer_reviews_updated", "updated_at"),
+        # Serves the paged inbox and its unread count
+        Index("ix_peer_reviews_employee_created", "employee_id", "created_at"),
+    )
+
+# Where each user last caught up on their peer-review inbox
+class PeerReviewInboxState(Base):
+    __tablename__ = "peer_review_inbox_state"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    last_read_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
 # Pydantic models
 class PeerReviewBase(BaseModel):
     liked: bool = False
@@ -37,7 +53,7 @@ class PeerReviewUpdate(BaseModel):
 
 class PeerReviewInDB(PeerReviewBase):
     id: str
-    reviewer_id: str
+    reviewer_id: Optional[str] = None  # Hidden for anonymous reviews
     employee_id: str
     created_at: datetime
     updated_at: datetime
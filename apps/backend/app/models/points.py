@@ -1,12 +1,11 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional, List
 import uuid
 
-Base = declarative_base()
+from ..db import Base
 
 class Badge(Base):
     __tablename__ = "badges"
@@ -34,7 +33,31 @@ class PointsTransaction(Base):
     amount = Column(Integer, nullable=False)  # 可以是正数（获得）或负数（使用）
     action = Column(String, nullable=False)  # 例如："peer_review", "badge_award"
     description = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # Serves per-user balances, action breakdowns and paged history
+        Index("ix_points_transactions_user_created", "user_id", "created_at"),
+    )
+
+# Columns that make up BadgeInDB and PointsTransactionInDB, for column-projected queries
+BADGE_OUT_COLUMNS = (
+    Badge.id,
+    Badge.name,
+    Badge.description,
+    Badge.image_url,
+    Badge.points_required,
+    Badge.created_at,
+)
+
+TRANSACTION_OUT_COLUMNS = (
+    PointsTransaction.id,
+    PointsTransaction.user_id,
+    PointsTransaction.amount,
+    PointsTransaction.action,
+    PointsTransaction.description,
+    PointsTransaction.created_at,
+)
 
 # Pydantic models
 class BadgeBase(BaseModel):
@@ -1,11 +1,21 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Float, Text
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Float, Text, Index
 from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional
 import uuid
 
-Base = declarative_base()
+from ..db import Base
+
+# The seven score columns shared by EmployerReview, its schemas and analytics
+SCORE_FIELDS = (
+    "performance_score",
+    "communication_score",
+    "teamwork_score",
+    "innovation_score",
+    "leadership_score",
+    "technical_score",
+    "reliability_score",
+)
 
 class EmployerReview(Base):
     __tablename__ = "employer_reviews"
@@ -29,6 +39,63 @@ class EmployerReview(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Serves per-employee and per-period analytics
+        Index("ix_employer_reviews_employee_period", "employee_id", "review_period"),
+        Index("ix_employer_reviews_period", "review_period"),
+        # Serves the per-employee ETag version marker
+        Index("ix_employer_reviews_employee_updated", "employee_id", "updated_at"),
+        # Serves org-wide delta sync for managers
+        Index("ix_employer_reviews_updated", "updated_at"),
+    )
+
+# Columns that make up ReviewInDB, for column-projected queries
+REVIEW_OUT_COLUMNS = (
+    EmployerReview.id,
+    EmployerReview.employee_id,
+    EmployerReview.reviewer_id,
+    *[getattr(EmployerReview, field) for field in SCORE_FIELDS],
+    EmployerReview.comments,
+    EmployerReview.review_period,
+    EmployerReview.created_at,
+    EmployerReview.updated_at,
+)
+
+class EmployerReviewRollup(Base):
+    """
+    Running count, sum and sum of squares per score for one (employee, period).
+    Kept in step with employer_reviews by app.services.rollups.
+    """
+    __tablename__ = "employer_review_rollups"
+    
+    employee_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    review_period = Column(String, primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    
+    performance_score_count = Column(Integer, nullable=False, default=0)
+    performance_score_sum = Column(Float, nullable=False, default=0)
+    performance_score_sumsq = Column(Float, nullable=False, default=0)
+    communication_score_count = Column(Integer, nullable=False, default=0)
+    communication_score_sum = Column(Float, nullable=False, default=0)
+    communication_score_sumsq = Column(Float, nullable=False, default=0)
+    teamwork_score_count = Column(Integer, nullable=False, default=0)
+    teamwork_score_sum = Column(Float, nullable=False, default=0)
+    teamwork_score_sumsq = Column(Float, nullable=False, default=0)
+    innovation_score_count = Column(Integer, nullable=False, default=0)
+    innovation_score_sum = Column(Float, nullable=False, default=0)
+    innovation_score_sumsq = Column(Float, nullable=False, default=0)
+    leadership_score_count = Column(Integer, nullable=False, default=0)
+    leadership_score_sum = Column(Float, nullable=False, default=0)
+    leadership_score_sumsq = Column(Float, nullable=False, default=0)
+    technical_score_count = Column(Integer, nullable=False, default=0)
+    technical_score_sum = Column(Float, nullable=False, default=0)
+    technical_score_sumsq = Column(Float, nullable=False, default=0)
+    reliability_score_count = Column(Integer, nullable=False, default=0)
+    reliability_score_sum = Column(Float, nullable=False, default=0)
+    reliability_score_sumsq = Column(Float, nullable=False, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # Pydantic models
 class ReviewBase(BaseModel):
     performance_score: float = Field(..., ge=1, le=5)
@@ -1,5 +1,4 @@
 from sqlalchemy import Column, String, Boolean, DateTime, Enum, Integer
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 import enum
 import uuid
@@ -7,7 +6,7 @@ from datetime import datetime
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 
-Base = declarative_base()
+from ..db import Base
 
 class UserRole(str, enum.Enum):
     ADMIN = "admin"
@@ -23,7 +22,18 @@ class User(Base):
     role = Column(String, default=UserRole.EMPLOYEE)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+# Columns that make up UserOut, for column-projected queries
+USER_OUT_COLUMNS = (
+    User.id,
+    User.email,
+    User.full_name,
+    User.role,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+)
     
 # Pydantic models for validation
 class UserBase(BaseModel):
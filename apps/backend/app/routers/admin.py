@@ -0,0 +1,181 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from datetime import datetime
+from enum import Enum
+import csv
+import io
+import json
+
+from ..db import get_db
+from ..models.user import User
+from ..models.review import EmployerReview, SCORE_FIELDS
+from ..models.peer_review import PeerReview
+from ..models.points import PointsTransaction
+from ..services.profiler import profile_store
+from ..services.serialization import fast_response
+from ..services.slow_queries import slow_query_log
+from .auth import require_admin
+from .peer_reviews import visible_reviewer_id
+
+router = APIRouter()
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def stream_export(db: Session, statement, export_format: ExportFormat):
+    """
+    Yield the rows of `statement` as NDJSON lines or CSV, one batch at a time.
+    stream_results keeps the rows in a server-side cursor, so memory stays flat.
+    """
+    result = db.execute(
+        statement.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+    columns = list(result.keys())
+
+    # A client disconnect or error mid-stream closes the generator early;
+    # the server-side cursor must still be released right away
+    try:
+        if export_format == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for rows in result.partitions():
+                writer.writerows(
+                    [value.isoformat() if isinstance(value, datetime) else value for value in row]
+                    for row in rows
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            # Header only, when the table is empty
+            if buffer.getvalue():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+                    for row in rows
+                )
+    finally:
+        result.close()
+
+def export_response(db: Session, statement, export_format: ExportFormat, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(db, statement, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/exports/employer-reviews")
+async def export_employer_reviews(
+    format: ExportFormat = ExportFormat.NDJSON,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Stream the full employer review history
+    """
+    statement = select(
+        EmployerReview.id,
+        EmployerReview.employee_id,
+        EmployerReview.reviewer_id,
+        *[getattr(EmployerReview, field) for field in SCORE_FIELDS],
+        EmployerReview.comments,
+        EmployerReview.review_period,
+        EmployerReview.created_at,
+        EmployerReview.updated_at
+    ).order_by(EmployerReview.created_at, EmployerReview.id)
+    return export_response(db, statement, format, "employer-reviews")
+
+@router.get("/exports/peer-reviews")
+async def export_peer_reviews(
+    format: ExportFormat = ExportFormat.NDJSON,
+    reveal_anonymous: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Stream the full peer review history.
+    Anonymous reviewers are masked as for a regular employee unless reveal_anonymous is set.
+    """
+    viewer_role = current_user.role if reveal_anonymous else None
+    statement = select(
+        PeerReview.id,
+        visible_reviewer_id(viewer_role).label("reviewer_id"),
+        PeerReview.employee_id,
+        PeerReview.liked,
+        PeerReview.is_anonymous,
+        PeerReview.comments,
+        PeerReview.created_at,
+        PeerReview.updated_at
+    ).order_by(PeerReview.created_at, PeerReview.id)
+    return export_response(db, statement, format, "peer-reviews")
+
+@router.get("/exports/points-transactions")
+async def export_points_transactions(
+    format: ExportFormat = ExportFormat.NDJSON,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Stream the full points transaction history
+    """
+    statement = select(
+        PointsTransaction.id,
+        PointsTransaction.user_id,
+        PointsTransaction.amount,
+        PointsTransaction.action,
+        PointsTransaction.description,
+        PointsTransaction.created_at
+    ).order_by(PointsTransaction.created_at, PointsTransaction.id)
+    return export_response(db, statement, format, "points-transactions")
+
+@router.get("/profiles")
+async def list_profiles(current_user: User = Depends(require_admin)):
+    """
+    Recently profiled requests (sent with X-Profile: 1), newest first
+    """
+    return fast_response([profile.summary() for profile in profile_store.list()])
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, current_user: User = Depends(require_admin)):
+    """
+    A profiled request as a speedscope file; open it at https://www.speedscope.app
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return fast_response(
+        profile.speedscope(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'}
+    )
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Recent statements slower than SLOW_QUERY_THRESHOLD_MS with their plans, newest first
+    """
+    return fast_response({
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "entries": slow_query_log.entries(limit),
+    })
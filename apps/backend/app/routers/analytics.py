@@ -0,0 +1,227 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+import numpy as np
+import warnings
+
+from ..db import get_db
+from ..models.user import User
+from ..models.review import EmployerReview, EmployerReviewRollup, SCORE_FIELDS
+from ..services.rollups import rollup_stats
+from .auth import get_current_active_user
+
+router = APIRouter()
+
+PERCENTILES = (25, 50, 75, 90)
+SCORE_BUCKETS = (1, 2, 3, 4, 5)
+
+class ScoreStats(BaseModel):
+    mean: Optional[float] = None
+    percentiles: Dict[str, Optional[float]] = {}
+    distribution: Dict[str, int] = {}
+
+class ReviewStats(BaseModel):
+    review_count: int
+    scores: Dict[str, ScoreStats]
+
+class PeriodStats(BaseModel):
+    review_period: str
+    review_count: int
+    means: Dict[str, Optional[float]]
+    variances: Dict[str, Optional[float]] = {}
+    deltas: Dict[str, Optional[float]]
+
+class DimensionStats(BaseModel):
+    count: int
+    mean: Optional[float] = None
+    variance: Optional[float] = None
+
+class PeriodRollupStats(BaseModel):
+    employee_id: str
+    review_period: str
+    review_count: int
+    scores: Dict[str, DimensionStats]
+
+class EmployeeReviewStats(BaseModel):
+    employee_id: str
+    overall: ReviewStats
+    periods: List[PeriodStats]
+
+def require_manager(current_user: User = Depends(get_current_active_user)):
+    """
+    Dependency that only lets managers and admins through
+    """
+    if current_user.role not in ["manager", "admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized to view review analytics")
+    return current_user
+
+def _round(value) -> Optional[float]:
+    if value is None or np.isnan(value):
+        return None
+    return round(float(value), 4)
+
+def fetch_score_matrix(db: Session, *filters) -> np.ndarray:
+    """
+    Fetch the score columns as an (n_reviews, 7) float matrix, missing scores as NaN
+    """
+    columns = [getattr(EmployerReview, field) for field in SCORE_FIELDS]
+    rows = db.query(*columns).filter(*filters).all()
+    return np.array(rows, dtype=float).reshape(-1, len(SCORE_FIELDS))
+
+def summarize_scores(scores: np.ndarray) -> ReviewStats:
+    """
+    Means, percentiles and 1-5 distributions for every score column at once
+    """
+    if scores.shape[0] == 0:
+        return ReviewStats(
+            review_count=0,
+            scores={field: ScoreStats() for field in SCORE_FIELDS}
+        )
+
+    # Columns that are entirely NaN simply come back as NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        means = np.nanmean(scores, axis=0)
+        percentiles = np.nanpercentile(scores, PERCENTILES, axis=0)
+
+    # Round each score to its nearest whole point, halves up (np.rint rounds halves to even)
+    buckets = np.floor(np.nan_to_num(scores, nan=0) + 0.5).astype(int)
+    counts = np.stack([(buckets == bucket).sum(axis=0) for bucket in SCORE_BUCKETS])
+
+    result = {}
+    for i, field in enumerate(SCORE_FIELDS):
+        result[field] = ScoreStats(
+            mean=_round(means[i]),
+            percentiles={f"p{p}": _round(percentiles[j, i]) for j, p in enumerate(PERCENTILES)},
+            distribution={str(bucket): int(counts[k, i]) for k, bucket in enumerate(SCORE_BUCKETS)}
+        )
+
+    return ReviewStats(review_count=int(scores.shape[0]), scores=result)
+
+def period_means(db: Session, *filters) -> List[PeriodStats]:
+    """
+    Per-period means and variances summed from the rollup rows (one per
+    employee and period), with deltas against the previous period
+    """
+    aggregates = []
+    for field in SCORE_FIELDS:
+        aggregates += [
+            func.sum(getattr(EmployerReviewRollup, f"{field}_count")),
+            func.sum(getattr(EmployerReviewRollup, f"{field}_sum")),
+            func.sum(getattr(EmployerReviewRollup, f"{field}_sumsq")),
+        ]
+    rows = db.query(
+        EmployerReviewRollup.review_period,
+        func.sum(EmployerReviewRollup.review_count),
+        *aggregates
+    ).filter(
+        *filters
+    ).group_by(
+        EmployerReviewRollup.review_period
+    ).order_by(
+        EmployerReviewRollup.review_period
+    ).all()
+
+    result = []
+    previous = None
+    for period, count, *sums in rows:
+        means, variances = {}, {}
+        for i, field in enumerate(SCORE_FIELDS):
+            scored, total, total_sq = sums[3 * i:3 * i + 3]
+            if not scored:
+                means[field] = variances[field] = None
+                continue
+            mean = total / scored
+            means[field] = _round(mean)
+            variances[field] = _round(max(total_sq / scored - mean * mean, 0.0))
+        deltas = {
+            field: _round(means[field] - previous[field])
+            if previous and means[field] is not None and previous[field] is not None else None
+            for field in SCORE_FIELDS
+        }
+        result.append(PeriodStats(
+            review_period=period,
+            review_count=count,
+            means=means,
+            variances=variances,
+            deltas=deltas
+        ))
+        previous = means
+
+    return result
+
+@router.get("/org", response_model=ReviewStats)
+async def get_org_review_stats(
+    period: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_manager)
+):
+    """
+    Get organisation-wide score statistics, optionally for one review period
+    """
+    filters = [EmployerReview.review_period == period] if period else []
+    return summarize_scores(fetch_score_matrix(db, *filters))
+
+@router.get("/periods", response_model=List[PeriodStats])
+async def get_period_review_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_manager)
+):
+    """
+    Get organisation-wide means per review period with period-over-period deltas
+    """
+    return period_means(db)
+
+@router.get("/employees/{employee_id}", response_model=EmployeeReviewStats)
+async def get_employee_review_stats(
+    employee_id: str,
+    period: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get score statistics for one employee, overall and per review period
+    """
+    # Check if current user is the employee or has manager/admin role
+    if current_user.id != employee_id and current_user.role not in ["manager", "admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized to view these reviews")
+
+    overall_filters = [EmployerReview.employee_id == employee_id]
+    if period:
+        overall_filters.append(EmployerReview.review_period == period)
+
+    return EmployeeReviewStats(
+        employee_id=employee_id,
+        overall=summarize_scores(fetch_score_matrix(db, *overall_filters)),
+        periods=period_means(db, EmployerReviewRollup.employee_id == employee_id)
+    )
+
+@router.get("/employees/{employee_id}/periods/{period}", response_model=PeriodRollupStats)
+async def get_employee_period_stats(
+    employee_id: str,
+    period: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get one employee's mean and variance per score for a period from its rollup row
+    """
+    # Check if current user is the employee or has manager/admin role
+    if current_user.id != employee_id and current_user.role not in ["manager", "admin"]:
+        raise HTTPException(status_code=403, detail="Not authorized to view these reviews")
+
+    rollup = db.query(EmployerReviewRollup).filter(
+        EmployerReviewRollup.employee_id == employee_id,
+        EmployerReviewRollup.review_period == period
+    ).first()
+    if not rollup:
+        raise HTTPException(status_code=404, detail="No reviews for this period")
+
+    return PeriodRollupStats(
+        employee_id=employee_id,
+        review_period=period,
+        review_count=rollup.review_count,
+        scores=rollup_stats(rollup)
+    )
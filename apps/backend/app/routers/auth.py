@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 from typing import Optional
+import hashlib
 import os
-import boto3
+import threading
 import jwt
 from datetime import datetime, timedelta
-from botocore.exceptions import ClientError
 
 from ..db import get_db
 from ..models.user import User, UserOut
+from ..services.jwks import JWKSVerifier, cognito_username
+from ..services.metrics import COGNITO_CALL_DURATION
+from ..services.profiler import start_requested_profile
+from ..services.rate_limit import (
+    LOGIN_PER_IP, LOGIN_PER_USERNAME, REFRESH_PER_IP, REFRESH_PER_TOKEN,
+    REVIEW_CREATE_PER_IP, REVIEW_CREATE_PER_USER, client_ip
+)
 
 router = APIRouter()
 
@@ -25,8 +33,54 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Cognito client
-cognito_client = boto3.client('cognito-idp', region_name=REGION)
+# Verifies Cognito-issued tokens locally against the pool's cached JWKS
+cognito_jwks = (
+    JWKSVerifier(f"https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}", CLIENT_ID)
+    if USER_POOL_ID else None
+)
+
+# Cognito client, created on first use; tests patch this attribute
+cognito_client = None
+_cognito_lock = threading.Lock()
+
+def get_cognito_client():
+    """
+    Return the Cognito client, building it on first call.
+    boto3 is imported here because loading it dominates import time.
+    """
+    global cognito_client
+    if cognito_client is None:
+        with _cognito_lock:
+            if cognito_client is None:
+                import boto3
+                cognito_client = boto3.client('cognito-idp', region_name=REGION)
+    return cognito_client
+
+class CognitoError(Exception):
+    """A Cognito call rejected by the service, with its error code"""
+    
+    def __init__(self, code: Optional[str]):
+        super().__init__(code)
+        self.code = code
+
+def initiate_auth(auth_flow: str, parameters: dict):
+    """
+    Call Cognito InitiateAuth, recording its latency per auth flow.
+    Service errors are raised as CognitoError.
+    """
+    # Imported with boto3 rather than at module load, see get_cognito_client
+    from botocore.exceptions import ClientError
+    
+    client = get_cognito_client()
+    try:
+        with COGNITO_CALL_DURATION.time(operation=auth_flow):
+            return client.initiate_auth(
+                ClientId=CLIENT_ID,
+                AuthFlow=auth_flow,
+                AuthParameters=parameters
+            )
+    except ClientError as e:
+        raise CognitoError(e.response.get('Error', {}).get('Code')) from e
 
 # OAuth2 setup
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
@@ -60,20 +114,15 @@ def authenticate_user(username: str, password: str):
     Authenticate a user against AWS Cognito
     """
     try:
-        response = cognito_client.initiate_auth(
-            ClientId=CLIENT_ID,
-            AuthFlow='USER_PASSWORD_AUTH',
-            AuthParameters={
-                'USERNAME': username,
-                'PASSWORD': password,
-            }
-        )
+        response = initiate_auth('USER_PASSWORD_AUTH', {
+            'USERNAME': username,
+            'PASSWORD': password,
+        })
         return response
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code')
-        if error_code == 'NotAuthorizedException':
+    except CognitoError as e:
+        if e.code == 'NotAuthorizedException':
             return None
-        raise e
+        raise
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
@@ -88,7 +137,29 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def token_subject(token: str) -> Optional[str]:
+    """
+    The login name a valid token belongs to, checked without touching the
+    database. Raises jwt.PyJWTError for an invalid token.
+    """
+    # Cognito ID and access tokens are verified against the cached key set
+    if cognito_jwks is not None and jwt.get_unverified_header(token).get("alg") == "RS256":
+        # An unknown key id refetches the key set, which must not block the loop
+        return cognito_username(await run_in_threadpool(cognito_jwks.verify, token))
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+
+async def current_subject(token: str = Depends(oauth2_scheme)) -> Optional[str]:
+    """
+    Dependency returning the bearer token's subject, or None for an invalid
+    token. FastAPI resolves it once per request, so the rate limiter and
+    get_current_user share a single verification.
+    """
+    try:
+        return await token_subject(token)
+    except jwt.PyJWTError:
+        return None
+
+async def get_current_user(subject: Optional[str] = Depends(current_subject), db: Session = Depends(get_db)):
     """
     Dependency that returns the current user from a JWT token
     """
@@ -98,14 +169,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username, sub=username)
-    except jwt.PyJWTError:
+    if subject is None:
         raise credentials_exception
+    token_data = TokenData(username=subject, sub=subject)
     
     # Find the user in the database
     user = db.query(User).filter(User.email == token_data.username).first()
@@ -119,9 +185,42 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     """
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    # Admins can ask for this request to be profiled with X-Profile: 1
+    start_requested_profile(current_user)
+    return current_user
+
+async def require_admin(current_user: User = Depends(get_current_active_user)):
+    """
+    Dependency that ensures the user is an admin
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
-@router.post("/login", response_model=Token)
+async def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    """
+    Rate limit login attempts per client IP and per username before Cognito is called
+    """
+    LOGIN_PER_IP.check(client_ip(request))
+    LOGIN_PER_USERNAME.check(form_data.username.lower())
+
+async def limit_refresh(request: Request, refresh_token: str):
+    """
+    Rate limit token refreshes per client IP and per refresh token
+    """
+    REFRESH_PER_IP.check(client_ip(request))
+    REFRESH_PER_TOKEN.check(hashlib.sha256(refresh_token.encode()).hexdigest())
+
+async def limit_review_creation(request: Request, subject: Optional[str] = Depends(current_subject)):
+    """
+    Rate limit review submissions per client IP and per user, before the
+    user is loaded. An invalid token is left for get_current_user to reject.
+    """
+    REVIEW_CREATE_PER_IP.check(client_ip(request))
+    if subject is not None:
+        REVIEW_CREATE_PER_USER.check(subject)
+
+@router.post("/login", response_model=Token, dependencies=[Depends(limit_login)])
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     """
     Login endpoint that authenticates with AWS Cognito and returns JWT token
@@ -163,28 +262,32 @@ async def read_users_me(current_user: User = Depends(get_current_active_user)):
     """
     return current_user
 
-@router.post("/refresh", response_model=Token)
+@router.post("/refresh", response_model=Token, dependencies=[Depends(limit_refresh)])
 async def refresh_token(refresh_token: str):
     """
     Refresh the access token using a refresh token
     """
     try:
-        response = cognito_client.initiate_auth(
-            ClientId=CLIENT_ID,
-            AuthFlow='REFRESH_TOKEN_AUTH',
-            AuthParameters={
-                'REFRESH_TOKEN': refresh_token,
-            }
-        )
+        response = initiate_auth('REFRESH_TOKEN_AUTH', {
+            'REFRESH_TOKEN': refresh_token,
+        })
         
         auth_result = response.get('AuthenticationResult', {})
         id_token = auth_result.get('IdToken')
         access_token = auth_result.get('AccessToken')
         expires_in = auth_result.get('ExpiresIn', ACCESS_TOKEN_EXPIRE_MINUTES * 60)
         
-        # Decode the ID token to get the username/email
-        decoded_id_token = jwt.decode(id_token, options={"verify_signature": False})
-        username = decoded_id_token.get('email', decoded_id_token.get('cognito:username'))
+        # Verify the ID token before trusting the username/email in it
+        if cognito_jwks is None:
+            raise HTTPException(status_code=500, detail="Cognito user pool is not configured")
+        try:
+            username = cognito_username(await run_in_threadpool(cognito_jwks.verify, id_token))
+        except jwt.PyJWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid ID token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
         
         # Create our own JWT
         token_data = {"sub": username}
@@ -199,7 +302,7 @@ async def refresh_token(refresh_token: str):
             "expires_in": expires_in,
             "id_token": id_token
         }
-    except ClientError as e:
+    except CognitoError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
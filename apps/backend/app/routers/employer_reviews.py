@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import func
+from typing import List, Optional
 
 from ..db import get_db
 from ..models.user import User
-from ..models.review import EmployerReview, ReviewCreate, ReviewInDB
-from .auth import get_current_active_user
+from ..models.review import EmployerReview, ReviewCreate, ReviewInDB, REVIEW_OUT_COLUMNS
+from ..services.cache import response_cache, visibility_class
+from ..services.etag import make_etag, not_modified_response
+from ..services.serialization import FIELDS_QUERY, rows_to_dicts, select_fields
+from ..services.rollups import apply_review
+from .auth import get_current_active_user, limit_review_creation
 
 router = APIRouter()
 
-@router.post("", response_model=ReviewInDB)
+@router.post("", response_model=ReviewInDB, dependencies=[Depends(limit_review_creation)])
 async def create_employer_review(
     review: ReviewCreate,
     db: Session = Depends(get_db),
@@ -39,21 +44,31 @@ async def create_employer_review(
     )
     
     db.add(db_review)
+    
+    # Keep the (employee, period) rollup in the same transaction
+    apply_review(db, db_review)
+    
     db.commit()
     db.refresh(db_review)
+    
+    response_cache.invalidate(f"employer_reviews:{review.employee_id}")
     return db_review
 
 @router.get("/{user_id}", response_model=List[ReviewInDB])
 async def get_user_reviews(
     user_id: str,
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get all reviews for a specific employee
     """
+    columns = select_fields(fields, REVIEW_OUT_COLUMNS)
+    
     # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User.id).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -61,5 +76,25 @@ async def get_user_reviews(
     if current_user.id != user_id and current_user.role not in ["manager", "admin"]:
         raise HTTPException(status_code=403, detail="Not authorized to view these reviews")
     
-    reviews = db.query(EmployerReview).filter(EmployerReview.employee_id == user_id).all()
-    return reviews 
\ No newline at end of file
+    # Version marker served by ix_employer_reviews_employee_updated
+    count, last_updated = db.query(
+        func.count(EmployerReview.id),
+        func.max(EmployerReview.updated_at)
+    ).filter(EmployerReview.employee_id == user_id).one()
+    field_names = [column.key for column in columns]
+    etag = make_etag("employer_reviews", user_id, field_names, count, last_updated)
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    
+    cache_key = response_cache.key(
+        "employer_reviews",
+        {"user_id": user_id, "fields": field_names},
+        visibility_class(current_user)
+    )
+    response = response_cache.get(cache_key)
+    if response is None:
+        reviews = db.query(*columns).filter(EmployerReview.employee_id == user_id).all()
+        response = response_cache.store(cache_key, rows_to_dicts(reviews), tags=[f"employer_reviews:{user_id}"])
+    response.headers["ETag"] = etag
+    return response 
\ No newline at end of file
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+import logging
+
+from ..db import Base, check_db, get_db
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+@router.get("/healthz")
+async def healthz():
+    """
+    Liveness: the process is up and serving requests. Never touches dependencies.
+    """
+    return {"status": "ok"}
+
+# Plain def so a hanging database blocks a threadpool worker, not the event loop
+@router.get("/readyz")
+def readyz(request: Request, db: Session = Depends(get_db)):
+    """
+    Readiness: the database answers and the schema has been initialized.
+    Finishes schema setup that was skipped because the database was down at startup.
+    """
+    checks = {"database": "ok", "schema": "ok"}
+    try:
+        check_db(db)
+    except SQLAlchemyError as e:
+        logger.warning("Readiness check failed: %s", e)
+        checks["database"] = "unavailable"
+    
+    if not getattr(request.app.state, "schema_ready", False):
+        checks["schema"] = "pending"
+        if checks["database"] == "ok":
+            try:
+                Base.metadata.create_all(bind=db.get_bind())
+                request.app.state.schema_ready = True
+                checks["schema"] = "ok"
+            except SQLAlchemyError as e:
+                logger.warning("Schema initialization failed: %s", e)
+    
+    ready = all(value == "ok" for value in checks.values())
+    return ORJSONResponse(
+        {"status": "ready" if ready else "unavailable", "checks": checks},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
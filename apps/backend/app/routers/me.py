@@ -0,0 +1,133 @@
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Any, Callable, Dict, List, Optional
+from pydantic import BaseModel
+import asyncio
+import logging
+import os
+
+from ..db import get_session_factory
+from ..models.user import User, UserOut
+from ..models.review import EmployerReview, REVIEW_OUT_COLUMNS
+from ..models.peer_review import PeerReview
+from ..services.query_budget import query_budget
+from ..services.serialization import fast_response, rows_to_dicts
+from .auth import get_current_active_user
+from .peer_reviews import peer_review_columns
+from .points import get_points_breakdown, get_user_badges
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# Each section gets this long before the dashboard is returned without it
+SECTION_TIMEOUT_SECONDS = float(os.getenv("DASHBOARD_SECTION_TIMEOUT", "1.0"))
+# Per-section overrides of SECTION_TIMEOUT_SECONDS
+SECTION_TIMEOUTS: Dict[str, float] = {}
+LATEST_REVIEWS = 5
+
+class Dashboard(BaseModel):
+    profile: UserOut
+    points: Optional[Dict[str, Any]] = None
+    badges: Optional[List[Dict[str, Any]]] = None
+    like_count: Optional[int] = None
+    latest_peer_reviews: Optional[List[Dict[str, Any]]] = None
+    latest_employer_reviews: Optional[List[Dict[str, Any]]] = None
+    partial: bool = False
+    errors: Dict[str, str] = {}
+
+def points_section(db: Session, user_id: str, role: str) -> dict:
+    breakdown = get_points_breakdown(db, user_id)
+    return {
+        "total_points": sum(entry["total"] for entry in breakdown),
+        "breakdown": breakdown
+    }
+
+def badges_section(db: Session, user_id: str, role: str) -> list:
+    return get_user_badges(db, user_id)
+
+def like_count_section(db: Session, user_id: str, role: str) -> int:
+    return db.query(PeerReview.id).filter(
+        PeerReview.employee_id == user_id,
+        PeerReview.liked == True
+    ).count()
+
+def latest_peer_reviews_section(db: Session, user_id: str, role: str) -> list:
+    reviews = db.query(*peer_review_columns(role)).filter(
+        PeerReview.employee_id == user_id
+    ).order_by(
+        PeerReview.created_at.desc()
+    ).limit(LATEST_REVIEWS).all()
+    return rows_to_dicts(reviews)
+
+def latest_employer_reviews_section(db: Session, user_id: str, role: str) -> list:
+    reviews = db.query(*REVIEW_OUT_COLUMNS).filter(
+        EmployerReview.employee_id == user_id
+    ).order_by(
+        EmployerReview.created_at.desc()
+    ).limit(LATEST_REVIEWS).all()
+    return rows_to_dicts(reviews)
+
+SECTIONS: Dict[str, Callable[[Session, str, str], Any]] = {
+    "points": points_section,
+    "badges": badges_section,
+    "like_count": like_count_section,
+    "latest_peer_reviews": latest_peer_reviews_section,
+    "latest_employer_reviews": latest_employer_reviews_section,
+}
+
+async def run_section(session_factory: sessionmaker, section: Callable, user_id: str, role: str, timeout: float):
+    """
+    Run one section on its own session in the threadpool, bounded by `timeout`.
+    The timeout only stops waiting: a section that overruns keeps its thread
+    and session until its query returns, then releases both.
+    """
+    def work():
+        db = session_factory()
+        try:
+            return section(db, user_id, role)
+        finally:
+            db.close()
+
+    return await asyncio.wait_for(run_in_threadpool(work), timeout)
+
+@router.get("/dashboard", response_model=Dashboard)
+@query_budget(6)
+async def get_dashboard(
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get everything the home screen needs in one call.
+    Sections are fetched concurrently; any that fail or run past their timeout
+    are left null, listed in `errors`, and the response is marked `partial`.
+    """
+    names = list(SECTIONS)
+    results = await asyncio.gather(
+        *[
+            run_section(
+                session_factory,
+                SECTIONS[name],
+                current_user.id,
+                current_user.role,
+                SECTION_TIMEOUTS.get(name, SECTION_TIMEOUT_SECONDS)
+            )
+            for name in names
+        ],
+        return_exceptions=True
+    )
+
+    dashboard = {"profile": UserOut.from_orm(current_user).dict(), "errors": {}}
+    dashboard.update((name, None) for name in names)
+    for name, result in zip(names, results):
+        if isinstance(result, asyncio.TimeoutError):
+            dashboard["errors"][name] = "timeout"
+        elif isinstance(result, Exception):
+            logger.warning("Dashboard section %s failed: %r", name, result)
+            dashboard["errors"][name] = "error"
+        else:
+            dashboard[name] = result
+    dashboard["partial"] = bool(dashboard["errors"])
+
+    return fast_response(dashboard)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from ..services.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,18 +1,164 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, case, null
+from datetime import datetime
+from typing import List, Optional, Set
+from collections import OrderedDict
+from pydantic import BaseModel
 import asyncio
+import time
 
 from ..db import get_db
-from ..models.user import User
-from ..models.peer_review import PeerReview, PeerReviewCreate, PeerReviewInDB
+from ..models.user import User, UserOut
+from ..models.peer_review import PeerReview, PeerReviewCreate, PeerReviewInDB, PeerReviewInboxState
 from ..models.points import PointsTransaction
-from .auth import get_current_active_user
+from ..services.cache import response_cache, visibility_class
+from ..services.pagination import before_cursor, next_cursor
+from ..services.query_budget import query_budget
+from ..services.serialization import FIELDS_QUERY, fast_response, rows_to_dicts, select_fields
+from .auth import get_current_active_user, limit_review_creation
 from .realtime import broadcast_like_update
 
 router = APIRouter()
 
-@router.post("", response_model=PeerReviewInDB)
+# Roles allowed to see who wrote an anonymous review
+PRIVILEGED_ROLES = ["admin", "manager"]
+
+def can_see_anonymous_reviewers(role: Optional[str]) -> bool:
+    return role in PRIVILEGED_ROLES
+
+def visible_reviewer_id(role: Optional[str]):
+    """
+    SQL expression for PeerReview.reviewer_id as seen by a viewer with `role`:
+    NULL for anonymous reviews unless the viewer is privileged
+    """
+    if can_see_anonymous_reviewers(role):
+        return PeerReview.reviewer_id
+    return case((PeerReview.is_anonymous == True, null()), else_=PeerReview.reviewer_id)
+
+def peer_review_columns(role: Optional[str]) -> tuple:
+    """
+    Columns that make up PeerReviewInDB, with reviewer_id masked for `role`
+    """
+    return (
+        PeerReview.id,
+        visible_reviewer_id(role).label("reviewer_id"),
+        PeerReview.employee_id,
+        PeerReview.liked,
+        PeerReview.is_anonymous,
+        PeerReview.comments,
+        PeerReview.created_at,
+        PeerReview.updated_at
+    )
+
+class InboxUnread(BaseModel):
+    unread: int
+    last_read_at: Optional[datetime] = None
+
+INBOX_DEFAULT_PAGE_SIZE = 50
+INBOX_MAX_PAGE_SIZE = 200
+
+# Swipe deck configuration
+DECK_DEFAULT_SIZE = 20
+DECK_MAX_SIZE = 100
+DECK_FETCH_SIZE = 50  # Colleagues fetched per anti-join round trip
+DECK_TTL_SECONDS = 600
+
+class _Deck:
+    """Buffered colleagues for one reviewer plus the keyset cursor of the last fetch"""
+    def __init__(self, expires_at: float):
+        self.entries: "OrderedDict[str, UserOut]" = OrderedDict()
+        self.cursor: Optional[str] = None
+        self.exhausted = False
+        self.expires_at = expires_at
+
+# Per-user cache of colleagues the user has not reviewed yet. Decks are per
+# process, so a card another worker's swipe or a deactivation made stale is
+# only dropped when `next` re-checks the cards it is about to serve.
+class DeckCache:
+    def __init__(self, ttl: int = DECK_TTL_SECONDS, max_decks: int = 10000):
+        self.ttl = ttl
+        self.max_decks = max_decks
+        self._decks: "OrderedDict[str, _Deck]" = OrderedDict()
+
+    def _get(self, user_id: str) -> _Deck:
+        """Return the live deck for a user, starting a new one if missing or expired"""
+        deck = self._decks.get(user_id)
+        now = time.monotonic()
+        if deck is None or deck.expires_at <= now:
+            deck = _Deck(expires_at=now + self.ttl)
+            self._decks[user_id] = deck
+            while len(self._decks) > self.max_decks:
+                self._decks.popitem(last=False)
+        self._decks.move_to_end(user_id)
+        return deck
+
+    def next(self, db: Session, user_id: str, limit: int) -> List[UserOut]:
+        """Return the next `limit` unreviewed colleagues, topping the deck up from the DB"""
+        deck = self._get(user_id)
+        fetch_size = max(limit, DECK_FETCH_SIZE)
+        while True:
+            while len(deck.entries) < limit and not deck.exhausted:
+                batch = fetch_unreviewed_colleagues(db, user_id, deck.cursor, fetch_size)
+                for user in batch:
+                    deck.entries[user.id] = UserOut.from_orm(user)
+                if batch:
+                    deck.cursor = batch[-1].id
+                if len(batch) < fetch_size:
+                    deck.exhausted = True
+            cards = list(deck.entries)[:limit]
+            if not cards:
+                return []
+            # Cached cards may have been reviewed or deactivated through another worker
+            stale = set(cards) - still_unreviewed(db, user_id, cards)
+            if not stale:
+                return [deck.entries[card] for card in cards]
+            for card in stale:
+                deck.entries.pop(card, None)
+
+    def discard(self, user_id: str, employee_id: str):
+        """Drop a colleague from a user's deck once they have been swiped"""
+        deck = self._decks.get(user_id)
+        if deck is not None:
+            deck.entries.pop(employee_id, None)
+
+    def invalidate(self, user_id: str):
+        """Forget a user's deck entirely"""
+        self._decks.pop(user_id, None)
+
+    def clear(self):
+        """Forget every cached deck"""
+        self._decks.clear()
+
+deck_cache = DeckCache()
+
+def unreviewed_colleagues_filter(db: Session, user_id: str) -> tuple:
+    """
+    Criteria for active colleagues the user has not reviewed. The NOT EXISTS
+    is planned as an anti-join on ix_peer_reviews_reviewer_employee.
+    """
+    already_reviewed = db.query(PeerReview.id).filter(
+        PeerReview.reviewer_id == user_id,
+        PeerReview.employee_id == User.id
+    ).exists()
+    return (User.is_active == True, User.id != user_id, ~already_reviewed)
+
+def fetch_unreviewed_colleagues(db: Session, user_id: str, cursor: Optional[str], limit: int) -> List[User]:
+    """
+    Active colleagues the user has not reviewed, in id order after `cursor`.
+    """
+    query = db.query(User).filter(*unreviewed_colleagues_filter(db, user_id))
+    if cursor is not None:
+        query = query.filter(User.id > cursor)
+
+    return query.order_by(User.id).limit(limit).all()
+
+def still_unreviewed(db: Session, user_id: str, employee_ids: List[str]) -> Set[str]:
+    """Which of `employee_ids` are still active and not yet reviewed by the user"""
+    rows = db.query(User.id).filter(User.id.in_(employee_ids), *unreviewed_colleagues_filter(db, user_id))
+    return {row.id for row in rows}
+
+@router.post("", response_model=PeerReviewInDB, dependencies=[Depends(limit_review_creation)])
 async def create_peer_review(
     review: PeerReviewCreate,
     db: Session = Depends(get_db),
@@ -72,25 +218,128 @@ async def create_peer_review(
     db.commit()
     db.refresh(db_review)
     
+    # The swiped colleague leaves the reviewer's deck
+    deck_cache.discard(current_user.id, review.employee_id)
+    
+    response_cache.invalidate(
+        f"peer_reviews:{review.employee_id}",
+        f"points:{current_user.id}",
+        f"points:{review.employee_id}"
+    )
+    
     # Broadcast the like update via WebSocket
     # We use asyncio.create_task to avoid blocking the API response
     asyncio.create_task(broadcast_like_update(review.employee_id, review.liked))
     
     return db_review
 
+@router.get("/deck", response_model=List[UserOut])
+async def get_review_deck(
+    limit: int = Query(DECK_DEFAULT_SIZE, ge=1, le=DECK_MAX_SIZE),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get the next colleagues the current user has not reviewed yet
+    """
+    return deck_cache.next(db, current_user.id, limit)
+
 @router.get("/me", response_model=List[PeerReviewInDB])
+@query_budget(2)
 async def get_my_peer_reviews(
+    limit: int = Query(INBOX_DEFAULT_PAGE_SIZE, ge=1, le=INBOX_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    liked: Optional[bool] = None,
+    commented: Optional[bool] = None,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get all peer reviews for the current user
+    Get a page of peer reviews for the current user, newest first.
+    When more remain, the X-Next-Cursor header holds the cursor for the next page.
     """
-    reviews = db.query(PeerReview).filter(PeerReview.employee_id == current_user.id).all()
+    columns = select_fields(
+        fields,
+        peer_review_columns(current_user.role),
+        always=("id", "created_at")
+    )
+    cache_key = response_cache.key(
+        "peer_reviews_me",
+        {
+            "user_id": current_user.id,
+            "limit": limit,
+            "cursor": cursor,
+            "liked": liked,
+            "commented": commented,
+            "fields": [column.key for column in columns]
+        },
+        visibility_class(current_user)
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Anonymous reviewers are masked in SQL, so rows never need touching here
+    query = db.query(*columns).filter(PeerReview.employee_id == current_user.id)
+    if liked is not None:
+        query = query.filter(PeerReview.liked == liked)
+    if commented is True:
+        query = query.filter(and_(PeerReview.comments.isnot(None), PeerReview.comments != ""))
+    elif commented is False:
+        query = query.filter((PeerReview.comments == None) | (PeerReview.comments == ""))
+    after = before_cursor(PeerReview.created_at, PeerReview.id, cursor)
+    if after is not None:
+        query = query.filter(after)
+    
+    rows = query.order_by(
+        PeerReview.created_at.desc(),
+        PeerReview.id.desc()
+    ).limit(limit + 1).all()
     
-    # If review is anonymous, remove reviewer_id (except for admin/manager)
-    for review in reviews:
-        if review.is_anonymous and current_user.role not in ["admin", "manager"]:
-            review.reviewer_id = None
+    cursor_after = next_cursor(rows, limit)
+    return response_cache.store(
+        cache_key,
+        rows_to_dicts(rows[:limit]),
+        tags=[f"peer_reviews:{current_user.id}"],
+        headers={"X-Next-Cursor": cursor_after} if cursor_after else None
+    )
+
+@router.get("/me/unread", response_model=InboxUnread)
+@query_budget(3)
+async def get_my_unread_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Count peer reviews received since the current user last marked the inbox read
+    """
+    last_read_at = db.query(PeerReviewInboxState.last_read_at).filter(
+        PeerReviewInboxState.user_id == current_user.id
+    ).scalar()
+    
+    # Index range count on ix_peer_reviews_employee_created
+    query = db.query(PeerReview.id).filter(PeerReview.employee_id == current_user.id)
+    if last_read_at is not None:
+        query = query.filter(PeerReview.created_at > last_read_at)
+    
+    return fast_response({"unread": query.count(), "last_read_at": last_read_at})
+
+@router.post("/me/read", response_model=InboxUnread)
+async def mark_my_peer_reviews_read(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Mark every peer review received so far as read
+    """
+    state = db.query(PeerReviewInboxState).filter(
+        PeerReviewInboxState.user_id == current_user.id
+    ).first()
+    if state is None:
+        state = PeerReviewInboxState(user_id=current_user.id)
+        db.add(state)
+    state.last_read_at = datetime.utcnow()
+    db.commit()
     
-    return reviews 
\ No newline at end of file
+    return fast_response({"unread": 0, "last_read_at": state.last_read_at})
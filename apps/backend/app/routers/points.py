@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
-from typing import List, Dict
+from datetime import datetime
+from typing import List, Dict, Optional
 from pydantic import BaseModel
 
 from ..db import get_db
-from ..models.user import User, UserOut
-from ..models.points import PointsTransaction, PointsTransactionInDB, Badge, UserBadge, BadgeInDB
+from ..models.user import User, UserOut, USER_OUT_COLUMNS
+from ..models.points import PointsTransaction, PointsTransactionInDB, Badge, UserBadge, BadgeInDB, BADGE_OUT_COLUMNS, TRANSACTION_OUT_COLUMNS
+from ..services.cache import response_cache, visibility_class
+from ..services.etag import make_etag, not_modified_response
+from ..services.pagination import before_cursor, next_cursor
+from ..services.query_budget import query_budget
+from ..services.serialization import FIELDS_QUERY, fast_response, row_to_dict, rows_to_dicts, select_fields
 from .auth import get_current_active_user
 
 router = APIRouter()
@@ -26,8 +32,72 @@ class UserPointsDetail(BaseModel):
     badges: List[BadgeInDB]
     transactions: List[PointsTransactionInDB]
 
+class ActionBreakdown(BaseModel):
+    action: str
+    count: int
+    total: int
+
+class UserPointsSummary(BaseModel):
+    user: UserOut
+    total_points: int
+    badges: List[BadgeInDB]
+    breakdown: List[ActionBreakdown]
+
+class PointsTransactionPage(BaseModel):
+    items: List[PointsTransactionInDB]
+    next_cursor: Optional[str] = None
+
+HISTORY_DEFAULT_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+def get_user_badges(db: Session, user_id: str):
+    return rows_to_dicts(db.query(*BADGE_OUT_COLUMNS).join(
+        UserBadge, 
+        Badge.id == UserBadge.badge_id
+    ).filter(
+        UserBadge.user_id == user_id
+    ).all())
+
+def build_points_summary(db: Session, user_id: str) -> Optional[dict]:
+    """
+    Balance, badges and a per-action breakdown for a user, or None if the user doesn't exist.
+    The breakdown is one GROUP BY over ix_points_transactions_user_created, so the
+    cost doesn't grow with the shape of the history.
+    """
+    user = db.query(*USER_OUT_COLUMNS).filter(User.id == user_id).first()
+    if not user:
+        return None
+    
+    breakdown = get_points_breakdown(db, user_id)
+    
+    return {
+        "user": row_to_dict(user),
+        "total_points": sum(entry["total"] for entry in breakdown),
+        "badges": get_user_badges(db, user_id),
+        "breakdown": breakdown
+    }
+
+def get_points_breakdown(db: Session, user_id: str) -> List[dict]:
+    """
+    Count and total points per action for a user
+    """
+    breakdown = db.query(
+        PointsTransaction.action,
+        func.count(PointsTransaction.id).label("count"),
+        func.sum(PointsTransaction.amount).label("total")
+    ).filter(
+        PointsTransaction.user_id == user_id
+    ).group_by(
+        PointsTransaction.action
+    ).order_by(
+        PointsTransaction.action
+    ).all()
+    return rows_to_dicts(breakdown)
+
 @router.get("/leaderboard", response_model=List[LeaderboardEntry])
+@query_budget(4)
 async def get_leaderboard(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
     limit: int = 10
@@ -35,9 +105,21 @@ async def get_leaderboard(
     """
     Get the points leaderboard
     """
+    # Count and total catch deleted or corrected transactions, which leave the newest one alone
+    transactions = db.query(
+        func.count(PointsTransaction.id),
+        func.coalesce(func.sum(PointsTransaction.amount), 0),
+        func.max(PointsTransaction.created_at)
+    ).one()
+    user_version = db.query(func.count(User.id), func.max(User.updated_at)).one()
+    etag = make_etag("leaderboard", limit, tuple(transactions), tuple(user_version))
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    
     # Get sum of points for each user
     points_by_user = db.query(
-        User, 
+        *USER_OUT_COLUMNS, 
         func.sum(PointsTransaction.amount).label("total_points")
     ).join(
         PointsTransaction, 
@@ -50,26 +132,99 @@ async def get_leaderboard(
     
     # Format results with rank
     result = []
-    for rank, (user, points) in enumerate(points_by_user, 1):
-        result.append(LeaderboardEntry(
-            rank=rank,
-            user=user,
-            points=points
-        ))
+    for rank, row in enumerate(rows_to_dicts(points_by_user), 1):
+        points = row.pop("total_points")
+        result.append({
+            "rank": rank,
+            "user": row,
+            "points": points
+        })
     
-    return result
+    return fast_response(result, headers={"ETag": etag})
 
-@router.get("/{user_id}", response_model=UserPointsDetail)
+@router.get("/{user_id}/summary", response_model=UserPointsSummary)
+@query_budget(5)
+async def get_user_points_summary(
+    user_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get a user's balance, badges and points per action
+    """
+    cache_key = response_cache.key("points_summary", {"user_id": user_id}, visibility_class(current_user))
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    summary = build_points_summary(db, user_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return response_cache.store(cache_key, summary, tags=[f"points:{user_id}"])
+
+@router.get("/{user_id}/transactions", response_model=PointsTransactionPage)
+@query_budget(3)
+async def get_user_transactions(
+    user_id: str,
+    limit: int = Query(HISTORY_DEFAULT_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get a page of a user's point transactions, newest first.
+    Pass the returned next_cursor to fetch the following page.
+    """
+    columns = select_fields(fields, TRANSACTION_OUT_COLUMNS, always=("id", "created_at"))
+    
+    if not db.query(User.id).filter(User.id == user_id).first():
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    query = db.query(*columns).filter(PointsTransaction.user_id == user_id)
+    if since:
+        query = query.filter(PointsTransaction.created_at >= since)
+    if until:
+        query = query.filter(PointsTransaction.created_at < until)
+    after = before_cursor(PointsTransaction.created_at, PointsTransaction.id, cursor)
+    if after is not None:
+        query = query.filter(after)
+    
+    rows = query.order_by(
+        PointsTransaction.created_at.desc(),
+        PointsTransaction.id.desc()
+    ).limit(limit + 1).all()
+    
+    return fast_response({
+        "items": rows_to_dicts(rows[:limit]),
+        "next_cursor": next_cursor(rows, limit)
+    })
+
+@router.get("/{user_id}", response_model=UserPointsDetail, deprecated=True)
 async def get_user_points(
     user_id: str,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get a user's points and badges
+    Get a user's points, badges and full transaction history.
+    `fields` trims the transaction entries. Prefer /summary and the paged /transactions.
     """
+    columns = select_fields(fields, TRANSACTION_OUT_COLUMNS)
+    cache_key = response_cache.key(
+        "points",
+        {"user_id": user_id, "fields": [column.key for column in columns]},
+        visibility_class(current_user)
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     # Check if user exists
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(*USER_OUT_COLUMNS).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -81,23 +236,18 @@ async def get_user_points(
     ).scalar() or 0
     
     # Get user's badges
-    badges = db.query(Badge).join(
-        UserBadge, 
-        Badge.id == UserBadge.badge_id
-    ).filter(
-        UserBadge.user_id == user_id
-    ).all()
+    badges = get_user_badges(db, user_id)
     
     # Get user's point transactions
-    transactions = db.query(PointsTransaction).filter(
+    transactions = db.query(*columns).filter(
         PointsTransaction.user_id == user_id
     ).order_by(
         PointsTransaction.created_at.desc()
     ).all()
     
-    return UserPointsDetail(
-        user=user,
-        total_points=total_points,
-        badges=badges,
-        transactions=transactions
-    ) 
\ No newline at end of file
+    return response_cache.store(cache_key, {
+        "user": row_to_dict(user),
+        "total_points": total_points,
+        "badges": badges,
+        "transactions": rows_to_dicts(transactions)
+    }, tags=[f"points:{user_id}"]) 
\ No newline at end of file
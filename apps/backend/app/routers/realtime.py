@@ -1,16 +1,34 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy import and_, func
 from typing import Dict, List, Set
 import json
 import asyncio
+import logging
+import os
 from datetime import datetime
 
-from ..db import get_db
+from ..db import get_db, get_session_factory
 from ..models.user import User
 from ..models.peer_review import PeerReview
+from ..services.cache import response_cache
+from ..services.query_budget import query_budget, track_queries
+from ..services.metrics import (
+    WEBSOCKET_BROADCAST_DURATION,
+    WEBSOCKET_BROADCASTS_IN_FLIGHT,
+    WEBSOCKET_CONNECTED_USERS,
+    WEBSOCKET_CONNECTIONS,
+)
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+LIKES_SNAPSHOT_INTERVAL = float(os.getenv("LIKES_SNAPSHOT_SECONDS", "30"))
+# Shared through the response cache backend, so every worker sees the leader's snapshot
+LIKES_SNAPSHOT_KEY = "realtime:likes_snapshot"
+
 # Connection manager to keep track of active websocket connections
 class ConnectionManager:
     def __init__(self):
@@ -51,8 +69,13 @@ class ConnectionManager:
     
     async def broadcast(self, message: dict):
         """Broadcast a message to all connected clients"""
-        for connection in self.all_connections:
-            await connection.send_text(json.dumps(message))
+        WEBSOCKET_BROADCASTS_IN_FLIGHT.inc()
+        try:
+            with WEBSOCKET_BROADCAST_DURATION.time(type=message.get("type", "unknown")):
+                for connection in self.all_connections:
+                    await connection.send_text(json.dumps(message))
+        finally:
+            WEBSOCKET_BROADCASTS_IN_FLIGHT.dec()
     
     async def broadcast_to_user(self, user_id: str, message: dict):
         """Broadcast a message to all connections of a specific user"""
@@ -63,22 +86,31 @@ class ConnectionManager:
 # Create a single instance of the connection manager
 manager = ConnectionManager()
 
-# Endpoint to get the total like counts from the database
-async def get_likes_count(db: Session) -> Dict[str, int]:
+# Read on every /metrics scrape
+WEBSOCKET_CONNECTIONS.set_function(lambda: len(manager.all_connections))
+WEBSOCKET_CONNECTED_USERS.set_function(lambda: len(manager.connected_users))
+
+def count_likes(db: Session) -> Dict[str, int]:
     """Get the total likes count for all users"""
-    users = db.query(User).filter(User.is_active == True).all()
-    result = {}
+    # One grouped query; the outer join keeps active users without likes at 0
+    rows = db.query(
+        User.id,
+        func.count(PeerReview.id)
+    ).outerjoin(
+        PeerReview,
+        and_(PeerReview.employee_id == User.id, PeerReview.liked == True)
+    ).filter(
+        User.is_active == True
+    ).group_by(User.id).all()
     
-    for user in users:
-        like_count = db.query(PeerReview).filter(
-            PeerReview.employee_id == user.id,
-            PeerReview.liked == True
-        ).count()
-        result[user.id] = like_count
-    
-    return result
+    return {user_id: like_count for user_id, like_count in rows}
+
+# Endpoint to get the total like counts from the database
+async def get_likes_count(db: Session) -> Dict[str, int]:
+    return count_likes(db)
 
 @router.websocket("/likes")
+@query_budget(1)
 async def websocket_likes(websocket: WebSocket, db: Session = Depends(get_db)):
     """
     WebSocket endpoint for real-time like updates
@@ -131,34 +163,36 @@ async def broadcast_like_update(employee_id: str, liked: bool):
         }
     })
 
-# Background task to periodically update connected clients
-@router.on_event("startup")
-async def start_periodic_updates():
+def load_likes_snapshot() -> Dict[str, int]:
+    db = get_session_factory()()
+    try:
+        with track_queries("likes snapshot", budget=1):
+            return count_likes(db)
+    finally:
+        db.close()
+
+def publish_likes_snapshot():
     """
-    Start a background task that periodically updates all connected clients
-    with the latest like counts
+    Scheduled on the leader only: count likes once for the whole cluster
     """
-    async def periodic_update():
-        while True:
-            try:
-                # Wait for 30 seconds between updates
-                await asyncio.sleep(30)
-                
-                # Skip if no connections
-                if not manager.all_connections:
-                    continue
-                
-                # Get latest counts and broadcast
-                async with next(get_db()) as db:
-                    likes_count = await get_likes_count(db)
-                    await manager.broadcast({
-                        "type": "periodic_update",
-                        "data": likes_count,
-                        "timestamp": datetime.now().isoformat(),
-                        "active_users": len(manager.connected_users)
-                    })
-            except Exception as e:
-                print(f"Error in periodic update: {e}")
-    
-    # Start the background task
-    asyncio.create_task(periodic_update()) 
\ No newline at end of file
+    snapshot = json.dumps(load_likes_snapshot()).encode()
+    response_cache.backend.set(LIKES_SNAPSHOT_KEY, snapshot, ttl=LIKES_SNAPSHOT_INTERVAL * 3, tags=())
+
+async def broadcast_likes_snapshot():
+    """
+    Scheduled in every worker: send the latest snapshot to this worker's connections
+    """
+    if not manager.all_connections:
+        return
+    snapshot = response_cache.backend.get(LIKES_SNAPSHOT_KEY)
+    if snapshot is not None:
+        likes_count = json.loads(snapshot)
+    else:
+        # No leader snapshot yet, or workers do not share a cache backend
+        likes_count = await run_in_threadpool(load_likes_snapshot)
+    await manager.broadcast({
+        "type": "periodic_update",
+        "data": likes_count,
+        "timestamp": datetime.now().isoformat(),
+        "active_users": len(manager.connected_users)
+    })
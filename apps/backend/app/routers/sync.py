@@ -0,0 +1,156 @@
+"""
+Delta sync for offline-capable clients.
+
+A sync token is an opaque high-water mark. Each call returns only rows whose
+`updated_at` (or `created_at` for append-only tables) is at or after the
+token, read with indexed range scans, so reconnect cost tracks the volume of
+change rather than the size of each list. Tokens are backdated by a small
+overlap to absorb commits that were in flight while the previous sync ran;
+clients upsert by `id`, so a repeated row is harmless.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+import base64
+import os
+
+from ..db import get_db
+from ..models.user import User, USER_OUT_COLUMNS
+from ..models.review import EmployerReview, REVIEW_OUT_COLUMNS
+from ..models.peer_review import PeerReview
+from ..models.points import PointsTransaction, TRANSACTION_OUT_COLUMNS
+from ..services.query_budget import query_budget
+from ..services.serialization import fast_response, rows_to_dicts
+from .auth import get_current_active_user
+from .peer_reviews import peer_review_columns
+
+router = APIRouter()
+
+# Tokens older than this get a full resync instead of a delta
+SYNC_MAX_AGE = timedelta(days=int(os.getenv("SYNC_MAX_AGE_DAYS", "30")))
+# A delta larger than this per collection is cheaper to replace wholesale
+SYNC_MAX_CHANGES = int(os.getenv("SYNC_MAX_CHANGES", "5000"))
+SYNC_OVERLAP = timedelta(seconds=5)
+
+class UserChanges(BaseModel):
+    created: List[Dict[str, Any]] = []
+    updated: List[Dict[str, Any]] = []
+    deactivated: List[str] = []
+
+class SyncResponse(BaseModel):
+    token: str
+    full_resync: bool
+    users: UserChanges
+    employer_reviews: List[Dict[str, Any]] = []
+    peer_reviews: List[Dict[str, Any]] = []
+    points_transactions: List[Dict[str, Any]] = []
+
+class DeltaTooLarge(Exception):
+    pass
+
+def encode_sync_token(moment: datetime) -> str:
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode().rstrip("=")
+
+def decode_sync_token(token: str) -> datetime:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        moment = datetime.fromisoformat(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+    # Timestamps are stored as naive UTC; an offset-aware token is converted to match
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+def fetch_changes(query, limit: int = None) -> list:
+    """
+    Run a delta query, giving up once it returns more than `limit` rows
+    """
+    limit = limit or SYNC_MAX_CHANGES
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        raise DeltaTooLarge()
+    return rows_to_dicts(rows)
+
+def user_changes(db: Session, since: datetime) -> dict:
+    rows = fetch_changes(
+        db.query(*USER_OUT_COLUMNS).filter(User.updated_at >= since).order_by(User.updated_at)
+    )
+    changes = {"created": [], "updated": [], "deactivated": []}
+    for row in rows:
+        if not row["is_active"]:
+            changes["deactivated"].append(row["id"])
+        elif row["created_at"] >= since:
+            changes["created"].append(row)
+        else:
+            changes["updated"].append(row)
+    return changes
+
+# Reviews sync for the user they are about, whatever the role, as on the
+# list endpoints; managers read other employees' reviews through those
+def employer_review_changes(db: Session, since: datetime, current_user: User) -> list:
+    return fetch_changes(
+        db.query(*REVIEW_OUT_COLUMNS).filter(
+            EmployerReview.employee_id == current_user.id,
+            EmployerReview.updated_at >= since
+        ).order_by(EmployerReview.updated_at)
+    )
+
+def peer_review_changes(db: Session, since: datetime, current_user: User) -> list:
+    return fetch_changes(
+        db.query(*peer_review_columns(current_user.role)).filter(
+            PeerReview.employee_id == current_user.id,
+            PeerReview.updated_at >= since
+        ).order_by(PeerReview.updated_at)
+    )
+
+def transaction_changes(db: Session, since: datetime, current_user: User) -> list:
+    # Transactions are append-only, so created_at is their change marker
+    return fetch_changes(
+        db.query(*TRANSACTION_OUT_COLUMNS).filter(
+            PointsTransaction.user_id == current_user.id,
+            PointsTransaction.created_at >= since
+        ).order_by(PointsTransaction.created_at)
+    )
+
+def full_resync(token: str) -> dict:
+    return {"token": token, "full_resync": True, "users": UserChanges().dict()}
+
+@router.get("", response_model=SyncResponse)
+@query_budget(5)
+async def sync(
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit on first launch"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Changes visible to the current user since `since`.
+
+    When `full_resync` is true the client should reload its lists from the
+    regular endpoints and keep the returned token for the next sync.
+    """
+    # Stamp the next token before reading so nothing committed meanwhile is lost
+    now = datetime.utcnow()
+    token = encode_sync_token(now - SYNC_OVERLAP)
+
+    if since is None:
+        return fast_response(full_resync(token))
+
+    since_at = decode_sync_token(since)
+    if since_at < now - SYNC_MAX_AGE:
+        return fast_response(full_resync(token))
+
+    try:
+        content = {
+            "token": token,
+            "full_resync": False,
+            "users": user_changes(db, since_at),
+            "employer_reviews": employer_review_changes(db, since_at, current_user),
+            "peer_reviews": peer_review_changes(db, since_at, current_user),
+            "points_transactions": transaction_changes(db, since_at, current_user),
+        }
+    except DeltaTooLarge:
+        return fast_response(full_resync(token))
+    return fast_response(content)
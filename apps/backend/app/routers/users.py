@@ -1,34 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import func
+from typing import Dict, List, Optional
+from pydantic import BaseModel
 
 from ..db import get_db
-from ..models.user import User, UserOut
+from ..models.user import User, UserOut, USER_OUT_COLUMNS
+from ..services.etag import make_etag, not_modified_response
+from ..services.query_budget import query_budget
+from ..services.search import search_users
+from ..services.serialization import FIELDS_QUERY, fast_response, row_to_dict, rows_to_dicts, select_fields
 from .auth import get_current_active_user
 
 router = APIRouter()
 
+# Largest number of distinct ids resolved by one lookup
+MAX_LOOKUP_IDS = 500
+
+class UserLookupRequest(BaseModel):
+    ids: List[str]
+
+class UserLookupResult(BaseModel):
+    users: Dict[str, UserOut]
+    missing: List[str]
+
+class UserSearchResult(BaseModel):
+    id: str
+    full_name: str
+    email: str
+    score: float
+
+def dedupe_ids(ids: List[str]) -> List[str]:
+    """
+    Drop blanks and repeats, keeping first-seen order, and enforce the batch cap
+    """
+    unique = list(dict.fromkeys(user_id.strip() for user_id in ids if user_id.strip()))
+    if len(unique) > MAX_LOOKUP_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many ids: {len(unique)} requested, at most {MAX_LOOKUP_IDS} allowed"
+        )
+    return unique
+
+def lookup_users(db: Session, ids: List[str], columns) -> List[dict]:
+    """
+    Resolve active users by id with a single IN query
+    """
+    if not ids:
+        return []
+    return rows_to_dicts(db.query(*columns).filter(User.id.in_(ids), User.is_active == True).all())
+
+def users_version(db: Session) -> tuple:
+    """
+    Version marker for the users table. The row count catches deletes and the
+    newest updated_at (served by its index) catches inserts and edits.
+    """
+    return tuple(db.query(func.count(User.id), func.max(User.updated_at)).one())
+
 @router.get("", response_model=List[UserOut])
+@query_budget(3)
 async def get_all_users(
+    request: Request,
+    ids: Optional[str] = Query(None, description="Comma-separated user ids to resolve instead of listing everyone"),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get all users, or only the users named in `ids`
+    """
+    columns = select_fields(fields, USER_OUT_COLUMNS)
+    user_ids = dedupe_ids(ids.split(",")) if ids is not None else None
+    etag = make_etag("users", [column.key for column in columns], user_ids, users_version(db))
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    
+    if user_ids is not None:
+        return fast_response(lookup_users(db, user_ids, columns), headers={"ETag": etag})
+    
+    users = db.query(*columns).filter(User.is_active == True).all()
+    return fast_response(rows_to_dicts(users), headers={"ETag": etag})
+
+@router.post("/lookup", response_model=UserLookupResult)
+async def lookup_users_by_id(
+    lookup: UserLookupRequest,
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Resolve many user ids at once into a map of id to user
+    """
+    columns = select_fields(fields, USER_OUT_COLUMNS)
+    user_ids = dedupe_ids(lookup.ids)
+    users = {user["id"]: user for user in lookup_users(db, user_ids, columns)}
+    return fast_response({
+        "users": users,
+        "missing": [user_id for user_id in user_ids if user_id not in users]
+    })
+
+@router.get("/search", response_model=List[UserSearchResult])
+@query_budget(4)
+async def search_users_by_name(
+    q: str = Query(..., min_length=1, max_length=100, description="Name or email fragment"),
+    limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get all users
+    Search active users by name or email, best matches first
     """
-    users = db.query(User).filter(User.is_active == True).all()
-    return users
+    return fast_response(search_users(db, q, limit, version=users_version(db)))
 
 @router.get("/{user_id}", response_model=UserOut)
+@query_budget(2)
 async def get_user(
     user_id: str,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
     Get a specific user by ID
     """
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    columns = select_fields(fields, USER_OUT_COLUMNS)
+    user = db.query(*columns).filter(User.id == user_id, User.is_active == True).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user 
\ No newline at end of file
+    return fast_response(row_to_dict(user)) 
\ No newline at end of file
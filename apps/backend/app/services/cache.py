@@ -0,0 +1,189 @@
+"""
+Per-user HTTP response cache with tag-based invalidation.
+
+Entries are encoded JSON bodies keyed by route, parameters and the caller's
+visibility class, since role and anonymity change what a response contains.
+Write handlers invalidate by tag (for example "points:<user_id>").
+
+The default backend is a bounded in-process LRU with TTL. Set
+RESPONSE_CACHE_BACKEND=redis to share entries and invalidations across
+workers through REDIS_DB_URL.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+DEFAULT_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+# Prefixes entries that carry response headers ahead of the body
+HEADERS_MARKER = b"\x00"
+
+class CacheBackend:
+    """Storage interface for ResponseCache"""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str]):
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+class MemoryBackend(CacheBackend):
+    """Bounded in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str]):
+        tags = tuple(tags)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class RedisBackend(CacheBackend):
+    """Shared backend: entries as expiring strings, tags as sets of keys"""
+
+    def __init__(self, url: str, prefix: str = "respcache:"):
+        import redis  # Optional dependency, only needed for the shared backend
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str]):
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, value, px=int(ttl * 1000))
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            pipe.sadd(tag_key, key)
+            pipe.pexpire(tag_key, int(ttl * 1000))
+        pipe.execute()
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = self.client.smembers(tag_key)
+            pipe = self.client.pipeline()
+            for key in keys:
+                pipe.delete(self.prefix + key.decode())
+            pipe.delete(tag_key)
+            pipe.execute()
+
+    def clear(self):
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            self.client.delete(key)
+
+def default_backend() -> CacheBackend:
+    if os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower() == "redis":
+        return RedisBackend(os.getenv("REDIS_DB_URL", "redis://localhost:6379"))
+    return MemoryBackend()
+
+def visibility_class(user) -> str:
+    """
+    What a user is allowed to see; responses differ by role (e.g. anonymous reviewers)
+    """
+    return "privileged" if user.role in ["admin", "manager"] else "regular"
+
+class ResponseCache:
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: float = DEFAULT_TTL_SECONDS):
+        self.backend = backend or default_backend()
+        self.ttl = ttl
+
+    @staticmethod
+    def key(route: str, params: Dict[str, Any], visibility: str) -> str:
+        encoded = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(encoded.encode()).hexdigest()
+        return f"{route}:{visibility}:{digest}"
+
+    def get(self, key: str) -> Optional[Response]:
+        """A ready-to-send response for `key`, or None on a miss"""
+        body = self.backend.get(key)
+        if body is None:
+            return None
+        headers = None
+        if body[:1] == HEADERS_MARKER:
+            packed, _, body = body[1:].partition(b"\n")
+            headers = json.loads(packed)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def store(
+        self,
+        key: str,
+        content: Any,
+        tags: Iterable[str],
+        ttl: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """Encode `content`, cache the body (and any `headers`) under `key` and return the response"""
+        response = ORJSONResponse(content=content, headers=headers)
+        value = response.body
+        if headers:
+            # A JSON body never starts with NUL, so the marker is unambiguous
+            value = HEADERS_MARKER + json.dumps(headers).encode() + b"\n" + value
+        self.backend.set(key, value, self.ttl if ttl is None else ttl, tags)
+        return response
+
+    def invalidate(self, *tags: str):
+        self.backend.invalidate_tags(tags)
+
+    def clear(self):
+        self.backend.clear()
+
+response_cache = ResponseCache()
@@ -0,0 +1,71 @@
+"""
+Strong ETags for read-heavy endpoints.
+
+An ETag is a hash of the route's parameters plus a cheap version marker, such as
+MAX(updated_at) over an indexed column, so a matching If-None-Match can be
+answered with 304 before the full query and serialization run.
+
+CompressionMiddleware gives each content encoding its own validator by
+suffixing the tag ("<hash>-gzip"), since a strong ETag must not be shared by
+different byte representations. Matching accepts those suffixed and weak
+(W/) forms of the same tag.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Content encodings that CompressionMiddleware appends to an ETag
+ENCODING_SUFFIXES = ("gzip", "br")
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The validator of `etag`'s representation in `encoding`"""
+    prefix = "W/" if etag.startswith("W/") else ""
+    tag = etag[len(prefix):].strip('"')
+    return f'{prefix}"{tag}-{encoding}"'
+
+def base_etag(candidate: str) -> str:
+    """`candidate` without its weak prefix or encoding suffix"""
+    if candidate.startswith("W/"):
+        candidate = candidate[2:]
+    tag = candidate.strip('"')
+    for encoding in ENCODING_SUFFIXES:
+        if tag.endswith(f"-{encoding}"):
+            tag = tag[:-len(encoding) - 1]
+            break
+    return f'"{tag}"'
+
+def matching_etag(request: Request, etag: str) -> Optional[str]:
+    """
+    The If-None-Match entry that covers `etag` (any encoding of it, weak
+    comparison as for GET), or None
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    for candidate in (candidate.strip() for candidate in header.split(",")):
+        if candidate == "*":
+            return etag
+        if base_etag(candidate) == base_etag(etag):
+            return candidate
+    return None
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match header covers `etag`
+    """
+    return matching_etag(request, etag) is not None
+
+def not_modified_response(request: Request, etag: str) -> Optional[Response]:
+    """
+    A 304 response when the client already holds `etag`, otherwise None.
+    It carries the validator the client sent, so an encoded copy stays current.
+    """
+    matched = matching_etag(request, etag)
+    if matched is not None:
+        return Response(status_code=304, headers={"ETag": matched})
+    return None
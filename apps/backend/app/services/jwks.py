@@ -0,0 +1,131 @@
+"""
+Local verification of Cognito-issued JWTs.
+
+Cognito signs its tokens with RS256 keys published as a JWKS at
+`<issuer>/.well-known/jwks.json`. The key set is fetched at startup, cached,
+and refreshed on a schedule, so verifying a token is a signature check plus
+claim checks with no network call. A token signed with a key id the cache
+has not seen (Cognito rotated its keys) triggers an immediate refresh, at
+most once per JWKS_MIN_REFRESH_SECONDS so forged key ids cannot be used to
+hammer Cognito. That refresh blocks, so callers on the event loop verify in
+the threadpool.
+
+Both ID and access tokens are accepted. ID tokens name the app client in
+`aud` and the user by `email`; access tokens name them in `client_id` and
+`username`. Users sign in with their email as their Cognito username, so
+either resolves to the same user. Pools that sign in by email alias instead
+give access tokens a UUID username that matches no user; set
+COGNITO_ACCEPT_ACCESS_TOKENS=false there so clients must send ID tokens.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from typing import Callable, Dict, Optional
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+JWKS_REFRESH_SECONDS = float(os.getenv("JWKS_REFRESH_SECONDS", "3600"))
+JWKS_MIN_REFRESH_SECONDS = float(os.getenv("JWKS_MIN_REFRESH_SECONDS", "60"))
+JWKS_FETCH_TIMEOUT = 5
+COGNITO_ACCEPT_ACCESS_TOKENS = os.getenv("COGNITO_ACCEPT_ACCESS_TOKENS", "true").lower() == "true"
+# Allowed clock difference between us and Cognito when checking exp/iat
+LEEWAY_SECONDS = 30
+
+class JWKSFetchError(jwt.InvalidTokenError):
+    """The key set could not be fetched, so the token cannot be checked"""
+
+def fetch_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=JWKS_FETCH_TIMEOUT) as response:
+        return json.load(response)
+
+class JWKSVerifier:
+    def __init__(
+        self,
+        issuer: str,
+        client_id: Optional[str],
+        fetch: Optional[Callable[[], dict]] = None,
+        accept_access_tokens: bool = COGNITO_ACCEPT_ACCESS_TOKENS,
+    ):
+        self.issuer = issuer.rstrip("/")
+        self.client_id = client_id
+        self.accept_access_tokens = accept_access_tokens
+        self.jwks_url = f"{self.issuer}/.well-known/jwks.json"
+        self.fetch = fetch or (lambda: fetch_json(self.jwks_url))
+        self._keys: Dict[str, object] = {}
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = True) -> bool:
+        """
+        Replace the cached key set. Without `force` a refresh within
+        JWKS_MIN_REFRESH_SECONDS of the last one is skipped. Returns
+        whether a fetch happened; raises JWKSFetchError when it failed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._fetched_at is not None and now - self._fetched_at < JWKS_MIN_REFRESH_SECONDS:
+                return False
+            # Set before fetching so a failing endpoint is not retried on every token
+            self._fetched_at = now
+            try:
+                jwks = self.fetch()
+            except (OSError, ValueError) as e:
+                # URLError and timeouts are OSErrors, a malformed body a ValueError
+                logger.warning("JWKS fetch from %s failed: %s", self.jwks_url, e)
+                raise JWKSFetchError(f"Could not fetch the signing keys: {e}") from e
+            keys = {}
+            for jwk in jwks.get("keys", []):
+                try:
+                    keys[jwk["kid"]] = jwt.PyJWK(jwk).key
+                except (KeyError, jwt.PyJWTError) as e:
+                    logger.warning("Skipping unusable JWKS key %s: %s", jwk.get("kid"), e)
+            self._keys = keys
+            return True
+
+    def signing_key(self, kid: Optional[str]):
+        key = self._keys.get(kid)
+        if key is None:
+            # Unknown key id: Cognito may have rotated since the last refresh
+            if self.refresh(force=False):
+                key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key {kid}")
+        return key
+
+    def verify(self, token: str) -> dict:
+        """
+        The claims of a valid Cognito ID or access token for this app
+        client. Raises jwt.PyJWTError otherwise.
+        """
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") != "RS256":
+            raise jwt.InvalidAlgorithmError("Cognito tokens are RS256")
+        claims = jwt.decode(
+            token,
+            self.signing_key(header.get("kid")),
+            algorithms=["RS256"],
+            issuer=self.issuer,
+            leeway=LEEWAY_SECONDS,
+            options={"verify_aud": False, "require": ["exp", "iat", "iss", "token_use"]},
+        )
+        if claims["token_use"] == "id":
+            audience = claims.get("aud")
+        elif claims["token_use"] == "access" and self.accept_access_tokens:
+            # Access tokens carry no aud; the app client is in client_id
+            audience = claims.get("client_id")
+        else:
+            raise jwt.InvalidTokenError(f"Cognito {claims['token_use']} tokens are not accepted")
+        if self.client_id and audience != self.client_id:
+            raise jwt.InvalidAudienceError("Token was issued to another app client")
+        return claims
+
+def cognito_username(claims: dict) -> Optional[str]:
+    """The login name a verified token belongs to; users sign in with their email"""
+    if claims.get("token_use") == "access":
+        return claims.get("username")
+    return claims.get("email")
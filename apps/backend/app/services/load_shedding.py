@@ -0,0 +1,121 @@
+"""
+Overload signals for LoadSheddingMiddleware.
+
+Two signals say the process is past the point where queueing more work
+helps: connection pool wait time (TimedQueuePool records every checkout and
+tracks checkouts still waiting) and event loop lag (a probe task measures
+how late its sleeps wake up). The pool signal is the median over the latest
+checkouts, so one slow checkout cannot shed every request for a whole window. When either crosses its threshold, or too many
+requests are already in flight, new requests are refused with 503 right
+away instead of joining the queue.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from sqlalchemy.pool import QueuePool
+
+from .metrics import DB_POOL_WAIT_DURATION, EVENT_LOOP_LAG
+
+# 0 disables a trigger
+LOAD_SHED_MAX_CONCURRENCY = int(os.getenv("LOAD_SHED_MAX_CONCURRENCY", "200"))
+LOAD_SHED_POOL_WAIT = float(os.getenv("LOAD_SHED_POOL_WAIT_MS", "500")) / 1000
+LOAD_SHED_LOOP_LAG = float(os.getenv("LOAD_SHED_LOOP_LAG_MS", "200")) / 1000
+# Pool waits older than this no longer count, so shedding stops once the pool drains
+POOL_WAIT_WINDOW = 5.0
+# The signal is the median of the latest completed and still-pending checkouts
+POOL_WAIT_SAMPLES = 20
+# Fewer checkouts than this in the window never count as saturation
+POOL_WAIT_MIN_SAMPLES = 5
+LOOP_LAG_PROBE_INTERVAL = 0.25
+
+class PoolWaitTracker:
+    """Typical recent checkout wait, including checkouts that are still waiting"""
+
+    def __init__(self, window: float = POOL_WAIT_WINDOW, samples: int = POOL_WAIT_SAMPLES):
+        self.window = window
+        # (finished at, waited) per completed checkout, oldest first
+        self._recent: deque = deque(maxlen=samples)
+        self._waiting = {}
+        self._lock = threading.Lock()
+
+    def begin(self) -> object:
+        token = object()
+        with self._lock:
+            self._waiting[token] = time.monotonic()
+        return token
+
+    def end(self, token: object):
+        now = time.monotonic()
+        with self._lock:
+            waited = now - self._waiting.pop(token, now)
+            self._recent.append((now, waited))
+            self._expire(now)
+        DB_POOL_WAIT_DURATION.observe(waited)
+
+    def _expire(self, now: float):
+        while self._recent and self._recent[0][0] < now - self.window:
+            self._recent.popleft()
+
+    def current(self) -> float:
+        """
+        Median wait of the latest checkouts in the window, counting pending
+        ones at their wait so far; 0 with fewer than POOL_WAIT_MIN_SAMPLES
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            waits = [waited for _, waited in self._recent]
+            waits += [now - started for started in self._waiting.values()]
+        if len(waits) < POOL_WAIT_MIN_SAMPLES:
+            return 0.0
+        waits.sort()
+        return waits[len(waits) // 2]
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._waiting.clear()
+
+pool_waits = PoolWaitTracker()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited"""
+
+    def _do_get(self):
+        token = pool_waits.begin()
+        try:
+            return super()._do_get()
+        finally:
+            pool_waits.end(token)
+
+class EventLoopLag:
+    def __init__(self):
+        self.value = 0.0
+
+    async def probe(self, interval: float = LOOP_LAG_PROBE_INTERVAL):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.value = max(loop.time() - started - interval, 0.0)
+            EVENT_LOOP_LAG.set(self.value)
+
+loop_lag = EventLoopLag()
+
+def start_loop_lag_probe() -> asyncio.Task:
+    """Start measuring event loop lag; returns the task so shutdown can cancel it"""
+    return asyncio.create_task(loop_lag.probe())
+
+def overload_reason(in_flight: int) -> Optional[str]:
+    """Why a new request should be shed, or None to admit it"""
+    if LOAD_SHED_MAX_CONCURRENCY and in_flight >= LOAD_SHED_MAX_CONCURRENCY:
+        return "concurrency"
+    if LOAD_SHED_POOL_WAIT and pool_waits.current() >= LOAD_SHED_POOL_WAIT:
+        return "pool_wait"
+    if LOAD_SHED_LOOP_LAG and loop_lag.value >= LOAD_SHED_LOOP_LAG:
+        return "loop_lag"
+    return None
@@ -0,0 +1,339 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+A deliberately small registry (counters, gauges, histograms with labels)
+instead of a client library dependency. Recording is a dict lookup plus a
+bisect under a per-metric lock, so instrumenting every request and query
+stays cheap; all formatting happens at scrape time. Gauges can be backed by a
+callback that is evaluated on scrape, for values other objects already track
+(pool and WebSocket state).
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers sub-millisecond queries up to slow exports
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, "Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "Metric"):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional["Metric"]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """The whole registry in Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> Iterable[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable):
+        """
+        Evaluate `function` on every scrape. It returns a number, or for
+        labelled gauges a dict of label-value tuples to numbers.
+        """
+        self._function = function
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        if self._function is not None:
+            result = self._function()
+            values = result.items() if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self):
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"]
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP responses by route template and status code",
+    ["method", "route", "status"]
+)
+
+# Database
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time by statement type",
+    ["operation"]
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "SQL statements that raised, by statement type",
+    ["operation"]
+)
+DB_POOL = Gauge(
+    "db_pool_connections",
+    "Connection pool state of the application engine",
+    ["state"]
+)
+DB_POOL_WAIT_DURATION = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool"
+)
+
+# Admission control
+RATE_LIMITED = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429, by rate limit",
+    ["limit"]
+)
+REQUESTS_SHED = Counter(
+    "shed_requests_total",
+    "Requests rejected with 503 under overload, by trigger",
+    ["reason"]
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "How late the last event loop lag probe woke up"
+)
+
+# WebSockets
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Open WebSocket connections"
+)
+WEBSOCKET_CONNECTED_USERS = Gauge(
+    "websocket_connected_users",
+    "Distinct users with at least one open WebSocket"
+)
+WEBSOCKET_BROADCASTS_IN_FLIGHT = Gauge(
+    "websocket_broadcasts_in_flight",
+    "Broadcasts currently fanning out to connections"
+)
+WEBSOCKET_BROADCAST_DURATION = Histogram(
+    "websocket_broadcast_duration_seconds",
+    "Time to fan a broadcast out to every connection, by message type",
+    ["type"]
+)
+
+# Background jobs
+JOB_RUNS = Counter(
+    "scheduler_job_runs_total",
+    "Scheduled job runs by outcome (success, error, timeout)",
+    ["job", "outcome"]
+)
+JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds",
+    "Scheduled job run time",
+    ["job"]
+)
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader",
+    "1 while this process holds the scheduler leader lock"
+)
+
+# Cognito
+COGNITO_CALL_DURATION = Histogram(
+    "cognito_call_duration_seconds",
+    "Latency of AWS Cognito API calls",
+    ["operation"]
+)
+
+def statement_operation(statement: str) -> str:
+    """SELECT/INSERT/UPDATE/DELETE or OTHER, to keep label cardinality fixed"""
+    head = statement.lstrip()[:6].upper()
+    if head in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+        return head
+    return "OTHER"
+
+_engine_events_installed = False
+
+def instrument_engines():
+    """
+    Time every statement on every Engine through class-level events.
+    Safe to call more than once.
+    """
+    global _engine_events_installed
+    if _engine_events_installed:
+        return
+    _engine_events_installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started_at")
+        if started:
+            DB_QUERY_DURATION.observe(time.perf_counter() - started.pop(), operation=statement_operation(statement))
+
+    @event.listens_for(Engine, "handle_error")
+    def _handle_error(exception_context):
+        started = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+        if started:
+            started.pop()
+        DB_QUERY_ERRORS.inc(operation=statement_operation(exception_context.statement or ""))
+
+def pool_gauge(get_engine: Callable[[], Optional[Engine]]):
+    """
+    Back DB_POOL with the pool of whatever engine `get_engine` returns.
+    Nothing is reported before the engine exists or for pools without sizing.
+    """
+    def read():
+        engine = get_engine()
+        pool = getattr(engine, "pool", None)
+        if pool is None or not hasattr(pool, "checkedout"):
+            return {}
+        return {
+            ("size",): pool.size(),
+            ("checked_in",): pool.checkedin(),
+            ("checked_out",): pool.checkedout(),
+            ("overflow",): pool.overflow(),
+        }
+    DB_POOL.set_function(read)
@@ -0,0 +1,46 @@
+"""
+Keyset pagination over (created_at, id), newest first.
+
+Cursors are opaque URL-safe strings encoding the last row returned, so each
+page is an index range scan instead of an OFFSET that grows with depth.
+"""
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), row_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def before_cursor(created_at_column, id_column, cursor: Optional[str]):
+    """
+    Filter for rows strictly after `cursor` in (created_at DESC, id DESC) order
+    """
+    if not cursor:
+        return None
+    created_at, row_id = decode_cursor(cursor)
+    return or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < row_id)
+    )
+
+def next_cursor(rows, limit: int) -> Optional[str]:
+    """
+    Cursor for the page after `rows`, or None once the last page was returned.
+    Expects `limit + 1` rows to have been fetched.
+    """
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.created_at, last.id)
@@ -0,0 +1,295 @@
+"""
+On-demand sampling profiler for single requests.
+
+An admin sends `X-Profile: 1` (or `?profile=1`) and ProfilerMiddleware marks
+the request as a profiling candidate. Sampling only starts once
+get_current_active_user has resolved an admin, so other callers cannot turn
+it on. A background thread then records the stacks of the threads serving the
+request: the event loop thread, plus each threadpool thread while it executes
+a statement for the request. When the response starts the samples are stored
+as a speedscope profile (https://www.speedscope.app) together with a breakdown
+of SQL time, measured exactly by the request's query tracker, and
+serialization time, estimated from the samples.
+
+The event loop thread is shared, so its samples also include whatever other
+requests run on it meanwhile; sampled times are only exact on an idle worker.
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .query_budget import QueryTracker, current_tracker
+
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1")) / 1000
+# Sampling stops on its own after this long, for requests that never finish
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "30"))
+# Completed profiles kept in memory, oldest dropped first
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+MAX_STACK_DEPTH = 128
+
+# (filename, function name, first line) of a stack frame
+Frame = Tuple[str, str, int]
+
+SQL_PATH_MARKERS = ("/sqlalchemy/",)
+# (file suffix, function name); None matches the whole file
+SERIALIZATION_FRAMES = (
+    ("/fastapi/encoders.py", None),
+    ("/fastapi/routing.py", "serialize_response"),
+    ("/fastapi/responses.py", "render"),
+    ("/starlette/responses.py", "render"),
+    ("/app/services/serialization.py", None),
+)
+
+def frame_category(filename: str, function: str) -> Optional[str]:
+    if any(marker in filename for marker in SQL_PATH_MARKERS):
+        return "sql"
+    for path, name in SERIALIZATION_FRAMES:
+        if filename.endswith(path) and name in (None, function):
+            return "serialization"
+    return None
+
+def stack_category(stack: Tuple[Frame, ...]) -> str:
+    """The innermost SQL or serialization frame decides; everything else is application time"""
+    for filename, function, _ in reversed(stack):
+        category = frame_category(filename, function)
+        if category:
+            return category
+    return "application"
+
+def capture_stack(frame) -> Tuple[Frame, ...]:
+    """Frames from the thread's root to `frame`"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+class RequestProfile:
+    """
+    One profiled request. Created unstarted by the middleware; `start` is
+    called once the caller is known to be an admin.
+    """
+
+    def __init__(self, method: str, path: str, interval: float = None):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.interval = interval or PROFILE_SAMPLE_INTERVAL
+        self.user_id: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.started = 0.0
+        self.elapsed = 0.0
+        # Stack -> seconds of wall time attributed to it
+        self.stacks: Dict[Tuple[Frame, ...], float] = Counter()
+        self.samples = 0
+        self.sql_tracker: Optional[QueryTracker] = None
+        self._threads = set()
+        self._loop_thread: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stop.is_set()
+
+    def add_thread(self, ident: int):
+        self._threads.add(ident)
+
+    def remove_thread(self, ident: int):
+        """Stop sampling a threadpool thread; the event loop thread stays"""
+        if ident != self._loop_thread:
+            self._threads.discard(ident)
+
+    def start(self, user_id: str):
+        if self._thread is not None:
+            return
+        self.user_id = user_id
+        self.started_at = datetime.utcnow()
+        self.started = time.perf_counter()
+        self.sql_tracker = current_tracker()
+        self._loop_thread = threading.get_ident()
+        self.add_thread(self._loop_thread)
+        self._thread = threading.Thread(target=self._sample, name=f"profiler-{self.id[:8]}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _sample(self):
+        previous = time.perf_counter()
+        deadline = previous + PROFILE_MAX_SECONDS
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            # The GIL can stretch intervals; weigh each sample by the real gap
+            weight, previous = now - previous, now
+            frames = sys._current_frames()
+            for ident in list(self._threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[capture_stack(frame)] += weight
+                    self.samples += 1
+            if now > deadline:
+                self._stop.set()
+
+    def breakdown(self) -> dict:
+        """Wall time, exact SQL time and sampled time per category, in milliseconds"""
+        sampled = Counter()
+        for stack, seconds in self.stacks.items():
+            sampled[stack_category(stack)] += seconds
+        tracker = self.sql_tracker
+        return {
+            "wall_ms": round(self.elapsed * 1000, 2),
+            "sql_ms": round(tracker.total_time * 1000, 2) if tracker else None,
+            "sql_queries": tracker.count if tracker else None,
+            "samples": self.samples,
+            "sampled_ms": {
+                category: round(sampled.get(category, 0) * 1000, 2)
+                for category in ("sql", "serialization", "application")
+            },
+        }
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "user_id": self.user_id,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            **self.breakdown(),
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, readable in browser dev tools"""
+        breakdown = self.breakdown()
+        entries = [f"total;dur={breakdown['wall_ms']}"]
+        if breakdown["sql_ms"] is not None:
+            entries.append(f'sql;dur={breakdown["sql_ms"]};desc="{breakdown["sql_queries"]} queries"')
+        # Event loop samples can include other requests running concurrently
+        entries.append(
+            f"serialization;dur={breakdown['sampled_ms']['serialization']};"
+            f'desc="sampled, includes concurrent requests"'
+        )
+        return ", ".join(entries)
+
+    def speedscope(self) -> dict:
+        """The samples in speedscope's sampled-profile file format"""
+        frames: List[dict] = []
+        frame_index: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, seconds in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    filename, function, line = frame
+                    frames.append({"name": function, "file": filename, "line": line})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(round(seconds * 1000, 3))
+        name = f"{self.method} {self.path}"
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "performance-review-api",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "metadata": self.summary(),
+        }
+
+class ProfileStore:
+    """Most recent completed profiles by id"""
+
+    def __init__(self, max_size: int = PROFILE_STORE_SIZE):
+        self.max_size = max_size
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[RequestProfile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+profile_store = ProfileStore()
+
+_requested_profile: ContextVar[Optional[RequestProfile]] = ContextVar("requested_profile", default=None)
+
+def request_profile(profile: RequestProfile):
+    """Mark the current request as a profiling candidate; returns a token for reset"""
+    return _requested_profile.set(profile)
+
+def reset_requested_profile(token):
+    _requested_profile.reset(token)
+
+def start_requested_profile(user) -> Optional[RequestProfile]:
+    """Start sampling if the request asked for it and `user` is an admin"""
+    profile = _requested_profile.get()
+    if profile is None or user.role != "admin":
+        return None
+    profile.start(user.id)
+    return profile
+
+_engine_events_installed = False
+
+def install():
+    """
+    Sample threadpool threads while they execute SQL for a profiled request.
+    A thread is dropped again once its statement returns, since the pool
+    reuses it for other requests. Safe to call more than once.
+    """
+    global _engine_events_installed
+    if _engine_events_installed:
+        return
+    _engine_events_installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _requested_profile.get()
+        if profile is not None and profile.running:
+            profile.add_thread(threading.get_ident())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _requested_profile.get()
+        if profile is not None:
+            profile.remove_thread(threading.get_ident())
+
+    @event.listens_for(Engine, "handle_error")
+    def _handle_error(exception_context):
+        profile = _requested_profile.get()
+        if profile is not None:
+            profile.remove_thread(threading.get_ident())
@@ -0,0 +1,131 @@
+"""
+Request-scoped SQL statement tracking, query budgets and N+1 detection.
+
+While a tracker is active (per HTTP request or WebSocket connection through
+QueryBudgetMiddleware, or explicitly with `track_queries`), every statement
+executed in that context, including threadpool work started from it, is
+counted, timed and grouped by shape. When the scope ends a summary is
+logged, repeated shapes are reported as likely N+1 patterns, and routes
+decorated with `@query_budget(n)` are checked against their budget. With
+QUERY_BUDGET_STRICT=true (the test suite sets this) an exceeded budget
+raises instead of logging.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# The same statement shape this many times in one scope is reported as N+1
+REPEATED_STATEMENT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and multi-row VALUES differ only in placeholder count
+_PLACEHOLDER_LIST = re.compile(r"(\?|%\(\w+\)s|:\w+)(\s*,\s*(\?|%\(\w+\)s|:\w+))+")
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+def statement_shape(statement: str) -> str:
+    """Normalize a parameterized statement so repeats compare equal"""
+    return _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", statement.strip()))
+
+class QueryTracker:
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Counter = Counter()
+        # Threadpool work started from the request shares this tracker
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.total_time += duration
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int = None) -> List[Tuple[str, int]]:
+        """Statement shapes run at least `threshold` times, most frequent first"""
+        threshold = threshold or REPEATED_STATEMENT_THRESHOLD
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def report(self, budget: Optional[int] = None):
+        """Log the summary and enforce `budget`"""
+        logger.debug("%s: %d queries in %.1f ms", self.label, self.count, self.total_time * 1000)
+        for shape, count in self.repeated():
+            logger.warning("%s: possible N+1, %d x %s", self.label, count, shape[:200])
+        if budget is not None and self.count > budget:
+            message = f"{self.label} ran {self.count} queries, budget is {budget}"
+            if QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+_current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("query_tracker", default=None)
+
+def current_tracker() -> Optional[QueryTracker]:
+    return _current_tracker.get()
+
+def start_tracking(label: str) -> Tuple[QueryTracker, Token]:
+    """Make a new tracker current; pass the token to stop_tracking"""
+    tracker = QueryTracker(label)
+    return tracker, _current_tracker.set(tracker)
+
+def stop_tracking(token: Token):
+    _current_tracker.reset(token)
+
+@contextmanager
+def track_queries(label: str, budget: Optional[int] = None):
+    """
+    Track statements run inside the block, then report them against `budget`
+    """
+    tracker, token = start_tracking(label)
+    try:
+        yield tracker
+    finally:
+        stop_tracking(token)
+    tracker.report(budget)
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declare the most statements a route may run per request.
+    Apply below the router decorator so the route registers the same function.
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+_engine_events_installed = False
+
+def install():
+    """
+    Feed every Engine's statements to the active tracker. Safe to call more than once.
+    """
+    global _engine_events_installed
+    if _engine_events_installed:
+        return
+    _engine_events_installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_tracker.get() is not None:
+            conn.info.setdefault("query_budget_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        tracker = _current_tracker.get()
+        started = conn.info.get("query_budget_started_at")
+        if tracker is not None and started:
+            tracker.record(statement, time.perf_counter() - started.pop())
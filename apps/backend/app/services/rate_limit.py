@@ -0,0 +1,168 @@
+"""
+Token-bucket rate limits for expensive routes.
+
+Each limit is a bucket of `limit` tokens refilled evenly over `period`
+seconds, so short bursts up to `limit` pass and sustained traffic is held to
+the average rate. Buckets are keyed per client IP and per user (or login
+name), and a request that finds its bucket empty gets 429 with Retry-After.
+
+The default backend keeps buckets in process. Set RATE_LIMIT_BACKEND=redis
+to share them across workers through REDIS_DB_URL.
+"""
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from fastapi import HTTPException, Request, status
+
+from .metrics import RATE_LIMITED
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+# Reverse proxies in front of the app that append to X-Forwarded-For; 0 ignores the header
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "0"))
+DEFAULT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+class RateLimitBackend:
+    """Storage interface for token buckets"""
+
+    def take(self, key: str, capacity: float, refill_rate: float, cost: float = 1) -> float:
+        """
+        Take `cost` tokens from the bucket at `key`. Returns 0 when they were
+        available, otherwise the seconds until they will be.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in a bounded LRU; an evicted bucket comes back full,
+    which only ever errs on the side of allowing a request
+    """
+
+    def __init__(self, max_buckets: int = DEFAULT_MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        # Key -> [tokens, monotonic time of the last update]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, refill_rate: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+                while len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+                bucket[1] = now
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return 0
+            return (cost - bucket[0]) / refill_rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+# Refill and take atomically on the server, using the server clock
+TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - updated, 0) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Shared backend: one hash per bucket, expiring once it would be full again"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis  # Optional dependency, only needed for the shared backend
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(TAKE_SCRIPT)
+
+    def take(self, key: str, capacity: float, refill_rate: float, cost: float = 1) -> float:
+        return float(self._take(keys=[self.prefix + key], args=[capacity, refill_rate, cost]))
+
+    def clear(self):
+        for key in self.client.scan_iter(match=f"{self.prefix}*"):
+            self.client.delete(key)
+
+def default_backend() -> RateLimitBackend:
+    if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "redis":
+        return RedisRateLimitBackend(os.getenv("REDIS_DB_URL", "redis://localhost:6379"))
+    return MemoryRateLimitBackend()
+
+rate_limit_backend = default_backend()
+
+class RateLimit:
+    def __init__(self, name: str, limit: int, period: float):
+        self.name = name
+        self.limit = limit
+        self.period = period
+
+    @classmethod
+    def from_env(cls, name: str, variable: str, default: str) -> "RateLimit":
+        """Read a limit such as "5/minute" from `variable`"""
+        spec = os.getenv(variable, default)
+        count, _, unit = spec.partition("/")
+        return cls(name, int(count), PERIODS[unit.strip().rstrip("s")])
+
+    def check(self, key: str, backend: Optional[RateLimitBackend] = None):
+        """Spend a token for `key`, or raise 429"""
+        if not RATE_LIMIT_ENABLED:
+            return
+        backend = backend or rate_limit_backend
+        wait = backend.take(f"{self.name}:{key}", self.limit, self.limit / self.period)
+        if wait:
+            RATE_LIMITED.inc(limit=self.name)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+def client_ip(request: Request) -> str:
+    """
+    The address the outermost trusted proxy saw. Clients can put anything in
+    X-Forwarded-For, so only the hops our own proxies appended are believed:
+    with N trusted proxies that is the Nth entry from the right.
+    """
+    if RATE_LIMIT_TRUSTED_PROXIES:
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        if len(hops) >= RATE_LIMIT_TRUSTED_PROXIES:
+            return hops[-RATE_LIMIT_TRUSTED_PROXIES]
+    return request.client.host if request.client else "unknown"
+
+# Login and refresh call Cognito synchronously
+LOGIN_PER_IP = RateLimit.from_env("login_ip", "RATE_LIMIT_LOGIN_PER_IP", "30/minute")
+LOGIN_PER_USERNAME = RateLimit.from_env("login_username", "RATE_LIMIT_LOGIN_PER_USERNAME", "5/minute")
+REFRESH_PER_IP = RateLimit.from_env("refresh_ip", "RATE_LIMIT_REFRESH_PER_IP", "30/minute")
+REFRESH_PER_TOKEN = RateLimit.from_env("refresh_token", "RATE_LIMIT_REFRESH_PER_TOKEN", "5/minute")
+# Swipe storms on peer reviews
+REVIEW_CREATE_PER_IP = RateLimit.from_env("review_create_ip", "RATE_LIMIT_REVIEW_CREATE_PER_IP", "300/minute")
+REVIEW_CREATE_PER_USER = RateLimit.from_env("review_create_user", "RATE_LIMIT_REVIEW_CREATE_PER_USER", "60/minute")
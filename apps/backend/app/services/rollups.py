@@ -0,0 +1,167 @@
+"""
+Incremental (employee, review period) rollups of employer review scores.
+
+Each EmployerReviewRollup row holds count, sum and sum of squares per score,
+so the mean and variance of any period come from a single row lookup.
+Run `python -m app.services.rollups rebuild` to backfill from employer_reviews.
+
+On PostgreSQL a rebuild holds a transaction-level advisory lock exclusively
+while incremental writers hold it shared, so no increment can land between
+the rebuild's DELETE and INSERT ... SELECT: writers that got in first commit
+before the rebuild reads employer_reviews, later ones wait and increment the
+rebuilt rows. This relies on the default READ COMMITTED isolation.
+"""
+import argparse
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.review import EmployerReview, EmployerReviewRollup, SCORE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Any 64-bit number shared by every process writing rollups
+ROLLUP_LOCK_ID = int(os.getenv("ROLLUP_LOCK_ID", "7305921847"))
+
+def lock_rollups(db: Session, exclusive: bool = False):
+    """Take the rollup advisory lock until the transaction ends; SQLite serializes writes already"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    function = "pg_advisory_xact_lock" if exclusive else "pg_advisory_xact_lock_shared"
+    db.execute(text(f"SELECT {function}(:lock_id)"), {"lock_id": ROLLUP_LOCK_ID})
+
+def _column(field: str, suffix: str):
+    return getattr(EmployerReviewRollup, f"{field}_{suffix}")
+
+def apply_review(db: Session, review: EmployerReview):
+    """
+    Fold a new review into its rollup row inside the caller's transaction.
+    Increments are issued as SQL expressions so concurrent writers never lose updates.
+    """
+    if review.review_period is None:
+        return
+    lock_rollups(db)
+
+    increments = {EmployerReviewRollup.review_count: EmployerReviewRollup.review_count + 1}
+    for field in SCORE_FIELDS:
+        score = getattr(review, field)
+        if score is None:
+            continue
+        increments[_column(field, "count")] = _column(field, "count") + 1
+        increments[_column(field, "sum")] = _column(field, "sum") + score
+        increments[_column(field, "sumsq")] = _column(field, "sumsq") + score * score
+    increments[EmployerReviewRollup.updated_at] = datetime.utcnow()
+
+    key = (
+        EmployerReviewRollup.employee_id == review.employee_id,
+        EmployerReviewRollup.review_period == review.review_period,
+    )
+    if db.query(EmployerReviewRollup).filter(*key).update(increments, synchronize_session=False):
+        return
+
+    # First review for this key: insert, falling back to the update if another writer won
+    values = {"review_count": 1}
+    for field in SCORE_FIELDS:
+        score = getattr(review, field)
+        values[f"{field}_count"] = 0 if score is None else 1
+        values[f"{field}_sum"] = score or 0
+        values[f"{field}_sumsq"] = (score or 0) ** 2
+    try:
+        with db.begin_nested():
+            db.add(EmployerReviewRollup(
+                employee_id=review.employee_id,
+                review_period=review.review_period,
+                **values
+            ))
+    except IntegrityError:
+        db.query(EmployerReviewRollup).filter(*key).update(increments, synchronize_session=False)
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Recompute every rollup row from employer_reviews with one INSERT ... SELECT.
+    Returns the number of rollup rows written. The caller commits, which
+    releases the lock that keeps incremental writers out meanwhile.
+    """
+    lock_rollups(db, exclusive=True)
+    columns = ["employee_id", "review_period", "review_count"]
+    aggregates = [
+        EmployerReview.employee_id,
+        EmployerReview.review_period,
+        func.count(EmployerReview.id),
+    ]
+    for field in SCORE_FIELDS:
+        score = getattr(EmployerReview, field)
+        columns += [f"{field}_count", f"{field}_sum", f"{field}_sumsq"]
+        aggregates += [
+            func.count(score),
+            func.coalesce(func.sum(score), 0),
+            func.coalesce(func.sum(score * score), 0),
+        ]
+    columns.append("updated_at")
+    aggregates.append(func.now())
+
+    source = select(*aggregates).where(
+        EmployerReview.review_period.isnot(None)
+    ).group_by(
+        EmployerReview.employee_id,
+        EmployerReview.review_period
+    )
+
+    db.query(EmployerReviewRollup).delete(synchronize_session=False)
+    db.execute(insert(EmployerReviewRollup).from_select(columns, source))
+    return db.query(EmployerReviewRollup).count()
+
+def rollup_stats(rollup: EmployerReviewRollup) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Mean and population variance per score from a rollup row
+    """
+    stats = {}
+    for field in SCORE_FIELDS:
+        count = getattr(rollup, f"{field}_count")
+        if not count:
+            stats[field] = {"count": 0, "mean": None, "variance": None}
+            continue
+        mean = getattr(rollup, f"{field}_sum") / count
+        variance = max(getattr(rollup, f"{field}_sumsq") / count - mean * mean, 0.0)
+        stats[field] = {"count": count, "mean": round(mean, 4), "variance": round(variance, 4)}
+    return stats
+
+def reconcile_rollups():
+    """
+    Scheduled on the leader: rebuild every rollup so drift from
+    incremental updates (lost races, manual edits) does not accumulate
+    """
+    from ..db import get_session_factory
+
+    db = get_session_factory()()
+    try:
+        rows = rebuild_rollups(db)
+        db.commit()
+        logger.info("Reconciled %d employer review rollups", rows)
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain employer review rollup tables")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute all rollups from employer_reviews")
+    args = parser.parse_args()
+
+    from ..db import SessionLocal, init_db
+
+    init_db()
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            rows = rebuild_rollups(db)
+            db.commit()
+            print(f"Rebuilt {rows} employer review rollups")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Background job scheduler with single-leader election.
+
+Jobs run on an interval with jitter, so workers started together do not all
+fire at once, and each run is bounded by a timeout. Sync jobs run in the
+threadpool. Runs and failures are reported through the scheduler_job_*
+metrics, and the lifespan starts the scheduler and cancels every task on
+shutdown.
+
+Jobs marked `leader_only` run in one process per cluster: the one holding a
+PostgreSQL session-level advisory lock. The lock lives on a dedicated
+connection outside the application's pool, so it never takes a request's
+slot, and it is released as soon as the holder exits or its connection
+drops; the other workers keep retrying to take over. Databases without
+advisory locks (SQLite in development) have one process, which always leads.
+"""
+import asyncio
+import inspect
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .metrics import JOB_DURATION, JOB_RUNS, SCHEDULER_LEADER
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+# Any 64-bit number shared by every worker of this application
+SCHEDULER_LOCK_ID = int(os.getenv("SCHEDULER_LOCK_ID", "7305921846"))
+# How often followers try to take the lock and the leader checks its connection
+LEADER_CHECK_INTERVAL = float(os.getenv("SCHEDULER_LEADER_CHECK_SECONDS", "15"))
+
+class LeaderElection:
+    def __init__(self, get_engine: Callable, create_lock_engine: Callable, lock_id: int = SCHEDULER_LOCK_ID):
+        # Called on the first check, so building the scheduler never creates the engine
+        self.get_engine = get_engine
+        # Builds an unpooled engine with the main engine's connection settings
+        self.create_lock_engine = create_lock_engine
+        self.lock_id = lock_id
+        self.is_leader = False
+        self._connection = None
+        self._lock_engine = None
+
+    def _set_leader(self, is_leader: bool):
+        if is_leader != self.is_leader:
+            logger.info("Scheduler leadership %s", "acquired" if is_leader else "lost")
+        self.is_leader = is_leader
+        SCHEDULER_LEADER.set(1 if is_leader else 0)
+
+    def check(self) -> bool:
+        """Keep or try to take the leader lock; blocking, run it in a thread"""
+        try:
+            if self._connection is not None:
+                # Still ours as long as the session that took it is alive
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()
+                return self.is_leader
+
+            engine = self.get_engine()
+            if engine.dialect.name != "postgresql":
+                self._set_leader(True)
+                return True
+
+            if self._lock_engine is None:
+                # Same database and settings, but unpooled: the lock connection is
+                # opened and closed on its own instead of pinning a slot of the app's pool
+                self._lock_engine = self.create_lock_engine()
+            connection = self._lock_engine.connect()
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}
+            ).scalar()
+            connection.commit()
+            if acquired:
+                self._connection = connection
+            else:
+                connection.close()
+            self._set_leader(bool(acquired))
+        except SQLAlchemyError as e:
+            logger.warning("Scheduler leader check failed: %s", e)
+            self._drop_connection()
+            self._set_leader(False)
+        return self.is_leader
+
+    def _drop_connection(self):
+        if self._connection is not None:
+            try:
+                self._connection.invalidate()
+            except SQLAlchemyError:
+                pass
+            self._connection = None
+
+    def release(self):
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id})
+                self._connection.commit()
+                self._connection.close()
+            except SQLAlchemyError as e:
+                logger.warning("Scheduler leader lock release failed: %s", e)
+            self._connection = None
+        if self._lock_engine is not None:
+            self._lock_engine.dispose()
+            self._lock_engine = None
+        self._set_leader(False)
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        interval: float,
+        jitter: float = 0.1,
+        timeout: Optional[float] = None,
+        leader_only: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        # Fraction of the interval each delay may vary by
+        self.jitter = jitter
+        self.timeout = timeout
+        self.leader_only = leader_only
+        self.last_success: Optional[float] = None
+
+    def next_delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def run(self) -> str:
+        """Run once; returns the outcome recorded in the metrics"""
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(self.func):
+                call = self.func()
+            else:
+                call = run_in_threadpool(self.func)
+            await asyncio.wait_for(call, self.timeout)
+            outcome = "success"
+            self.last_success = time.time()
+        except asyncio.TimeoutError:
+            # A sync job keeps its thread until it returns; only the wait is abandoned
+            logger.error("Job %s timed out after %.0fs", self.name, self.timeout)
+            outcome = "timeout"
+        except Exception:
+            logger.exception("Job %s failed", self.name)
+            outcome = "error"
+        JOB_DURATION.observe(time.perf_counter() - started, job=self.name)
+        JOB_RUNS.inc(job=self.name, outcome=outcome)
+        return outcome
+
+class Scheduler:
+    def __init__(self, election: Optional[LeaderElection] = None):
+        self.election = election
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def is_leader(self) -> bool:
+        return self.election is None or self.election.is_leader
+
+    def add_job(self, name: str, func: Callable, interval: float, **options) -> Job:
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already scheduled")
+        job = self.jobs[name] = Job(name, func, interval, **options)
+        return job
+
+    async def _job_loop(self, job: Job):
+        while True:
+            await asyncio.sleep(job.next_delay())
+            if job.leader_only and not self.is_leader:
+                continue
+            await job.run()
+
+    async def _election_loop(self):
+        while True:
+            await run_in_threadpool(self.election.check)
+            await asyncio.sleep(LEADER_CHECK_INTERVAL)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self._tasks:
+            return
+        if self.election is not None and any(job.leader_only for job in self.jobs.values()):
+            self._tasks.append(asyncio.create_task(self._election_loop(), name="scheduler-election"))
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._job_loop(job), name=f"job-{job.name}"))
+
+    async def stop(self):
+        """Cancel every job and give up leadership"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.election is not None:
+            await run_in_threadpool(self.election.release)
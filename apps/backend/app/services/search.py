@@ -0,0 +1,239 @@
+"""
+Ranked user search for per-keystroke autocomplete.
+
+On Postgres, matching and ranking run in SQL against pg_trgm GIN indexes on
+users.full_name and users.email. Other databases (SQLite in development and
+tests) use an in-process index of name/email prefixes and trigrams. When the
+users table's version marker changes, only rows updated since the last
+refresh are re-indexed; a full rebuild happens only when rows went missing.
+Queries shorter than MIN_FUZZY_QUERY_LENGTH match by prefix only, since one
+or two characters share a trigram with most of the table.
+"""
+import bisect
+import math
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import DDL, case, event, func, literal, or_
+from sqlalchemy.orm import Session
+
+from ..db import Base
+from ..models.user import User
+
+# Postgres: trigram indexes serve ILIKE prefix/substring matches and the % similarity operator.
+# Metadata-level events fire on every create_all, not only when the users table
+# is new, so existing databases get the indexes on their next startup too.
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_users_full_name_trgm ON users USING gin (lower(full_name) gin_trgm_ops);"
+        "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (lower(email) gin_trgm_ops)"
+    ).execute_if(dialect="postgresql")
+)
+
+# Rank tiers: exact prefix beats word prefix beats email prefix beats fuzzy similarity
+NAME_PREFIX_RANK = 3.0
+WORD_PREFIX_RANK = 2.5
+EMAIL_PREFIX_RANK = 2.0
+MIN_SIMILARITY = 0.3
+MIN_FUZZY_QUERY_LENGTH = 3
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _trigrams(value: str) -> Set[str]:
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def similarity(left: str, right: str) -> float:
+    """Trigram similarity as pg_trgm computes it"""
+    a, b = _trigrams(left), _trigrams(right)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def search_users_postgres(db: Session, q: str, limit: int) -> List[dict]:
+    name = func.lower(User.full_name)
+    email = func.lower(User.email)
+    prefix = _escape_like(q) + "%"
+    word_prefix = "% " + prefix
+
+    fuzzy = len(q) >= MIN_FUZZY_QUERY_LENGTH
+    rank = case(
+        (name.like(prefix, escape="\\"), literal(NAME_PREFIX_RANK)),
+        (name.like(word_prefix, escape="\\"), literal(WORD_PREFIX_RANK)),
+        (email.like(prefix, escape="\\"), literal(EMAIL_PREFIX_RANK)),
+        else_=func.greatest(func.similarity(name, q), func.similarity(email, q)) if fuzzy else literal(0.0)
+    ).label("score")
+
+    matches = [
+        name.like(prefix, escape="\\"),
+        name.like(word_prefix, escape="\\"),
+        email.like(prefix, escape="\\"),
+    ]
+    if fuzzy:
+        matches += [name.op("%")(q), email.op("%")(q)]
+
+    rows = db.query(User.id, User.full_name, User.email, rank).filter(
+        User.is_active == True,
+        or_(*matches)
+    ).order_by(
+        rank.desc(),
+        User.full_name
+    ).limit(limit).all()
+
+    return [
+        {"id": row.id, "full_name": row.full_name, "email": row.email, "score": round(float(row.score), 4)}
+        for row in rows
+    ]
+
+def _tokens(full_name: Optional[str], email: Optional[str]) -> Tuple[Set[str], Set[str]]:
+    """Prefix tokens and trigrams a user is indexed under"""
+    name, mail = (full_name or "").lower(), (email or "").lower()
+    return {token for token in (name, mail, *name.split()) if token}, _trigrams(name) | _trigrams(mail)
+
+class UserSearchIndex:
+    """In-process prefix + trigram index over active users"""
+
+    def __init__(self):
+        self.version = None
+        self._users: Dict[str, Tuple[str, str]] = {}
+        # Every user id in the table as of the last refresh, active or not
+        self._seen: Set[str] = set()
+        self._last_updated: Optional[datetime] = None
+        self._prefixes: List[Tuple[str, str]] = []
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def ensure_fresh(self, db: Session, version: Tuple[int, Optional[datetime]]):
+        """
+        Catch up with the database when the users table's (row count, newest
+        updated_at) version changed since the last refresh
+        """
+        if version == self.version and self.version is not None:
+            return
+        with self._lock:
+            if version == self.version and self.version is not None:
+                return
+            columns = (User.id, User.full_name, User.email, User.is_active, User.updated_at)
+            if self._last_updated is not None:
+                # Inserts and edits raise updated_at; >= keeps rows sharing the last timestamp
+                changed = db.query(*columns).filter(User.updated_at >= self._last_updated).all()
+                for row in changed:
+                    self._apply(*row)
+                if version[0] == len(self._seen):
+                    self.version = version
+                    return
+            # First use, or rows were deleted (or committed with an older timestamp)
+            self.build(db.query(*columns).all(), version)
+
+    def build(self, rows, version=None):
+        """Replace the index with `rows` of (id, full_name, email, is_active, updated_at)"""
+        self._users, self._seen, self._last_updated = {}, set(), None
+        self._prefixes, self._trigrams = [], defaultdict(set)
+        for row in rows:
+            self._apply(*row, sort=False)
+        self._prefixes.sort()
+        self.version = version
+
+    def _apply(self, user_id, full_name, email, is_active, updated_at, sort: bool = True):
+        """Add, re-index or drop one user"""
+        self._seen.add(user_id)
+        if updated_at is not None and (self._last_updated is None or updated_at > self._last_updated):
+            self._last_updated = updated_at
+        old = self._users.pop(user_id, None)
+        if old is not None:
+            prefixes, grams = _tokens(*old)
+            for token in prefixes:
+                index = bisect.bisect_left(self._prefixes, (token, user_id))
+                if index < len(self._prefixes) and self._prefixes[index] == (token, user_id):
+                    del self._prefixes[index]
+            for gram in grams:
+                self._trigrams[gram].discard(user_id)
+        if not is_active:
+            return
+        self._users[user_id] = (full_name, email)
+        prefixes, grams = _tokens(full_name, email)
+        for token in prefixes:
+            if sort:
+                bisect.insort(self._prefixes, (token, user_id))
+            else:
+                self._prefixes.append((token, user_id))
+        for gram in grams:
+            self._trigrams[gram].add(user_id)
+
+    def _prefix_matches(self, q: str) -> Set[str]:
+        start = bisect.bisect_left(self._prefixes, (q, ""))
+        matches = set()
+        for token, user_id in self._prefixes[start:]:
+            if not token.startswith(q):
+                break
+            matches.add(user_id)
+        return matches
+
+    def _score(self, user_id: str, q: str) -> float:
+        full_name, email = self._users[user_id]
+        name, mail = (full_name or "").lower(), (email or "").lower()
+        if name.startswith(q):
+            return NAME_PREFIX_RANK
+        if any(word.startswith(q) for word in name.split()[1:]):
+            return WORD_PREFIX_RANK
+        if mail.startswith(q):
+            return EMAIL_PREFIX_RANK
+        return max(similarity(name, q), similarity(mail, q))
+
+    def _fuzzy_matches(self, q: str, exclude: Set[str]) -> Set[str]:
+        """Users sharing enough trigrams with `q` to possibly reach MIN_SIMILARITY"""
+        grams = _trigrams(q)
+        counts: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for user_id in self._trigrams.get(gram, ()):
+                counts[user_id] += 1
+        needed = math.ceil(MIN_SIMILARITY * len(grams))
+        return {user_id for user_id, count in counts.items() if count >= needed and user_id not in exclude}
+
+    def search(self, q: str, limit: int) -> List[dict]:
+        candidates = self._prefix_matches(q)
+        # Only fall back to fuzzy matching when prefixes don't fill the page
+        if len(candidates) < limit and len(q) >= MIN_FUZZY_QUERY_LENGTH:
+            candidates |= self._fuzzy_matches(q, candidates)
+
+        scored = []
+        for user_id in candidates:
+            score = self._score(user_id, q)
+            if score >= MIN_SIMILARITY:
+                scored.append((score, self._users[user_id][0] or "", user_id))
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+
+        return [
+            {
+                "id": user_id,
+                "full_name": self._users[user_id][0],
+                "email": self._users[user_id][1],
+                "score": round(score, 4),
+            }
+            for score, _, user_id in scored[:limit]
+        ]
+
+search_index = UserSearchIndex()
+
+def search_users(db: Session, q: str, limit: int, version=None) -> List[dict]:
+    """
+    Active users matching `q`, best first. `version` is the users table's
+    (row count, newest updated_at), used to keep the in-process index fresh.
+    """
+    q = q.strip().lower()
+    if not q:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        return search_users_postgres(db, q, limit)
+    search_index.ensure_fresh(db, version)
+    return search_index.search(q, limit)
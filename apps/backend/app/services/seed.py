@@ -0,0 +1,410 @@
+"""
+Synthetic organization data at production scale.
+
+    python -m app.services.seed --users 100000 --years 3 --peer-reviews 500000 --transactions 1000000
+    python -m app.services.seed --database-url sqlite:///./seed.db --users 10000
+
+Generation is deterministic for a given --seed and streams rows into bulk
+INSERTs chunk by chunk, so memory stays flat while millions of rows load.
+The shape follows a real org: team sizes and per-user activity are
+power-law distributed, managers review their reports every quarter over
+several years, peer reviews mostly stay within teams, and point transactions
+and badges follow from that activity. Users are `user-0000000`...
+(`user0@example.com`...) so benchmarks can address them by index.
+"""
+import argparse
+import itertools
+import random
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..models.peer_review import PeerReview
+from ..models.points import Badge, PointsTransaction, UserBadge
+from ..models.review import EmployerReview, SCORE_FIELDS
+from ..models.user import User, UserRole
+from .rollups import rebuild_rollups
+
+CHUNK_SIZE = 5000
+
+FIRST_NAMES = (
+    "Alice", "Bob", "Carol", "David", "Emma", "Farid", "Grace", "Hiro", "Isabel", "Jonas",
+    "Kai", "Lena", "Mateo", "Nadia", "Oscar", "Priya", "Quinn", "Rosa", "Sven", "Tara",
+    "Umar", "Vera", "Wei", "Ximena", "Yusuf", "Zoe",
+)
+LAST_NAMES = (
+    "Anderson", "Berg", "Chen", "Diaz", "Eriksen", "Fischer", "Garcia", "Haddad", "Ito", "Jensen",
+    "Kowalski", "Li", "Martin", "Nakamura", "Okafor", "Patel", "Quintero", "Rossi", "Schmidt", "Tanaka",
+    "Usman", "Varga", "Wang", "Xu", "Yilmaz", "Zhang",
+)
+COMMENTS = (
+    "Great collaborator", "Always helpful in reviews", "Shipped a tough project",
+    "Clear communicator", "Could share context earlier", "Strong technical ownership",
+)
+# name, description, points_required
+BADGES = (
+    ("First Steps", "Earned your first points", 10),
+    ("Team Player", "Reached 100 points", 100),
+    ("Rising Star", "Reached 250 points", 250),
+    ("Consistent", "Reached 500 points", 500),
+    ("Champion", "Reached 1000 points", 1000),
+    ("Legend", "Reached 2500 points", 2500),
+)
+# action, amount, share of filler history
+FILLER_ACTIONS = (
+    ("badge_award", 20, 0.2),
+    ("training_completed", 15, 0.3),
+    ("mentoring_session", 10, 0.3),
+    ("reward_redeemed", -50, 0.2),
+)
+
+def user_id(index: int) -> str:
+    return f"user-{index:07d}"
+
+def chunked(rows: Iterator[dict], size: int = CHUNK_SIZE) -> Iterator[List[dict]]:
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def review_periods(years: int, now: datetime) -> List[Tuple[str, datetime]]:
+    """Quarterly periods covering `years` up to the current quarter, with each quarter's end"""
+    current = (now.year, (now.month - 1) // 3 + 1)
+    periods = []
+    for back in range(years * 4 - 1, -1, -1):
+        year, quarter = divmod(current[0] * 4 + current[1] - 1 - back, 4)
+        quarter += 1
+        month = quarter * 3
+        end = datetime(year + (month // 12), month % 12 + 1, 1) - timedelta(seconds=1)
+        periods.append((f"{year} Q{quarter}", min(end, now)))
+    return periods
+
+class Org:
+    """
+    The generated people: teams, roles, hire dates and activity weights.
+    Everything later tables need is kept in flat lists indexed by user.
+    """
+    def __init__(self, rng: random.Random, users: int, years: int, now: datetime):
+        self.size = users
+        self.now = now
+        self.team_of: List[int] = []
+        self.team_members: List[List[int]] = []
+        self.manager_of_team: List[int] = []
+        self.roles: List[str] = []
+        self.hired_at: List[datetime] = []
+        self.active: List[bool] = []
+
+        # Team sizes follow a Pareto law: most teams are small, a few are large
+        while len(self.team_of) < users:
+            team = len(self.team_members)
+            size = min(int(3 * rng.paretovariate(1.6)), 60, users - len(self.team_of))
+            members = list(range(len(self.team_of), len(self.team_of) + size))
+            self.team_members.append(members)
+            self.manager_of_team.append(members[0])
+            self.team_of.extend([team] * size)
+
+        span = years * 365 * 24 * 3600
+        for index in range(users):
+            if index % 1000 == 1:
+                role = UserRole.ADMIN.value
+            elif self.manager_of_team[self.team_of[index]] == index:
+                role = UserRole.MANAGER.value
+            else:
+                role = UserRole.EMPLOYEE.value
+            self.roles.append(role)
+            # Managers skew toward longer tenure, some predating the review history
+            earliest = span * (1.2 if role != UserRole.EMPLOYEE.value else 1.0)
+            self.hired_at.append(now - timedelta(seconds=rng.uniform(0, earliest)))
+            self.active.append(rng.random() > 0.03)
+
+        # Heavy-tailed activity: a few people write most reviews and earn most points
+        weights = [rng.paretovariate(1.2) for _ in range(users)]
+        if any(self.active):
+            # Deactivated people have left, so they get no share of new activity
+            weights = [weight if active else 0.0 for weight, active in zip(weights, self.active)]
+        self.activity_cumulative = list(itertools.accumulate(weights))
+
+    def pick_active_user(self, rng: random.Random) -> int:
+        """An active user, drawn in proportion to their activity weight"""
+        return bisect_right(self.activity_cumulative, rng.random() * self.activity_cumulative[-1])
+
+    def random_time_since_hire(self, rng: random.Random, index: int) -> datetime:
+        start = self.hired_at[index]
+        return start + timedelta(seconds=rng.uniform(0, (self.now - start).total_seconds()))
+
+def user_rows(org: Org, rng: random.Random) -> Iterator[dict]:
+    for index in range(org.size):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "id": user_id(index),
+            "email": f"user{index}@example.com",
+            "full_name": f"{first} {last} {index}",
+            "role": org.roles[index],
+            "is_active": org.active[index],
+            "created_at": org.hired_at[index],
+            "updated_at": org.hired_at[index],
+        }
+
+def employer_review_rows(org: Org, rng: random.Random, periods: Sequence[Tuple[str, datetime]]) -> Iterator[dict]:
+    # Each person has a stable ability that drifts slightly per period
+    ability = [min(max(rng.gauss(3.5, 0.5), 1.5), 4.8) for _ in range(org.size)]
+    for period, ends_at in periods:
+        for index in range(org.size):
+            manager = org.manager_of_team[org.team_of[index]]
+            if manager == index or org.hired_at[index] > ends_at or rng.random() > 0.9:
+                continue
+            base = ability[index] + rng.gauss(0, 0.2)
+            row = {
+                "id": f"er-{period.replace(' ', '')}-{index:07d}",
+                "employee_id": user_id(index),
+                "reviewer_id": user_id(manager),
+                "comments": rng.choice(COMMENTS) if rng.random() < 0.4 else None,
+                "review_period": period,
+                "created_at": ends_at,
+                "updated_at": ends_at,
+            }
+            for field in SCORE_FIELDS:
+                row[field] = round(min(max(base + rng.gauss(0, 0.4), 1.0), 5.0) * 2) / 2
+            yield row
+
+def peer_review_and_transaction_rows(
+    org: Org,
+    rng: random.Random,
+    peer_reviews: int,
+    points: List[int]
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Unique (reviewer, employee) pairs, mostly within the reviewer's team, each
+    followed by the point transactions the API would have written for it
+    """
+    seen = set()
+    written = attempts = 0
+    # A sparse org cannot hold every requested pair; stop instead of spinning
+    max_attempts = peer_reviews * 20
+    while written < peer_reviews and attempts < max_attempts:
+        attempts += 1
+        reviewer = org.pick_active_user(rng)
+        if rng.random() < 0.7:
+            employee = rng.choice(org.team_members[org.team_of[reviewer]])
+        else:
+            employee = org.pick_active_user(rng)
+        pair = reviewer * org.size + employee
+        if employee == reviewer or pair in seen:
+            continue
+        seen.add(pair)
+
+        created_at = org.random_time_since_hire(rng, max(reviewer, employee, key=lambda i: org.hired_at[i]))
+        liked = rng.random() < 0.7
+        review_id = f"pr-{written:08d}"
+        yield "peer_review", {
+            "id": review_id,
+            "reviewer_id": user_id(reviewer),
+            "employee_id": user_id(employee),
+            "liked": liked,
+            "is_anonymous": rng.random() < 0.8,
+            "comments": rng.choice(COMMENTS) if rng.random() < 0.3 else None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        points[reviewer] += 10
+        yield "transaction", {
+            "id": f"tx-{review_id}-r",
+            "user_id": user_id(reviewer),
+            "amount": 10,
+            "action": "peer_review_submitted",
+            "description": f"Submitted peer review for employee {user_id(employee)}",
+            "created_at": created_at,
+        }
+        if liked:
+            points[employee] += 5
+            yield "transaction", {
+                "id": f"tx-{review_id}-e",
+                "user_id": user_id(employee),
+                "amount": 5,
+                "action": "peer_review_received_like",
+                "description": "Received a like in peer review",
+                "created_at": created_at,
+            }
+        written += 1
+
+def filler_transaction_rows(org: Org, rng: random.Random, count: int, points: List[int]) -> Iterator[dict]:
+    actions = [action for action, _, _ in FILLER_ACTIONS]
+    amounts = {action: amount for action, amount, _ in FILLER_ACTIONS}
+    shares = [share for _, _, share in FILLER_ACTIONS]
+    for index in range(count):
+        user = org.pick_active_user(rng)
+        action = rng.choices(actions, weights=shares)[0]
+        points[user] += amounts[action]
+        yield {
+            "id": f"tx-h-{index:09d}",
+            "user_id": user_id(user),
+            "amount": amounts[action],
+            "action": action,
+            "description": action.replace("_", " ").capitalize(),
+            "created_at": org.random_time_since_hire(rng, user),
+        }
+
+def badge_rows(now: datetime) -> List[dict]:
+    return [
+        {
+            "id": f"badge-{index}",
+            "name": name,
+            "description": description,
+            "image_url": None,
+            "points_required": required,
+            "created_at": now,
+        }
+        for index, (name, description, required) in enumerate(BADGES)
+    ]
+
+def user_badge_rows(org: Org, rng: random.Random, points: List[int]) -> Iterator[dict]:
+    for index, total in enumerate(points):
+        for badge, (_, _, required) in enumerate(BADGES):
+            if total < required:
+                break
+            yield {
+                "id": f"ub-{index:07d}-{badge}",
+                "user_id": user_id(index),
+                "badge_id": f"badge-{badge}",
+                "awarded_at": org.random_time_since_hire(rng, index),
+            }
+
+class BulkWriter:
+    """Buffers rows per table and flushes them as multi-row INSERTs"""
+    def __init__(self, db: Session):
+        self.db = db
+        self.buffers: Dict[type, List[dict]] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, model, row: dict):
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= CHUNK_SIZE:
+            self.flush(model)
+
+    def add_all(self, model, rows: Iterator[dict]):
+        for chunk in chunked(rows):
+            self.db.execute(insert(model), chunk)
+            self._count(model, len(chunk))
+
+    def flush(self, model=None):
+        for buffered_model in [model] if model is not None else list(self.buffers):
+            buffer = self.buffers.get(buffered_model)
+            if buffer:
+                self.db.execute(insert(buffered_model), buffer)
+                self._count(buffered_model, len(buffer))
+                self.buffers[buffered_model] = []
+
+    def _count(self, model, rows: int):
+        table = model.__tablename__
+        self.counts[table] = self.counts.get(table, 0) + rows
+
+def argument_error(users: int, years: int, peer_reviews: int, transactions: int) -> Optional[str]:
+    """Why these sizes cannot be generated, or None when they can"""
+    if min(users, years, peer_reviews, transactions) < 0:
+        return "sizes must not be negative"
+    if peer_reviews and users < 2:
+        return "peer reviews need at least 2 users"
+    if transactions and users < 1:
+        return "point transactions need at least 1 user"
+    return None
+
+def seed(
+    db: Session,
+    users: int,
+    years: int = 3,
+    peer_reviews: int = 0,
+    transactions: int = 0,
+    seed_value: int = 42,
+    now: Optional[datetime] = None,
+    report: Callable[[str], None] = lambda message: None,
+) -> Dict[str, int]:
+    """
+    Generate and insert a full dataset, committing table by table.
+    `transactions` is the total point history: the transactions implied by
+    peer reviews come first and filler activity tops it up. Returns rows per table.
+    Raises ValueError for sizes that cannot be generated.
+    """
+    error = argument_error(users, years, peer_reviews, transactions)
+    if error:
+        raise ValueError(error)
+    rng = random.Random(seed_value)
+    now = now or datetime.utcnow().replace(microsecond=0)
+    org = Org(rng, users, years, now)
+    writer = BulkWriter(db)
+    points = [0] * users
+
+    def step(name: str, work: Callable[[], None]):
+        started, before = time.perf_counter(), dict(writer.counts)
+        work()
+        db.commit()
+        added = {table: rows - before.get(table, 0) for table, rows in writer.counts.items() if rows != before.get(table)}
+        report(f"{name:<18} {time.perf_counter() - started:7.1f}s  {added}")
+
+    step("users", lambda: writer.add_all(User, user_rows(org, rng)))
+    step("employer reviews", lambda: writer.add_all(EmployerReview, employer_review_rows(org, rng, review_periods(years, now))))
+
+    def peer_reviews_and_points():
+        for kind, row in peer_review_and_transaction_rows(org, rng, peer_reviews, points):
+            writer.add(PeerReview if kind == "peer_review" else PointsTransaction, row)
+        writer.flush()
+        remaining = transactions - writer.counts.get(PointsTransaction.__tablename__, 0)
+        writer.add_all(PointsTransaction, filler_transaction_rows(org, rng, max(remaining, 0), points))
+    step("peer reviews", peer_reviews_and_points)
+
+    def badges():
+        writer.add_all(Badge, iter(badge_rows(now)))
+        writer.add_all(UserBadge, user_badge_rows(org, rng, points))
+    step("badges", badges)
+
+    step("review rollups", lambda: rebuild_rollups(db))
+    return writer.counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic organization dataset")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--years", type=int, default=3, help="Years of quarterly review history")
+    parser.add_argument("--peer-reviews", type=int, default=50000)
+    parser.add_argument("--transactions", type=int, default=100000, help="Total point transactions")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="Defaults to the application database")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate every table first")
+    args = parser.parse_args()
+    error = argument_error(args.users, args.years, args.peer_reviews, args.transactions)
+    if error:
+        parser.error(error)
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from ..db import Base, get_engine
+
+    engine = create_engine(args.database_url) if args.database_url else get_engine()
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    started = time.perf_counter()
+    try:
+        counts = seed(
+            db,
+            users=args.users,
+            years=args.years,
+            peer_reviews=args.peer_reviews,
+            transactions=args.transactions,
+            seed_value=args.seed,
+            report=print,
+        )
+    finally:
+        db.close()
+    total = sum(counts.values())
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Fast response path for list endpoints.
+
+Rows are built straight from column tuples of trusted DB data, which skips the
+per-attribute orm_mode hydration and re-validation that response_model does,
+and are encoded once with orjson. Routes keep their response_model for the
+OpenAPI schema; returning a Response directly bypasses it at runtime.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query
+from fastapi.responses import ORJSONResponse
+
+# Query parameter shared by every route that supports sparse fieldsets
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated response fields, e.g. `id,full_name`. `id` is always included.",
+)
+
+def rows_to_dicts(rows: Iterable) -> List[Dict[str, Any]]:
+    """
+    Convert SQLAlchemy Row tuples into plain dicts keyed by column label
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+def row_to_dict(row) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+    return dict(zip(row._fields, row))
+
+def fast_response(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """
+    Encode already-shaped content with orjson, without response_model validation
+    """
+    return ORJSONResponse(content=content, status_code=status_code, headers=headers)
+
+def select_fields(fields: Optional[str], columns: Sequence, always: Sequence[str] = ("id",)) -> Tuple:
+    """
+    Resolve a `fields=` parameter to the subset of `columns` to select.
+
+    The query then reads, and the response carries, only those columns. Order
+    follows `columns`; an unknown name is a 400 listing the allowed fields.
+    """
+    if not fields:
+        return tuple(columns)
+
+    by_name = {column.key: column for column in columns}
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested - set(by_name))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(by_name)}"
+        )
+
+    requested.update(always)
+    return tuple(column for name, column in by_name.items() if name in requested)
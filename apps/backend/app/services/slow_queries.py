@@ -0,0 +1,193 @@
+"""
+Slow-query log with captured plans.
+
+Statements that take longer than SLOW_QUERY_THRESHOLD_MS are recorded with
+their duration, the shape of their parameters (types, never values), the
+route that ran them and, on PostgreSQL and SQLite, the plan from EXPLAIN.
+The plan is fetched on a separate DBAPI cursor of the same connection, so
+it sees the same transaction and none of the engine events fire for it; each
+statement shape is explained at most once per SLOW_QUERY_EXPLAIN_TTL, with
+plans for the SLOW_QUERY_PLAN_CACHE_SIZE most recent shapes cached. The
+last SLOW_QUERY_LOG_SIZE entries are kept in memory for
+GET /admin/slow-queries.
+
+Unlike SQL_ECHO this costs one clock read per statement until something is
+actually slow.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .query_budget import current_tracker, statement_shape
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200")) / 1000
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_EXPLAIN_TTL = float(os.getenv("SLOW_QUERY_EXPLAIN_TTL_SECONDS", "300"))
+SLOW_QUERY_PLAN_CACHE_SIZE = int(os.getenv("SLOW_QUERY_PLAN_CACHE_SIZE", "500"))
+MAX_STATEMENT_LENGTH = 4000
+
+# Plain EXPLAIN never runs the statement; ANALYZE would run it a second time
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+def parameters_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Parameter names or positions mapped to type names, without the values"""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "each": parameters_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+def explain(dbapi_connection, dialect_name: str, statement: str, parameters) -> Optional[List[str]]:
+    """
+    The plan of `statement`, one line per row, or None when it cannot be explained
+    """
+    prefix = EXPLAIN_PREFIXES.get(dialect_name)
+    if prefix is None or not statement.lstrip()[:6].upper().startswith(EXPLAINABLE):
+        return None
+
+    cursor = dbapi_connection.cursor()
+    savepoint = dialect_name == "postgresql"
+    try:
+        # A failed statement aborts the whole transaction on PostgreSQL
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = [" ".join(str(value) for value in row) for row in cursor.fetchall()]
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    except Exception as e:
+        logger.debug("EXPLAIN failed: %s", e)
+        return None
+    finally:
+        cursor.close()
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        max_size: int = SLOW_QUERY_LOG_SIZE,
+        threshold: float = SLOW_QUERY_THRESHOLD,
+        max_plans: int = SLOW_QUERY_PLAN_CACHE_SIZE
+    ):
+        self.threshold = threshold
+        self.max_plans = max_plans
+        self._entries: deque = deque(maxlen=max_size)
+        # Statement shape -> (plan, when it was captured), least recently used first
+        self._plans: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cached_plan(self, shape: str) -> Optional[tuple]:
+        with self._lock:
+            cached = self._plans.get(shape)
+            if cached is None:
+                return None
+            if time.monotonic() - cached[1] >= SLOW_QUERY_EXPLAIN_TTL:
+                del self._plans[shape]
+                return None
+            self._plans.move_to_end(shape)
+            return cached
+
+    def cache_plan(self, shape: str, plan: Optional[List[str]]):
+        with self._lock:
+            self._plans[shape] = (plan, time.monotonic())
+            self._plans.move_to_end(shape)
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+
+    def record(self, conn, statement: str, parameters, executemany: bool, duration: float):
+        shape = statement_shape(statement)
+        cached = self.cached_plan(shape)
+        if cached:
+            plan = cached[0]
+        elif SLOW_QUERY_EXPLAIN and not executemany:
+            plan = explain(conn.connection.dbapi_connection, conn.dialect.name, statement, parameters)
+            self.cache_plan(shape, plan)
+        else:
+            plan = None
+
+        entry = {
+            "at": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration * 1000, 2),
+            "statement": statement[:MAX_STATEMENT_LENGTH],
+            "parameters": parameters_shape(parameters, executemany),
+            # The tracker's label becomes the route template once the request ends
+            "tracker": current_tracker(),
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+        logger.warning("Slow query (%.1f ms): %s", duration * 1000, shape[:200])
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        """Newest first"""
+        with self._lock:
+            entries = list(self._entries)
+        entries.reverse()
+        return [
+            {
+                **{key: value for key, value in entry.items() if key != "tracker"},
+                "route": entry["tracker"].label if entry["tracker"] else None,
+            }
+            for entry in entries[:limit]
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+slow_query_log = SlowQueryLog()
+
+_engine_events_installed = False
+
+def install():
+    """
+    Time every statement on every Engine and record the slow ones.
+    Safe to call more than once.
+    """
+    global _engine_events_installed
+    if _engine_events_installed:
+        return
+    _engine_events_installed = True
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("slow_query_started_at")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        if duration >= slow_query_log.threshold:
+            slow_query_log.record(conn, statement, parameters, executemany, duration)
+
+    @event.listens_for(Engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        started = connection.info.get("slow_query_started_at") if connection is not None else None
+        if started:
+            started.pop()
@@ -0,0 +1,104 @@
+"""
+Payload size and compression CPU cost for the large mobile list routes.
+
+    python -m benchmarks.compression --users 2000 --transactions 5000
+
+Bodies are produced by the real route handlers against an in-memory SQLite
+database, then compressed with the same compressors CompressionMiddleware uses.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from app.db import Base
+from app.middleware.compression import BrotliCompressor, GzipCompressor, brotli
+from app.models.user import User
+from app.models.points import PointsTransaction
+from app.routers.points import get_leaderboard, get_user_points
+from app.routers.users import get_all_users
+
+ACTIONS = ("peer_review_submitted", "peer_review_received_like", "badge_award")
+
+def seed(db, users: int, transactions: int):
+    now = datetime.utcnow()
+    db.execute(insert(User), [
+        {
+            "id": f"user-{i:07d}",
+            "email": f"user{i}@example.com",
+            "full_name": f"User Number {i}",
+            "role": "employee",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(users)
+    ])
+    rng = random.Random(42)
+    rows = []
+    for i in range(transactions):
+        # Half of the history belongs to the first user, the heavy profile
+        user = 0 if i % 2 else rng.randrange(users)
+        rows.append({
+            "id": f"tx-{i:08d}",
+            "user_id": f"user-{user:07d}",
+            "amount": rng.choice((5, 10)),
+            "action": rng.choice(ACTIONS),
+            "description": f"Submitted peer review for employee user-{rng.randrange(users):07d}",
+            "created_at": now - timedelta(minutes=i),
+        })
+    db.execute(insert(PointsTransaction), rows)
+    db.commit()
+
+def measure(compressor_factory, body: bytes, repeat: int):
+    timings, size = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        compressor = compressor_factory()
+        size = len(compressor.compress(body) + compressor.finish())
+        timings.append(time.perf_counter() - start)
+    return size, statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    seed(db, args.users, args.transactions)
+    viewer = db.query(User).first()
+    request = Request({"type": "http", "headers": []})
+
+    routes = {
+        "/users": get_all_users(request=request, db=db, current_user=viewer),
+        "/points/{user_id}": get_user_points(user_id=viewer.id, db=db, current_user=viewer),
+        "/points/leaderboard?limit=100": get_leaderboard(request=request, db=db, current_user=viewer, limit=100),
+    }
+    compressors = {"gzip": lambda: GzipCompressor(args.gzip_level)}
+    if brotli is not None:
+        compressors["br"] = lambda: BrotliCompressor(args.brotli_quality)
+
+    print(f"{'route':<32}{'raw':>10}  " + "  ".join(f"{name:>22}" for name in compressors))
+    for route, handler in routes.items():
+        body = asyncio.run(handler).body
+        cells = []
+        for factory in compressors.values():
+            size, seconds = measure(factory, body, args.repeat)
+            cells.append(f"{size:>8} B {size / len(body):4.0%} {seconds * 1000:5.2f}ms")
+        print(f"{route:<32}{len(body):>8} B  " + "  ".join(f"{cell:>22}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
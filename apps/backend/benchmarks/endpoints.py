@@ -0,0 +1,251 @@
+"""
+Latency and throughput of the hot endpoints against a seeded dataset.
+
+    python -m benchmarks.endpoints --users 10000 --transactions 100000 --peer-reviews 50000
+    python -m benchmarks.endpoints --database-url postgresql://... \\
+        --users 100000 --transactions 1000000 --peer-reviews 500000 --save-baseline bench.json
+    python -m benchmarks.endpoints ... --baseline bench.json
+
+Requests go through the full ASGI app (middleware, dependencies, serialization)
+in-process, with get_db bound to the benchmark database. Each scenario reports
+p50/p95/p99 latency and throughput. With --baseline, p95 latencies are compared
+to a stored run and the exit status is 1 when any scenario regressed by more
+than --tolerance.
+
+Rate limits are off, since every request comes from the one test client, and
+the response cache is emptied before each request so the endpoint itself is
+measured. Pass --response-cache to measure cache hits instead; the mode is
+saved with the results and compared against the baseline's.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base, get_db, get_session_factory
+from app.main import app
+from app.models.user import User
+from app.routers import auth
+from app.services import rate_limit
+from app.services.cache import response_cache
+from app.services.seed import seed, user_id
+
+# Reviewers created for the peer review scenario, fresh for every run so each
+# review it posts is new even against a --reuse database
+BENCH_REVIEWER = "bench-reviewer-{run}-{index}"
+
+def add_bench_reviewers(session_factory, run: str, count: int):
+    rows = []
+    for i in range(count):
+        reviewer = BENCH_REVIEWER.format(run=run, index=i)
+        rows.append({"id": reviewer, "email": f"{reviewer}@example.com", "full_name": f"Bench Reviewer {i}"})
+    db = session_factory()
+    try:
+        db.execute(insert(User), rows)
+        db.commit()
+    finally:
+        db.close()
+
+def percentile(quantiles: List[float], p: int) -> float:
+    return quantiles[p - 1]
+
+def run_scenario(
+    request: Callable[[int], int],
+    requests: int,
+    concurrency: int,
+    before: Optional[Callable[[], None]] = None
+) -> Dict[str, float]:
+    """
+    Issue `requests` calls of `request(i)`, which returns a status code,
+    each preceded by an untimed call of `before`
+    """
+    def timed(i: int):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        status = request(i)
+        return time.perf_counter() - started, status
+
+    # One untimed call warms caches that a long-running server would already have
+    request(0)
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, range(1, requests + 1)))
+    else:
+        results = [timed(i) for i in range(1, requests + 1)]
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in results]
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50_ms": percentile(quantiles, 50) * 1000,
+        "p95_ms": percentile(quantiles, 95) * 1000,
+        "p99_ms": percentile(quantiles, 99) * 1000,
+        "throughput_rps": requests / elapsed,
+        "errors": sum(1 for _, status in results if status >= 400),
+    }
+
+def build_scenarios(client: TestClient, users: int, run: str) -> Dict[str, Callable[[int], int]]:
+    rng = random.Random(7)
+    headers_for = lambda email: {"Authorization": f"Bearer {auth.create_access_token({'sub': email})}"}
+    viewer_headers = headers_for("user1@example.com")
+
+    def snapshot(i: int) -> int:
+        with client.websocket_connect("/realtime/likes") as websocket:
+            websocket.receive_json()
+        return 200
+
+    def create_peer_review(i: int) -> int:
+        # This run's bench reviewers have no reviews yet, so every pair is new
+        reviewer = BENCH_REVIEWER.format(run=run, index=i)
+        response = client.post(
+            "/reviews/peer",
+            json={"employee_id": user_id(rng.randrange(users)), "liked": True},
+            headers=headers_for(f"{reviewer}@example.com")
+        )
+        return response.status_code
+
+    return {
+        "token validation (GET /auth/user)": lambda i: client.get("/auth/user", headers=viewer_headers).status_code,
+        "GET /users": lambda i: client.get("/users", headers=viewer_headers).status_code,
+        "GET /points/leaderboard": lambda i: client.get("/points/leaderboard", headers=viewer_headers).status_code,
+        "GET /points/{user_id}": lambda i: client.get(
+            f"/points/{user_id(rng.randrange(users))}", headers=viewer_headers
+        ).status_code,
+        "POST /reviews/peer": create_peer_review,
+        "WS /realtime/likes snapshot": snapshot,
+    }
+
+def compare(results: Dict[str, dict], baseline: dict, tolerance: float) -> bool:
+    """Print p95 deltas against `baseline`; True when nothing regressed"""
+    ok = True
+    if baseline.get("dataset") != results["dataset"]:
+        print(f"warning: baseline dataset {baseline.get('dataset')} differs from {results['dataset']}")
+    if baseline.get("response_cache", False) != results["response_cache"]:
+        print(f"warning: baseline response cache {baseline.get('response_cache', False)} "
+              f"differs from {results['response_cache']}")
+    print(f"\n{'scenario':<36}{'baseline p95':>14}{'p95':>10}{'change':>9}")
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            print(f"{name:<36}{'-':>14}{current['p95_ms']:>8.2f}ms{'new':>9}")
+            continue
+        change = current["p95_ms"] / previous["p95_ms"] - 1
+        regressed = change > tolerance
+        ok = ok and not regressed
+        marker = "  REGRESSED" if regressed else ""
+        print(f"{name:<36}{previous['p95_ms']:>12.2f}ms{current['p95_ms']:>8.2f}ms{change:>+8.0%}{marker}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite://", help="Defaults to an in-memory SQLite database")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--transactions", type=int, default=100000)
+    parser.add_argument("--peer-reviews", type=int, default=50000)
+    parser.add_argument("--years", type=int, default=3, help="Years of review history")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reuse", action="store_true", help="Skip seeding when the database already has users")
+    parser.add_argument("--requests", type=int, default=100, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--only", action="append", help="Run scenarios whose name contains this text")
+    parser.add_argument("--response-cache", action="store_true", help="Keep the response cache on and time cache hits")
+    parser.add_argument("--baseline", help="Compare against results saved with --save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown, 0.2 = 20%%")
+    parser.add_argument("--save-baseline", help="Write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    if args.database_url == "sqlite://":
+        engine = create_engine(args.database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    elif args.database_url.startswith("sqlite"):
+        engine = create_engine(args.database_url, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(args.database_url, pool_size=max(5, args.concurrency))
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = session_factory()
+    seeded = db.query(func.count(User.id)).scalar()
+    db.close()
+    if not (args.reuse and seeded):
+        started = time.perf_counter()
+        db = session_factory()
+        try:
+            seed(
+                db,
+                users=args.users,
+                years=args.years,
+                peer_reviews=args.peer_reviews,
+                transactions=args.transactions,
+                seed_value=args.seed,
+            )
+        finally:
+            db.close()
+        print(f"Seeded {args.users} users, {args.transactions} transactions, "
+              f"{args.peer_reviews} peer reviews in {time.perf_counter() - started:.1f}s")
+    run = uuid.uuid4().hex[:8]
+    add_bench_reviewers(session_factory, run, args.requests + 1)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    if auth.SECRET_KEY is None:
+        auth.SECRET_KEY = "benchmark-only-secret-not-for-production"
+    # All traffic shares the test client's address, which would soon hit the per-IP limits
+    rate_limit.RATE_LIMIT_ENABLED = False
+    before = None if args.response_cache else response_cache.clear
+
+    client = TestClient(app)
+    results = {
+        "dataset": {
+            "users": args.users,
+            "years": args.years,
+            "transactions": args.transactions,
+            "peer_reviews": args.peer_reviews,
+        },
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "response_cache": args.response_cache,
+        "scenarios": {},
+    }
+    print(f"response cache: {'on, timing hits' if args.response_cache else 'off'}")
+    print(f"{'scenario':<36}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}{'errors':>8}")
+    for name, request in build_scenarios(client, args.users, run).items():
+        if args.only and not any(text in name for text in args.only):
+            continue
+        stats = run_scenario(request, args.requests, args.concurrency, before)
+        results["scenarios"][name] = stats
+        print(f"{name:<36}{stats['p50_ms']:>8.2f}ms{stats['p95_ms']:>8.2f}ms{stats['p99_ms']:>8.2f}ms"
+              f"{stats['throughput_rps']:>10.1f}{stats['errors']:>8}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare today's orm_mode serialization of GET /users with the column-tuple fast path.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 20
+
+Both paths run the same query against an in-memory SQLite database. The orm_mode
+path mirrors what FastAPI does for response_model=List[UserOut]: validate each ORM
+object into the model, run jsonable_encoder, then json.dumps. The fast path builds
+dicts from column tuples and encodes them once with orjson.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import parse_obj_as
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base
+from app.models.user import User, UserOut, USER_OUT_COLUMNS
+from app.services.serialization import rows_to_dicts
+
+def seed(session_factory, rows: int):
+    db = session_factory()
+    now = datetime.utcnow()
+    db.execute(insert(User), [
+        {
+            "id": f"user-{i:07d}",
+            "email": f"user{i}@example.com",
+            "full_name": f"User {i}",
+            "role": "employee",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    db.close()
+
+def orm_mode_path(db) -> bytes:
+    users = db.query(User).filter(User.is_active == True).all()
+    validated = parse_obj_as(List[UserOut], users)
+    return JSONResponse(content=jsonable_encoder(validated)).body
+
+def fast_path(db) -> bytes:
+    users = db.query(*USER_OUT_COLUMNS).filter(User.is_active == True).all()
+    return ORJSONResponse(content=rows_to_dicts(users)).body
+
+def measure(session_factory, func, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        db = session_factory()
+        start = time.perf_counter()
+        func(db)
+        timings.append(time.perf_counter() - start)
+        db.close()
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    seed(session_factory, args.rows)
+
+    # Both paths must produce the same document
+    db = session_factory()
+    assert json.loads(orm_mode_path(db)) == json.loads(fast_path(db))
+    db.close()
+
+    print(f"GET /users with {args.rows} rows, {args.repeat} runs")
+    results = {}
+    for name, func in (("orm_mode", orm_mode_path), ("fast_path", fast_path)):
+        timings = measure(session_factory, func, args.repeat)
+        results[name] = statistics.median(timings)
+        print(f"  {name:<10} median {results[name] * 1000:8.2f} ms   min {min(timings) * 1000:8.2f} ms")
+    print(f"  speedup    {results['orm_mode'] / results['fast_path']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -31,8 +31,13 @@ setup(
         "httpx",
         "pydantic",
         "alembic",
-        "PyJWT",
+        "PyJWT[crypto]",
+        "numpy",
+        "orjson",
     ],
+    extras_require={
+        "brotli": ["brotli"],
+    },
     include_package_data=True,
     python_requires=">=3.8",
 )
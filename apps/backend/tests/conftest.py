@@ -18,12 +18,39 @@ from app.db import Base, get_db
 from app.main import app
 from app.models.user import User, UserRole
 from app.routers.auth import SECRET_KEY, ALGORITHM
+from app.services import query_budget
+from app.services.cache import response_cache
+from app.services.rate_limit import rate_limit_backend
 
 # Setup test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    # Cached bodies must not leak between tests that reuse user ids
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    # Every test starts with full token buckets
+    rate_limit_backend.clear()
+    yield
+    rate_limit_backend.clear()
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(monkeypatch):
+    # Routes that run more statements than their @query_budget fail the test
+    monkeypatch.setattr(query_budget, "QUERY_BUDGET_STRICT", True)
+
+@pytest.fixture(autouse=True)
+def disable_scheduler(monkeypatch):
+    # Lifespans in tests must not start jobs or contend for the leader lock
+    monkeypatch.setattr("app.main.SCHEDULER_ENABLED", False)
+
 @pytest.fixture(scope="function")
 def db():
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,145 @@
+import pytest
+
+from app.models.user import UserRole
+from app.models.review import EmployerReview, SCORE_FIELDS
+from app.services.rollups import apply_review
+
+@pytest.fixture
+def add_review(db):
+    def _add_review(employee, reviewer, score, period="2023 Q1"):
+        review = EmployerReview(
+            employee_id=employee.id,
+            reviewer_id=reviewer.id,
+            review_period=period,
+            **{field: score for field in SCORE_FIELDS}
+        )
+        db.add(review)
+        db.flush()
+        apply_review(db, review)
+        db.commit()
+        return review
+    return _add_review
+
+class TestReviewAnalytics:
+    def test_org_stats(self, client, create_user, auth_headers, add_review):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        employee = create_user("employee@example.com", "Employee")
+        for score in (2.0, 3.0, 4.0):
+            add_review(employee, manager, score)
+        
+        response = client.get("/analytics/reviews/org", headers=auth_headers(manager.email))
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["review_count"] == 3
+        performance = body["scores"]["performance_score"]
+        assert performance["mean"] == 3.0
+        assert performance["percentiles"]["p50"] == 3.0
+        assert performance["distribution"] == {"1": 0, "2": 1, "3": 1, "4": 1, "5": 0}
+    
+    def test_half_points_round_up(self, client, create_user, auth_headers, add_review):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        employee = create_user("employee@example.com", "Employee")
+        for score in (2.5, 3.5):
+            add_review(employee, manager, score)
+        
+        response = client.get("/analytics/reviews/org", headers=auth_headers(manager.email))
+        
+        distribution = response.json()["scores"]["performance_score"]["distribution"]
+        assert distribution == {"1": 0, "2": 0, "3": 1, "4": 1, "5": 0}
+    
+    def test_period_deltas(self, client, create_user, auth_headers, add_review):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        employee = create_user("employee@example.com", "Employee")
+        add_review(employee, manager, 3.0, "2023 Q1")
+        add_review(employee, manager, 4.5, "2023 Q2")
+        
+        response = client.get(
+            f"/analytics/reviews/employees/{employee.id}",
+            headers=auth_headers(employee.email)
+        )
+        
+        assert response.status_code == 200
+        periods = response.json()["periods"]
+        assert [p["review_period"] for p in periods] == ["2023 Q1", "2023 Q2"]
+        assert periods[0]["deltas"]["teamwork_score"] is None
+        assert periods[1]["deltas"]["teamwork_score"] == 1.5
+        assert periods[1]["variances"]["teamwork_score"] == 0.0
+    
+    def test_org_periods_from_rollups(self, client, create_user, auth_headers, add_review):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        first = create_user("first@example.com", "First")
+        second = create_user("second@example.com", "Second")
+        add_review(first, manager, 3.0)
+        add_review(second, manager, 5.0)
+        
+        response = client.get("/analytics/reviews/periods", headers=auth_headers(manager.email))
+        
+        assert response.status_code == 200
+        [period] = response.json()
+        assert period["review_count"] == 2
+        assert period["means"]["performance_score"] == 4.0
+        assert period["variances"]["performance_score"] == 1.0
+    
+    def test_org_stats_requires_manager(self, client, create_user, auth_headers):
+        employee = create_user("employee@example.com", "Employee")
+        
+        response = client.get("/analytics/reviews/org", headers=auth_headers(employee.email))
+        
+        assert response.status_code == 403
+
+class TestReviewRollups:
+    def review_payload(self, employee, score, period="2023 Q1"):
+        payload = {field: score for field in SCORE_FIELDS}
+        payload.update(employee_id=employee.id, review_period=period)
+        return payload
+
+    def test_create_review_updates_rollup(self, client, create_user, auth_headers):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        employee = create_user("employee@example.com", "Employee")
+        headers = auth_headers(manager.email)
+        for score in (2.0, 4.0):
+            client.post("/reviews/employer", json=self.review_payload(employee, score), headers=headers)
+        
+        response = client.get(
+            f"/analytics/reviews/employees/{employee.id}/periods/2023 Q1",
+            headers=headers
+        )
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["review_count"] == 2
+        assert body["scores"]["leadership_score"] == {"count": 2, "mean": 3.0, "variance": 1.0}
+    
+    def test_rebuild_matches_incremental(self, db, create_user, add_review):
+        from app.models.review import EmployerReviewRollup
+        from app.services.rollups import rebuild_rollups, rollup_stats
+        
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        employee = create_user("employee@example.com", "Employee")
+        for score in (1.0, 2.0, 3.0):
+            add_review(employee, manager, score)
+        
+        assert rebuild_rollups(db) == 1
+        db.commit()
+        
+        rollup = db.query(EmployerReviewRollup).one()
+        assert rollup.review_count == 3
+        assert rollup_stats(rollup)["technical_score"]["mean"] == 2.0
+        assert rollup_stats(rollup)["technical_score"]["variance"] == round(2 / 3, 4)
+    
+    def test_rebuild_excludes_incremental_writers_on_postgres(self):
+        from unittest.mock import MagicMock
+        from app.services.rollups import ROLLUP_LOCK_ID, lock_rollups
+        
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        lock_rollups(db, exclusive=True)
+        lock_rollups(db)
+        
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert statements == [
+            "SELECT pg_advisory_xact_lock(:lock_id)",
+            "SELECT pg_advisory_xact_lock_shared(:lock_id)",
+        ]
+        assert db.execute.call_args.args[1] == {"lock_id": ROLLUP_LOCK_ID}
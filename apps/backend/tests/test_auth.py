@@ -98,6 +98,17 @@ class TestAuth:
         assert "token_type" in response.json()
         assert response.json()["token_type"] == "bearer"
     
+    @patch("app.routers.auth.cognito_client")
+    def test_login_rejected_by_cognito(self, mock_cognito, client):
+        from botocore.exceptions import ClientError
+        
+        mock_cognito.initiate_auth.side_effect = ClientError(
+            {"Error": {"Code": "NotAuthorizedException"}}, "InitiateAuth"
+        )
+        
+        response = client.post("/auth/login", data={"username": "test@example.com", "password": "wrong"})
+        assert response.status_code == 401
+    
     def test_get_current_user(self, client, test_token, test_user):
         response = client.get(
             "/auth/user",
@@ -0,0 +1,73 @@
+import time
+
+from app.models.user import UserRole
+from app.models.peer_review import PeerReview
+from app.services.cache import MemoryBackend, ResponseCache
+
+class TestMemoryBackend:
+    def test_lru_eviction(self):
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", b"1", ttl=60, tags=[])
+        backend.set("b", b"2", ttl=60, tags=[])
+        backend.get("a")
+        backend.set("c", b"3", ttl=60, tags=[])
+        
+        assert backend.get("a") == b"1"
+        assert backend.get("b") is None
+        assert backend.get("c") == b"3"
+    
+    def test_ttl_expiry(self):
+        backend = MemoryBackend()
+        backend.set("a", b"1", ttl=0.01, tags=[])
+        time.sleep(0.02)
+        
+        assert backend.get("a") is None
+        assert len(backend) == 0
+    
+    def test_tag_invalidation(self):
+        backend = MemoryBackend()
+        backend.set("a", b"1", ttl=60, tags=["points:1"])
+        backend.set("b", b"2", ttl=60, tags=["points:1", "points:2"])
+        backend.set("c", b"3", ttl=60, tags=["points:2"])
+        backend.invalidate_tags(["points:1"])
+        
+        assert backend.get("a") is None
+        assert backend.get("b") is None
+        assert backend.get("c") == b"3"
+    
+    def test_key_depends_on_visibility(self):
+        regular = ResponseCache.key("peer_reviews_me", {"user_id": "1"}, "regular")
+        privileged = ResponseCache.key("peer_reviews_me", {"user_id": "1"}, "privileged")
+        
+        assert regular != privileged
+
+class TestResponseCaching:
+    def test_peer_review_invalidates_cached_points(self, client, create_user, auth_headers):
+        reviewer = create_user("reviewer@example.com", "Reviewer")
+        employee = create_user("employee@example.com", "Employee")
+        
+        response = client.get(f"/points/{employee.id}", headers=auth_headers(employee.email))
+        assert response.json()["total_points"] == 0
+        
+        client.post(
+            "/reviews/peer",
+            json={"employee_id": employee.id, "liked": True},
+            headers=auth_headers(reviewer.email)
+        )
+        
+        response = client.get(f"/points/{employee.id}", headers=auth_headers(employee.email))
+        assert response.json()["total_points"] == 5
+    
+    def test_inbox_cached_per_visibility_class(self, client, db, create_user, auth_headers):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        employee = create_user("employee@example.com", "Employee")
+        db.add(PeerReview(employee_id=manager.id, reviewer_id=employee.id, liked=True, is_anonymous=True))
+        db.add(PeerReview(employee_id=employee.id, reviewer_id=manager.id, liked=True, is_anonymous=True))
+        db.commit()
+        
+        for _ in range(2):
+            mine = client.get("/reviews/peer/me", headers=auth_headers(employee.email)).json()
+            assert mine[0]["reviewer_id"] is None
+            
+            theirs = client.get("/reviews/peer/me", headers=auth_headers(manager.email)).json()
+            assert theirs[0]["reviewer_id"] == employee.id
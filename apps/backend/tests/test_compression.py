@@ -0,0 +1,96 @@
+import gzip
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding, skip_compression
+from app.services.etag import make_etag, not_modified_response
+from app.services.serialization import fast_response
+
+PAYLOAD = [{"id": f"user-{i}", "full_name": f"User {i}"} for i in range(200)]
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, exclude_paths=["/excluded"])
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/excluded")
+    async def excluded():
+        return PAYLOAD
+
+    @app.get("/opt-out", dependencies=[Depends(skip_compression)])
+    async def opt_out():
+        return PAYLOAD
+
+    @app.get("/tagged")
+    async def tagged(request: Request):
+        etag = make_etag("tagged")
+        return not_modified_response(request, etag) or fast_response(PAYLOAD, headers={"ETag": etag})
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((f"line {i}\n" * 50 for i in range(10)), media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+class TestCompression:
+    def test_large_body_is_gzipped(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert response.json() == PAYLOAD
+    
+    def test_small_body_is_not_compressed(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        
+        assert "content-encoding" not in response.headers
+    
+    def test_opt_outs(self, client):
+        for path in ("/excluded", "/opt-out"):
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+            assert response.json() == PAYLOAD
+    
+    def test_streaming_body_is_gzipped(self, client):
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == "".join(f"line {i}\n" * 50 for i in range(10))
+    
+    def test_negotiation(self, monkeypatch):
+        monkeypatch.setattr(compression, "brotli", object())
+        assert negotiate_encoding("gzip, deflate, br") == "br"
+        assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+        assert negotiate_encoding("identity") is None
+        
+        monkeypatch.setattr(compression, "brotli", None)
+        assert negotiate_encoding("br") is None
+        assert negotiate_encoding("*") == "gzip"
+    
+    def test_compressed_etag_is_per_encoding(self, client):
+        identity = client.get("/tagged", headers={"Accept-Encoding": "identity"})
+        gzipped = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        
+        assert gzipped.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+        
+        revalidated = client.get(
+            "/tagged",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == gzipped.headers["etag"]
+        weak = client.get("/tagged", headers={"If-None-Match": "W/" + identity.headers["etag"]})
+        assert weak.status_code == 304
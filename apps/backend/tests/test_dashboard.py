@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.db import get_session_factory
+from app.main import app
+from app.models.peer_review import PeerReview
+from app.models.points import PointsTransaction
+from app.routers import me
+
+@pytest.fixture
+def dashboard_client(client, db):
+    # Concurrent sections open their own sessions on the test database
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(bind=db.get_bind())
+    return client
+
+class TestDashboard:
+    def test_dashboard_sections(self, dashboard_client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        peer = create_user("peer@example.com", "Peer")
+        db.add(PeerReview(employee_id=user.id, reviewer_id=peer.id, liked=True, is_anonymous=True))
+        db.add(PointsTransaction(user_id=user.id, amount=5, action="peer_review_received_like"))
+        db.commit()
+        
+        response = dashboard_client.get("/me/dashboard", headers=auth_headers(user.email))
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["partial"] is False
+        assert body["profile"]["id"] == user.id
+        assert body["points"]["total_points"] == 5
+        assert body["badges"] == []
+        assert body["like_count"] == 1
+        assert body["latest_peer_reviews"][0]["reviewer_id"] is None
+        assert body["latest_employer_reviews"] == []
+    
+    def test_slow_section_returns_partial_result(self, dashboard_client, create_user, auth_headers, monkeypatch):
+        user = create_user("employee@example.com", "Employee")
+        release = threading.Event()
+        
+        def slow_badges(db, user_id, role):
+            release.wait(5)
+            return []
+        
+        # Only the blocked section gets a short timeout; the others keep the default
+        monkeypatch.setitem(me.SECTIONS, "badges", slow_badges)
+        monkeypatch.setitem(me.SECTION_TIMEOUTS, "badges", 0.1)
+        
+        try:
+            response = dashboard_client.get("/me/dashboard", headers=auth_headers(user.email))
+        finally:
+            release.set()
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["partial"] is True
+        assert body["errors"] == {"badges": "timeout"}
+        assert body["badges"] is None
+        assert body["like_count"] == 0
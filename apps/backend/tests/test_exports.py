@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from app.models.user import UserRole
+from app.models.peer_review import PeerReview
+from app.models.points import PointsTransaction
+
+class TestExports:
+    def test_peer_review_export_masks_anonymous_reviewers(self, client, db, create_user, auth_headers):
+        admin = create_user("admin@example.com", "Admin", UserRole.ADMIN)
+        employee = create_user("employee@example.com", "Employee")
+        db.add_all([
+            PeerReview(employee_id=employee.id, reviewer_id=admin.id, liked=True, is_anonymous=True),
+            PeerReview(employee_id=admin.id, reviewer_id=employee.id, liked=False, is_anonymous=False),
+        ])
+        db.commit()
+        
+        response = client.get("/admin/exports/peer-reviews", headers=auth_headers(admin.email))
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        reviewers = {row["employee_id"]: row["reviewer_id"] for row in rows}
+        assert reviewers == {employee.id: None, admin.id: employee.id}
+        
+        response = client.get(
+            "/admin/exports/peer-reviews?reveal_anonymous=true",
+            headers=auth_headers(admin.email)
+        )
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert {row["reviewer_id"] for row in rows} == {admin.id, employee.id}
+    
+    def test_points_export_as_csv(self, client, db, create_user, auth_headers):
+        admin = create_user("admin@example.com", "Admin", UserRole.ADMIN)
+        db.add(PointsTransaction(user_id=admin.id, amount=10, action="peer_review_submitted"))
+        db.commit()
+        
+        response = client.get(
+            "/admin/exports/points-transactions?format=csv",
+            headers=auth_headers(admin.email)
+        )
+        
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["amount"] == "10"
+        assert rows[0]["action"] == "peer_review_submitted"
+    
+    def test_exports_require_admin(self, client, create_user, auth_headers):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        
+        response = client.get("/admin/exports/employer-reviews", headers=auth_headers(manager.email))
+        
+        assert response.status_code == 403
+    
+    def test_abandoned_stream_closes_result(self, db, create_user, monkeypatch):
+        from sqlalchemy import select
+        from app.models.user import User
+        from app.routers.admin import ExportFormat, stream_export
+        create_user("employee@example.com", "Employee")
+        results = []
+        execute = db.execute
+        
+        def spy(*args, **kwargs):
+            results.append(execute(*args, **kwargs))
+            return results[-1]
+        monkeypatch.setattr(db, "execute", spy)
+        
+        stream = stream_export(db, select(User.id), ExportFormat.NDJSON)
+        next(stream)
+        stream.close()
+        
+        assert results[0].closed
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+import app.main as main
+from app.db import get_db
+from app.main import app
+
+# Cold import of the app, measured in a fresh interpreter
+STARTUP_BUDGET_SECONDS = 3.0
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestHealth:
+    def test_healthz(self, client):
+        response = client.get("/healthz")
+        
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok"}
+    
+    def test_readyz(self, client):
+        response = client.get("/readyz")
+        
+        assert response.status_code == 200
+        assert response.json()["checks"] == {"database": "ok", "schema": "ok"}
+    
+    def test_readyz_reports_database_down(self, client):
+        class DownSession:
+            def execute(self, *args, **kwargs):
+                raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+        
+        app.dependency_overrides[get_db] = lambda: DownSession()
+        response = client.get("/readyz")
+        
+        assert response.status_code == 503
+        assert response.json()["checks"]["database"] == "unavailable"
+    
+    def test_startup_survives_database_down(self, monkeypatch):
+        def failing_init_db():
+            raise OperationalError("CREATE TABLE", {}, Exception("connection refused"))
+        monkeypatch.setattr(main, "init_db", failing_init_db)
+        
+        with TestClient(app) as client:
+            assert client.get("/healthz").status_code == 200
+            assert app.state.schema_ready is False
+
+class TestStartupTime:
+    def test_import_is_lazy_and_within_budget(self):
+        # An unreachable database must neither fail nor slow down the import
+        env = dict(os.environ, DB_HOST="127.0.0.1", DB_PORT="1")
+        script = (
+            "import sys, time\n"
+            "start = time.perf_counter()\n"
+            "import app.main, app.db\n"
+            "print(time.perf_counter() - start)\n"
+            "print(app.db._engine is None, 'boto3' in sys.modules)\n"
+        )
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=backend_dir, env=env, capture_output=True, text=True, timeout=60
+        )
+        wall_time = time.perf_counter() - started
+        
+        assert result.returncode == 0, result.stderr
+        import_time, laziness = result.stdout.strip().splitlines()
+        assert laziness == "True False"
+        assert float(import_time) < STARTUP_BUDGET_SECONDS, f"import took {import_time}s (process {wall_time:.2f}s)"
@@ -0,0 +1,187 @@
+import json
+import time
+from urllib.error import URLError
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.testclient import TestClient
+from jwt.algorithms import RSAAlgorithm
+
+from app.main import app
+from app.routers import auth
+from app.services.jwks import JWKSFetchError, JWKSVerifier, cognito_username
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_TestPool"
+CLIENT_ID = "test-client"
+
+def generate_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+def jwk(private_key, kid: str) -> dict:
+    return {**json.loads(RSAAlgorithm.to_jwk(private_key.public_key())), "kid": kid, "alg": "RS256", "use": "sig"}
+
+def cognito_token(private_key, kid: str, **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": ISSUER,
+        "aud": CLIENT_ID,
+        "token_use": "id",
+        "email": "employee@example.com",
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+def access_token(private_key, kid: str, **claims) -> str:
+    now = int(time.time())
+    # Access tokens name the app client in client_id and carry no aud or email
+    payload = {
+        "iss": ISSUER,
+        "client_id": CLIENT_ID,
+        "token_use": "access",
+        "username": "employee@example.com",
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+class FakeJWKS:
+    def __init__(self, *keys):
+        self.keys = list(keys)
+        self.fetches = 0
+    
+    def __call__(self):
+        self.fetches += 1
+        return {"keys": self.keys}
+
+@pytest.fixture(scope="module")
+def signing_key():
+    return generate_key()
+
+class TestJWKSVerifier:
+    def test_verifies_id_and_access_tokens(self, signing_key):
+        verifier = JWKSVerifier(ISSUER, CLIENT_ID, fetch=FakeJWKS(jwk(signing_key, "key-1")))
+        
+        assert cognito_username(verifier.verify(cognito_token(signing_key, "key-1"))) == "employee@example.com"
+        assert cognito_username(verifier.verify(access_token(signing_key, "key-1"))) == "employee@example.com"
+    
+    def test_access_tokens_are_checked_against_client_id(self, signing_key):
+        verifier = JWKSVerifier(ISSUER, CLIENT_ID, fetch=FakeJWKS(jwk(signing_key, "key-1")))
+        
+        for token in (
+            access_token(signing_key, "key-1", client_id="other-client"),
+            # An aud naming this client does not stand in for client_id
+            access_token(signing_key, "key-1", client_id=None, aud=CLIENT_ID),
+            cognito_token(signing_key, "key-1", token_use="refresh"),
+        ):
+            with pytest.raises(jwt.InvalidTokenError):
+                verifier.verify(token)
+    
+    def test_access_tokens_can_be_disabled(self, signing_key):
+        verifier = JWKSVerifier(
+            ISSUER, CLIENT_ID, fetch=FakeJWKS(jwk(signing_key, "key-1")), accept_access_tokens=False
+        )
+        
+        assert verifier.verify(cognito_token(signing_key, "key-1"))["token_use"] == "id"
+        with pytest.raises(jwt.InvalidTokenError):
+            verifier.verify(access_token(signing_key, "key-1"))
+    
+    def test_rejects_invalid_tokens(self, signing_key):
+        verifier = JWKSVerifier(ISSUER, CLIENT_ID, fetch=FakeJWKS(jwk(signing_key, "key-1")))
+        forged = generate_key()
+        
+        for token in (
+            cognito_token(signing_key, "key-1", iss="https://cognito-idp.us-east-1.amazonaws.com/other"),
+            cognito_token(signing_key, "key-1", aud="other-client"),
+            cognito_token(signing_key, "key-1", exp=int(time.time()) - 3600),
+            cognito_token(forged, "key-1"),
+            jwt.encode({"sub": "employee@example.com"}, "secret", algorithm="HS256"),
+        ):
+            with pytest.raises(jwt.PyJWTError):
+                verifier.verify(token)
+    
+    def test_key_rotation(self, signing_key):
+        rotated = generate_key()
+        jwks = FakeJWKS(jwk(signing_key, "key-1"))
+        verifier = JWKSVerifier(ISSUER, CLIENT_ID, fetch=jwks)
+        verifier.verify(cognito_token(signing_key, "key-1"))
+        verifier._fetched_at -= 3600
+        jwks.keys.append(jwk(rotated, "key-2"))
+        
+        claims = verifier.verify(cognito_token(rotated, "key-2"))
+        
+        assert claims["email"] == "employee@example.com"
+        assert jwks.fetches == 2
+    
+    def test_unknown_key_refreshes_at_most_once_per_interval(self, signing_key):
+        jwks = FakeJWKS(jwk(signing_key, "key-1"))
+        verifier = JWKSVerifier(ISSUER, CLIENT_ID, fetch=jwks)
+        verifier.refresh()
+        
+        for _ in range(3):
+            with pytest.raises(jwt.InvalidTokenError):
+                verifier.verify(cognito_token(signing_key, "unknown"))
+        
+        assert jwks.fetches == 1
+        # Cached keys need no fetch at all
+        verifier.verify(cognito_token(signing_key, "key-1"))
+        assert jwks.fetches == 1
+
+    def test_fetch_failure_is_an_invalid_token(self, signing_key):
+        def unreachable():
+            raise URLError("timed out")
+        
+        verifier = JWKSVerifier(ISSUER, CLIENT_ID, fetch=unreachable)
+        
+        with pytest.raises(JWKSFetchError):
+            verifier.verify(cognito_token(signing_key, "key-1"))
+
+class TestCognitoTokensInRequests:
+    def test_current_user_from_cognito_token(self, client, create_user, signing_key, monkeypatch):
+        create_user("employee@example.com", "Employee")
+        monkeypatch.setattr(auth, "cognito_jwks", JWKSVerifier(ISSUER, CLIENT_ID, fetch=FakeJWKS(jwk(signing_key, "key-1"))))
+        
+        response = client.get("/auth/user", headers={"Authorization": f"Bearer {cognito_token(signing_key, 'key-1')}"})
+        
+        assert response.status_code == 200
+        assert response.json()["email"] == "employee@example.com"
+    
+    def test_keys_are_loaded_at_startup(self, db, signing_key, monkeypatch):
+        jwks = FakeJWKS(jwk(signing_key, "key-1"))
+        monkeypatch.setattr(auth, "cognito_jwks", JWKSVerifier(ISSUER, CLIENT_ID, fetch=jwks))
+        
+        with TestClient(app):
+            assert jwks.fetches == 1
+    
+    def test_unreachable_jwks_is_unauthorized(self, client, create_user, signing_key, monkeypatch):
+        create_user("employee@example.com", "Employee")
+        
+        def unreachable():
+            raise URLError("timed out")
+        
+        monkeypatch.setattr(auth, "cognito_jwks", JWKSVerifier(ISSUER, CLIENT_ID, fetch=unreachable))
+        
+        response = client.get("/auth/user", headers={"Authorization": f"Bearer {cognito_token(signing_key, 'key-1')}"})
+        
+        assert response.status_code == 401
+    
+    def test_rejects_cognito_token_for_other_client(self, client, create_user, signing_key, monkeypatch):
+        create_user("employee@example.com", "Employee")
+        monkeypatch.setattr(auth, "cognito_jwks", JWKSVerifier(ISSUER, CLIENT_ID, fetch=FakeJWKS(jwk(signing_key, "key-1"))))
+        token = cognito_token(signing_key, "key-1", aud="other-client")
+        
+        response = client.get("/auth/user", headers={"Authorization": f"Bearer {token}"})
+        
+        assert response.status_code == 401
+    
+    def test_current_user_from_cognito_access_token(self, client, create_user, signing_key, monkeypatch):
+        create_user("employee@example.com", "Employee")
+        monkeypatch.setattr(auth, "cognito_jwks", JWKSVerifier(ISSUER, CLIENT_ID, fetch=FakeJWKS(jwk(signing_key, "key-1"))))
+        
+        response = client.get("/auth/user", headers={"Authorization": f"Bearer {access_token(signing_key, 'key-1')}"})
+        
+        assert response.status_code == 200
+        assert response.json()["email"] == "employee@example.com"
@@ -0,0 +1,50 @@
+from app.services.metrics import Counter, Gauge, Histogram, Registry
+
+class TestRegistry:
+    def test_text_exposition(self):
+        registry = Registry()
+        requests = Counter("requests_total", "Requests", ["route"], registry=registry)
+        latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry)
+        connections = Gauge("connections", "Connections", registry=registry)
+        connections.set_function(lambda: 3)
+        
+        requests.inc(route="/users/{user_id}")
+        requests.inc(route="/users/{user_id}")
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+        
+        lines = registry.render().splitlines()
+        
+        assert "# TYPE requests_total counter" in lines
+        assert 'requests_total{route="/users/{user_id}"} 2' in lines
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 2' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+        assert "latency_seconds_count 3" in lines
+        assert "connections 3" in lines
+    
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        counter = Counter("errors_total", "Errors", ["reason"], registry=registry)
+        counter.inc(reason='bad "quote"\n')
+        
+        assert 'errors_total{reason="bad \\"quote\\"\\n"} 1' in registry.render()
+
+class TestMetricsEndpoint:
+    def test_route_and_query_metrics(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        client.get(f"/users/{user.id}", headers=auth_headers(user.email))
+        client.get("/users/missing-user", headers=auth_headers(user.email))
+        
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        # Labelled by route template, not raw path
+        assert 'http_requests_total{method="GET",route="/users/{user_id}",status="200"}' in body
+        assert 'http_requests_total{method="GET",route="/users/{user_id}",status="404"}' in body
+        assert "missing-user" not in body
+        assert 'db_query_duration_seconds_count{operation="SELECT"}' in body
+        assert "websocket_connections 0" in body
@@ -0,0 +1,102 @@
+import threading
+
+from app.models.user import UserRole
+from app.services.profiler import RequestProfile, profile_store, stack_category
+
+class TestStackCategory:
+    def test_innermost_marker_wins(self):
+        app_frame = ("/srv/app/routers/points.py", "get_user_points", 1)
+        encoder = ("/site-packages/fastapi/encoders.py", "jsonable_encoder", 1)
+        cursor = ("/site-packages/sqlalchemy/engine/base.py", "_execute_context", 1)
+        
+        assert stack_category((app_frame,)) == "application"
+        assert stack_category((app_frame, encoder)) == "serialization"
+        # A lazy load during serialization is SQL time
+        assert stack_category((app_frame, encoder, cursor)) == "sql"
+
+class TestRequestProfile:
+    def test_samples_registered_threads(self):
+        profile = RequestProfile("GET", "/busy", interval=0.001)
+        done = threading.Event()
+        
+        def busy():
+            profile.add_thread(threading.get_ident())
+            while not done.is_set():
+                sum(range(1000))
+        
+        worker = threading.Thread(target=busy)
+        worker.start()
+        profile.start("admin-id")
+        done.wait(0.05)
+        profile.stop()
+        done.set()
+        worker.join()
+        
+        assert profile.samples > 0
+        assert any(frame[1] == "busy" for stack in profile.stacks for frame in stack)
+        speedscope = profile.speedscope()
+        assert speedscope["profiles"][0]["type"] == "sampled"
+        assert len(speedscope["profiles"][0]["samples"]) == len(speedscope["profiles"][0]["weights"])
+
+    def test_threadpool_threads_are_dropped_but_not_the_loop(self):
+        profile = RequestProfile("GET", "/busy")
+        profile.start("admin-id")
+        loop_thread = threading.get_ident()
+        profile.add_thread(12345)
+        
+        profile.remove_thread(12345)
+        profile.remove_thread(loop_thread)
+        profile.stop()
+        
+        assert profile._threads == {loop_thread}
+
+class TestProfilingEndpoint:
+    def setup_method(self):
+        profile_store.clear()
+    
+    def test_admin_request_is_profiled(self, client, create_user, auth_headers):
+        admin = create_user("admin@example.com", "Admin", role=UserRole.ADMIN)
+        user = create_user("employee@example.com", "Employee")
+        headers = auth_headers(admin.email)
+        
+        response = client.get(f"/points/{user.id}/summary", headers={**headers, "X-Profile": "1"})
+        
+        assert response.status_code == 200
+        profile_id = response.headers["X-Profile-Id"]
+        assert "sql;dur=" in response.headers["Server-Timing"]
+        
+        listing = client.get("/admin/profiles", headers=headers).json()
+        assert listing[0]["id"] == profile_id
+        assert listing[0]["path"] == f"/points/{user.id}/summary"
+        assert listing[0]["sql_queries"] >= 1
+        
+        artifact = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+        assert artifact.status_code == 200
+        assert "speedscope" in artifact.headers["Content-Disposition"]
+        assert artifact.json()["profiles"][0]["type"] == "sampled"
+    
+    def test_query_parameter(self, client, create_user, auth_headers):
+        admin = create_user("admin@example.com", "Admin", role=UserRole.ADMIN)
+        
+        response = client.get("/users?profile=1", headers=auth_headers(admin.email))
+        
+        assert response.status_code == 200
+        assert "X-Profile-Id" in response.headers
+    
+    def test_ignored_for_non_admins(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        headers = auth_headers(user.email)
+        
+        response = client.get("/users", headers={**headers, "X-Profile": "1"})
+        
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+        assert profile_store.list() == []
+        assert client.get("/admin/profiles", headers=headers).status_code == 403
+    
+    def test_unknown_profile(self, client, create_user, auth_headers):
+        admin = create_user("admin@example.com", "Admin", role=UserRole.ADMIN)
+        
+        response = client.get("/admin/profiles/missing", headers=auth_headers(admin.email))
+        
+        assert response.status_code == 404
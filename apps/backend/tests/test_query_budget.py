@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.models.peer_review import PeerReview
+from app.models.user import User
+from app.routers import users
+from app.routers.realtime import get_likes_count
+from app.services.query_budget import QueryBudgetExceeded, statement_shape, track_queries
+
+class TestQueryTracking:
+    def test_statement_shape_collapses_placeholder_lists(self):
+        assert statement_shape("SELECT *\n  FROM users WHERE id IN (?, ?, ?)") == "SELECT * FROM users WHERE id IN (?, ...)"
+        assert statement_shape("WHERE id IN (%(id_1)s, %(id_2)s)") == "WHERE id IN (?, ...)"
+    
+    def test_repeated_statements_are_reported(self, db, create_user, caplog):
+        for index in range(6):
+            create_user(f"user{index}@example.com", f"User {index}")
+        
+        with caplog.at_level(logging.WARNING, logger="app.services.query_budget"):
+            with track_queries("loop") as tracker:
+                for user in db.query(User).all():
+                    db.query(PeerReview).filter(PeerReview.employee_id == user.id).count()
+        
+        assert tracker.count == 7
+        assert "possible N+1, 6 x" in caplog.text
+    
+    def test_likes_count_is_one_query(self, db, create_user):
+        employee = create_user("employee@example.com", "Employee")
+        peer = create_user("peer@example.com", "Peer")
+        create_user("other@example.com", "Other")
+        db.add(PeerReview(employee_id=employee.id, reviewer_id=peer.id, liked=True))
+        db.add(PeerReview(employee_id=peer.id, reviewer_id=employee.id, liked=False))
+        db.commit()
+        
+        with track_queries("likes", budget=1) as tracker:
+            counts = asyncio.run(get_likes_count(db))
+        
+        assert tracker.count == 1
+        assert counts == {"user-employee": 1, "user-peer": 0, "user-other": 0}
+    
+    def test_route_over_budget_fails(self, client, create_user, auth_headers, monkeypatch):
+        user = create_user("employee@example.com", "Employee")
+        monkeypatch.setattr(users.get_user, "query_budget", 1)
+        
+        with pytest.raises(QueryBudgetExceeded, match=r"GET /users/\{user_id\} ran 2 queries, budget is 1"):
+            client.get(f"/users/{user.id}", headers=auth_headers(user.email))
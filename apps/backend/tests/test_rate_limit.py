@@ -0,0 +1,166 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.middleware.load_shedding import LoadSheddingMiddleware
+from app.routers import auth
+from app.services import load_shedding
+from app.services.load_shedding import PoolWaitTracker, overload_reason
+from app.services import rate_limit
+from app.services.rate_limit import MemoryRateLimitBackend, RateLimit, client_ip
+
+class TestTokenBucket:
+    def test_burst_then_refill(self):
+        backend = MemoryRateLimitBackend()
+        
+        with patch("app.services.rate_limit.time.monotonic", return_value=100.0):
+            assert [backend.take("key", 3, 1.0) for _ in range(3)] == [0, 0, 0]
+            assert backend.take("key", 3, 1.0) == pytest.approx(1.0)
+        with patch("app.services.rate_limit.time.monotonic", return_value=101.5):
+            assert backend.take("key", 3, 1.0) == 0
+            assert backend.take("key", 3, 1.0) == pytest.approx(0.5)
+    
+    def test_keys_are_independent(self):
+        backend = MemoryRateLimitBackend()
+        backend.take("a", 1, 1.0)
+        
+        assert backend.take("a", 1, 1.0) > 0
+        assert backend.take("b", 1, 1.0) == 0
+    
+    def test_check_raises_429_with_retry_after(self):
+        limit = RateLimit("test", 1, 60)
+        backend = MemoryRateLimitBackend()
+        limit.check("user", backend)
+        
+        with pytest.raises(HTTPException) as error:
+            limit.check("user", backend)
+        
+        assert error.value.status_code == 429
+        assert error.value.headers["Retry-After"] == "60"
+    
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv("TEST_LIMIT", "10/hour")
+        
+        limit = RateLimit.from_env("test", "TEST_LIMIT", "5/minute")
+        
+        assert (limit.limit, limit.period) == (10, 3600)
+    
+    def test_client_ip_ignores_spoofed_forwarded_hops(self, monkeypatch):
+        from starlette.requests import Request
+        
+        request = Request({
+            "type": "http",
+            "headers": [(b"x-forwarded-for", b"1.2.3.4, 203.0.113.7, 10.0.0.2")],
+            "client": ("10.0.0.3", 443),
+        })
+        
+        assert client_ip(request) == "10.0.0.3"
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", 2)
+        assert client_ip(request) == "203.0.113.7"
+        monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUSTED_PROXIES", 5)
+        assert client_ip(request) == "10.0.0.3"
+
+class TestRouteLimits:
+    def test_login_per_username(self, client, monkeypatch):
+        monkeypatch.setattr(auth, "LOGIN_PER_USERNAME", RateLimit("login_username", 2, 60))
+        with patch("app.routers.auth.authenticate_user", return_value=None) as authenticate:
+            statuses = [
+                client.post("/auth/login", data={"username": "User@example.com", "password": "wrong"}).status_code
+                for _ in range(3)
+            ]
+        
+        assert statuses == [401, 401, 429]
+        # The rejected attempt never reached Cognito
+        assert authenticate.call_count == 2
+    
+    def test_peer_review_creation_per_user(self, client, create_user, auth_headers, monkeypatch):
+        monkeypatch.setattr(auth, "REVIEW_CREATE_PER_USER", RateLimit("review_create_user", 1, 60))
+        reviewer = create_user("reviewer@example.com", "Reviewer")
+        first = create_user("first@example.com", "First")
+        second = create_user("second@example.com", "Second")
+        headers = auth_headers(reviewer.email)
+        
+        client.post("/reviews/peer", json={"employee_id": first.id, "liked": True}, headers=headers)
+        response = client.post("/reviews/peer", json={"employee_id": second.id, "liked": True}, headers=headers)
+        
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+    
+    def test_review_creation_verifies_token_once(self, client, create_user, auth_headers):
+        reviewer = create_user("reviewer@example.com", "Reviewer")
+        employee = create_user("employee@example.com", "Employee")
+        
+        with patch("app.routers.auth.token_subject", wraps=auth.token_subject) as token_subject:
+            response = client.post(
+                "/reviews/peer", json={"employee_id": employee.id, "liked": True}, headers=auth_headers(reviewer.email)
+            )
+        
+        assert response.status_code == 200
+        assert token_subject.call_count == 1
+    
+    def test_review_creation_limited_before_user_lookup(self, client, auth_headers, monkeypatch):
+        monkeypatch.setattr(auth, "REVIEW_CREATE_PER_USER", RateLimit("review_create_user", 1, 60))
+        # No such user: the limit is keyed on the token alone
+        headers = auth_headers("ghost@example.com")
+        
+        first = client.post("/reviews/peer", json={"employee_id": "x", "liked": True}, headers=headers)
+        second = client.post("/reviews/peer", json={"employee_id": "x", "liked": True}, headers=headers)
+        
+        assert first.status_code == 401
+        assert second.status_code == 429
+
+class TestLoadShedding:
+    def test_pool_wait_window(self):
+        tracker = PoolWaitTracker(window=5.0)
+        with patch("app.services.load_shedding.time.monotonic", side_effect=[10.0, 11.0] * 5 + [11.0]):
+            for _ in range(5):
+                tracker.end(tracker.begin())
+            assert tracker.current() == pytest.approx(1.0)
+        with patch("app.services.load_shedding.time.monotonic", return_value=20.0):
+            assert tracker.current() == 0.0
+    
+    def test_pending_checkouts_count(self):
+        tracker = PoolWaitTracker()
+        with patch("app.services.load_shedding.time.monotonic", return_value=10.0):
+            for _ in range(5):
+                tracker.begin()
+        with patch("app.services.load_shedding.time.monotonic", return_value=12.0):
+            assert tracker.current() == pytest.approx(2.0)
+    
+    def test_one_slow_checkout_is_not_saturation(self):
+        tracker = PoolWaitTracker()
+        with patch("app.services.load_shedding.time.monotonic", side_effect=[10.0, 13.0]):
+            tracker.end(tracker.begin())
+        with patch("app.services.load_shedding.time.monotonic", return_value=13.0):
+            for _ in range(5):
+                tracker.end(tracker.begin())
+            assert tracker.current() == 0.0
+    
+    def test_overload_reasons(self, monkeypatch):
+        monkeypatch.setattr(load_shedding, "LOAD_SHED_MAX_CONCURRENCY", 10)
+        assert overload_reason(9) is None
+        assert overload_reason(10) == "concurrency"
+        
+        monkeypatch.setattr(load_shedding.loop_lag, "value", 1.0)
+        assert overload_reason(0) == "loop_lag"
+    
+    def test_sheds_with_503_but_keeps_probes(self, client, monkeypatch):
+        monkeypatch.setattr("app.middleware.load_shedding.overload_reason", lambda in_flight: "loop_lag")
+        
+        response = client.get("/", headers={"Origin": "https://app.example.com"})
+        
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert response.headers["Access-Control-Allow-Origin"]
+        assert client.get("/healthz").status_code == 200
+    
+    def test_in_flight_is_released(self):
+        async def app(scope, receive, send):
+            pass
+        middleware = LoadSheddingMiddleware(app)
+        
+        asyncio.run(middleware({"type": "http", "path": "/"}, None, None))
+        
+        assert middleware.in_flight == 0
@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -173,6 +174,32 @@ class TestEmployerReviews:
         assert len(response.json()) == 1
         assert response.json()[0]["employee_id"] == test_employee.id
 
+    def test_get_reviews_without_comments(self, client, test_manager, test_employee, override_get_db):
+        review = EmployerReview(
+            employee_id=test_employee.id,
+            reviewer_id=test_manager.id,
+            performance_score=4.0,
+            communication_score=4.0,
+            teamwork_score=4.0,
+            innovation_score=4.0,
+            leadership_score=4.0,
+            technical_score=4.0,
+            reliability_score=4.0,
+            comments="Long comment text",
+            review_period="2023 Q2"
+        )
+        override_get_db.add(review)
+        override_get_db.commit()
+        review_id = review.id
+        
+        response = client.get(
+            f"/reviews/employer/{test_employee.id}?fields=performance_score,review_period",
+            headers=get_auth_headers(test_manager.email)
+        )
+        
+        assert response.status_code == 200
+        assert response.json() == [{"id": review_id, "performance_score": 4.0, "review_period": "2023 Q2"}]
+
 # Test peer review endpoints
 class TestPeerReviews:
     def test_create_peer_review(self, client, test_employee, test_employee2):
@@ -261,4 +288,116 @@ class TestPeerReviews:
         )
         
         assert response.status_code == 400
-        assert "already reviewed" in response.json()["detail"] 
\ No newline at end of file
+        assert "already reviewed" in response.json()["detail"] 
+# Test the swipe deck of unreviewed colleagues
+class TestReviewDeck:
+    @pytest.fixture(autouse=True)
+    def reset_deck_cache(self):
+        from app.routers.peer_reviews import deck_cache
+        deck_cache.clear()
+        yield
+        deck_cache.clear()
+
+    def test_deck_excludes_self_and_reviewed(self, client, test_manager, test_employee, test_employee2, override_get_db):
+        review = PeerReview(
+            employee_id=test_employee2.id,
+            reviewer_id=test_employee.id,
+            liked=True,
+            is_anonymous=True
+        )
+        override_get_db.add(review)
+        override_get_db.commit()
+        
+        response = client.get(
+            "/reviews/peer/deck",
+            headers=get_auth_headers(test_employee.email)
+        )
+        
+        assert response.status_code == 200
+        assert [user["id"] for user in response.json()] == [test_manager.id]
+    
+    def test_swipe_removes_colleague_from_deck(self, client, test_manager, test_employee, test_employee2):
+        headers = get_auth_headers(test_employee.email)
+        
+        response = client.get("/reviews/peer/deck", headers=headers)
+        assert {user["id"] for user in response.json()} == {test_manager.id, test_employee2.id}
+        
+        client.post(
+            "/reviews/peer",
+            json={"employee_id": test_employee2.id, "liked": True},
+            headers=headers
+        )
+        
+        response = client.get("/reviews/peer/deck", headers=headers)
+        assert [user["id"] for user in response.json()] == [test_manager.id]
+    
+    def test_deck_drops_cards_reviewed_elsewhere(self, client, test_manager, test_employee, test_employee2, override_get_db):
+        headers = get_auth_headers(test_employee.email)
+        client.get("/reviews/peer/deck", headers=headers)
+        
+        # Reviewed through another worker and deactivated, so this deck was not told
+        override_get_db.add(PeerReview(employee_id=test_employee2.id, reviewer_id=test_employee.id, liked=True, is_anonymous=True))
+        override_get_db.query(User).filter(User.id == test_manager.id).update({"is_active": False})
+        override_get_db.commit()
+        
+        response = client.get("/reviews/peer/deck", headers=headers)
+        assert response.json() == []
+    
+    def test_deck_respects_limit(self, client, test_manager, test_employee, test_employee2):
+        response = client.get(
+            "/reviews/peer/deck?limit=1",
+            headers=get_auth_headers(test_employee.email)
+        )
+        
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
+class TestPeerReviewInbox:
+    def add_reviews(self, db, employee, reviewer, count):
+        for index in range(count):
+            db.add(PeerReview(
+                employee_id=employee.id,
+                reviewer_id=reviewer.id,
+                liked=index % 2 == 0,
+                is_anonymous=True,
+                comments="Great work" if index == 0 else None,
+                created_at=datetime(2024, 1, 1 + index)
+            ))
+        db.commit()
+    
+    def test_inbox_pages_newest_first(self, client, test_employee, test_employee2, override_get_db):
+        self.add_reviews(override_get_db, test_employee, test_employee2, 3)
+        headers = get_auth_headers(test_employee.email)
+        
+        first = client.get("/reviews/peer/me?limit=2", headers=headers)
+        assert [review["created_at"][:10] for review in first.json()] == ["2024-01-03", "2024-01-02"]
+        assert all(review["reviewer_id"] is None for review in first.json())
+        
+        # The cursor header survives a cached replay
+        cursor = client.get("/reviews/peer/me?limit=2", headers=headers).headers["X-Next-Cursor"]
+        assert cursor == first.headers["X-Next-Cursor"]
+        
+        second = client.get(f"/reviews/peer/me?limit=2&cursor={cursor}", headers=headers)
+        assert [review["created_at"][:10] for review in second.json()] == ["2024-01-01"]
+        assert "X-Next-Cursor" not in second.headers
+    
+    def test_inbox_filters(self, client, test_employee, test_employee2, override_get_db):
+        self.add_reviews(override_get_db, test_employee, test_employee2, 3)
+        headers = get_auth_headers(test_employee.email)
+        
+        liked = client.get("/reviews/peer/me?liked=true", headers=headers).json()
+        assert [review["liked"] for review in liked] == [True, True]
+        
+        commented = client.get("/reviews/peer/me?commented=true&fields=comments", headers=headers).json()
+        assert commented == [{"id": commented[0]["id"], "comments": "Great work", "created_at": "2024-01-01T00:00:00"}]
+    
+    def test_unread_count(self, client, test_employee, test_employee2, override_get_db):
+        self.add_reviews(override_get_db, test_employee, test_employee2, 2)
+        headers = get_auth_headers(test_employee.email)
+        
+        assert client.get("/reviews/peer/me/unread", headers=headers).json()["unread"] == 2
+        
+        response = client.post("/reviews/peer/me/read", headers=headers)
+        assert response.status_code == 200
+        
+        assert client.get("/reviews/peer/me/unread", headers=headers).json()["unread"] == 0
@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.models.peer_review import PeerReview
+from app.routers import realtime
+from app.services.cache import response_cache
+from app.services.metrics import JOB_RUNS
+from app.services.scheduler import Job, LeaderElection, Scheduler
+
+class FollowerElection:
+    is_leader = False
+    
+    def check(self):
+        return False
+    
+    def release(self):
+        pass
+
+def run_for(scheduler: Scheduler, seconds: float):
+    async def main():
+        scheduler.start()
+        await asyncio.sleep(seconds)
+        await scheduler.stop()
+    asyncio.run(main())
+
+class TestJob:
+    def test_outcomes(self):
+        async def ok():
+            pass
+        
+        def broken():
+            raise RuntimeError("boom")
+        
+        async def slow():
+            await asyncio.sleep(1)
+        
+        assert asyncio.run(Job("test_ok", ok, 1).run()) == "success"
+        assert asyncio.run(Job("test_broken", broken, 1).run()) == "error"
+        assert asyncio.run(Job("test_slow", slow, 1, timeout=0.01).run()) == "timeout"
+        assert JOB_RUNS.value(job="test_broken", outcome="error") >= 1
+    
+    def test_jitter_stays_in_bounds(self):
+        job = Job("test_jitter", lambda: None, 10, jitter=0.2)
+        
+        delays = [job.next_delay() for _ in range(100)]
+        
+        assert all(8 <= delay <= 12 for delay in delays)
+
+class TestScheduler:
+    def test_runs_jobs_repeatedly_and_stops(self):
+        runs = []
+        scheduler = Scheduler()
+        scheduler.add_job("test_tick", lambda: runs.append(1), interval=0.01, jitter=0)
+        
+        run_for(scheduler, 0.1)
+        count = len(runs)
+        
+        assert count >= 3
+        assert not scheduler.running
+    
+    def test_leader_only_jobs_skip_followers(self):
+        runs = []
+        scheduler = Scheduler(FollowerElection())
+        scheduler.add_job("test_leader_only", lambda: runs.append("leader"), interval=0.01, leader_only=True)
+        scheduler.add_job("test_everywhere", lambda: runs.append("all"), interval=0.01)
+        
+        run_for(scheduler, 0.1)
+        
+        assert "all" in runs
+        assert "leader" not in runs
+    
+    def test_sqlite_process_always_leads(self):
+        engine = create_engine("sqlite://")
+        election = LeaderElection(lambda: engine, lambda: engine)
+        
+        assert election.check() is True
+        election.release()
+        assert election.is_leader is False
+    
+    def test_lock_engine_is_unpooled_with_the_main_settings(self):
+        from sqlalchemy import event
+        from sqlalchemy.pool import NullPool
+        from app.db import DB_SCHEMA, create_unpooled_engine
+        
+        engine = create_unpooled_engine()
+        captured = {}
+        
+        @event.listens_for(engine, "do_connect")
+        def capture(dialect, conn_rec, cargs, cparams):
+            captured.update(cparams)
+            raise RuntimeError("not connecting")
+        
+        with pytest.raises(Exception):
+            engine.connect()
+        
+        assert isinstance(engine.pool, NullPool)
+        assert captured["options"] == f"-csearch_path={DB_SCHEMA}"
+    
+    def test_not_started_by_test_lifespans(self, client):
+        from app.main import scheduler
+        
+        assert not scheduler.running
+
+class TestLikesSnapshot:
+    def test_leader_snapshot_is_broadcast(self, db, create_user, monkeypatch):
+        employee = create_user("employee@example.com", "Employee")
+        reviewer = create_user("reviewer@example.com", "Reviewer")
+        db.add(PeerReview(employee_id=employee.id, reviewer_id=reviewer.id, liked=True))
+        db.commit()
+        monkeypatch.setattr(realtime, "get_session_factory", lambda: lambda: db)
+        monkeypatch.setattr(db, "close", lambda: None)
+        sent = []
+        
+        async def broadcast(message):
+            sent.append(message)
+        monkeypatch.setattr(realtime.manager, "broadcast", broadcast)
+        monkeypatch.setattr(realtime.manager, "all_connections", [object()])
+        
+        realtime.publish_likes_snapshot()
+        asyncio.run(realtime.broadcast_likes_snapshot())
+        
+        assert json.loads(response_cache.backend.get(realtime.LIKES_SNAPSHOT_KEY))[employee.id] == 1
+        assert sent[0]["type"] == "periodic_update"
+        assert sent[0]["data"][employee.id] == 1
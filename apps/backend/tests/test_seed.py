@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from sqlalchemy import func
+
+from app.models.peer_review import PeerReview
+from app.models.points import Badge, PointsTransaction, UserBadge
+from app.models.review import EmployerReview, EmployerReviewRollup
+from app.models.user import User
+from app.services.seed import seed
+
+NOW = datetime(2024, 6, 30, 12, 0, 0)
+
+class TestSeed:
+    def test_counts(self, db):
+        counts = seed(db, users=200, years=1, peer_reviews=500, transactions=2000, now=NOW)
+        
+        assert db.query(func.count(User.id)).scalar() == 200
+        assert counts["users"] == 200
+        assert db.query(func.count(PeerReview.id)).scalar() == 500
+        assert db.query(func.count(PointsTransaction.id)).scalar() == 2000
+        assert db.query(func.count(EmployerReview.id)).scalar() == counts["employer_reviews"] > 0
+        assert db.query(func.count(EmployerReviewRollup.employee_id)).scalar() > 0
+    
+    def test_peer_review_pairs_are_unique(self, db):
+        seed(db, users=50, years=1, peer_reviews=400, transactions=0, now=NOW)
+        
+        pairs = db.query(PeerReview.employee_id, PeerReview.reviewer_id).all()
+        assert len(pairs) == len(set(pairs))
+        assert all(employee != reviewer for employee, reviewer in pairs)
+    
+    def test_inactive_users_write_no_peer_reviews(self, db):
+        seed(db, users=200, years=1, peer_reviews=500, transactions=0, now=NOW)
+        
+        reviewers = db.query(User.is_active).join(PeerReview, PeerReview.reviewer_id == User.id).distinct().all()
+        assert reviewers == [(True,)]
+    
+    def test_rejects_reviews_without_users(self, db):
+        with pytest.raises(ValueError, match="at least 2 users"):
+            seed(db, users=0, years=1, peer_reviews=10, transactions=0, now=NOW)
+    
+    def test_is_deterministic(self, db):
+        first = seed(db, users=100, years=1, peer_reviews=100, transactions=500, now=NOW, seed_value=7)
+        rows = db.query(PeerReview.employee_id, PeerReview.reviewer_id).order_by(PeerReview.id).all()
+        for model in (UserBadge, Badge, PeerReview, PointsTransaction, EmployerReviewRollup, EmployerReview):
+            db.query(model).delete()
+        db.query(User).delete()
+        db.commit()
+        
+        second = seed(db, users=100, years=1, peer_reviews=100, transactions=500, now=NOW, seed_value=7)
+        
+        assert first == second
+        assert db.query(PeerReview.employee_id, PeerReview.reviewer_id).order_by(PeerReview.id).all() == rows
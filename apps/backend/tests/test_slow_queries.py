@@ -0,0 +1,66 @@
+from sqlalchemy import text
+
+from app.models.user import UserRole
+from app.services.query_budget import track_queries
+from app.services.slow_queries import SlowQueryLog, parameters_shape, slow_query_log
+
+class TestParametersShape:
+    def test_types_not_values(self):
+        assert parameters_shape({"email": "a@example.com", "limit": 10}) == {"email": "str", "limit": "int"}
+        assert parameters_shape(("secret", 3)) == ["str", "int"]
+        assert parameters_shape([("a", 1), ("b", 2)], executemany=True) == {"rows": 2, "each": ["str", "int"]}
+
+class TestSlowQueryLog:
+    def setup_method(self):
+        slow_query_log.clear()
+    
+    def teardown_method(self):
+        slow_query_log.threshold = SlowQueryLog().threshold
+        slow_query_log.clear()
+    
+    def test_records_plan_and_route(self, db, create_user):
+        create_user("employee@example.com", "Employee")
+        slow_query_log.threshold = 0
+        
+        with track_queries("GET /users/{user_id}"):
+            db.execute(text("SELECT id FROM users WHERE email = :email"), {"email": "employee@example.com"}).all()
+        
+        entry = next(e for e in slow_query_log.entries() if e["statement"].startswith("SELECT id FROM users"))
+        assert entry["route"] == "GET /users/{user_id}"
+        assert entry["parameters"] == ["str"]
+        assert entry["plan"] and any("users" in line for line in entry["plan"])
+        assert "employee@example.com" not in str(entry)
+    
+    def test_ring_buffer_keeps_newest(self, db):
+        log = SlowQueryLog(max_size=2, threshold=0)
+        connection = db.connection()
+        for statement in ("SELECT 1", "SELECT 2", "SELECT 3"):
+            log.record(connection, statement, (), False, 0.5)
+        
+        assert [entry["statement"] for entry in log.entries()] == ["SELECT 3", "SELECT 2"]
+    
+    def test_plan_cache_is_bounded(self, db):
+        log = SlowQueryLog(threshold=0, max_plans=2)
+        connection = db.connection()
+        for statement in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+            log.record(connection, statement, (), False, 0.5)
+        
+        assert list(log._plans) == ["SELECT 1", "SELECT 3"]
+    
+    def test_fast_queries_are_not_recorded(self, db):
+        db.execute(text("SELECT 1")).all()
+        
+        assert slow_query_log.entries() == []
+    
+    def test_admin_endpoint(self, client, create_user, auth_headers):
+        admin = create_user("admin@example.com", "Admin", role=UserRole.ADMIN)
+        user = create_user("employee@example.com", "Employee")
+        slow_query_log.threshold = 0
+        client.get(f"/users/{user.id}", headers=auth_headers(admin.email))
+        
+        response = client.get("/admin/slow-queries", headers=auth_headers(admin.email))
+        
+        assert response.status_code == 200
+        routes = {entry["route"] for entry in response.json()["entries"]}
+        assert "GET /users/{user_id}" in routes
+        assert client.get("/admin/slow-queries", headers=auth_headers(user.email)).status_code == 403
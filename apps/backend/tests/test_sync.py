@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.peer_review import PeerReview
+from app.models.points import PointsTransaction
+from app.models.review import EmployerReview
+from app.models.user import UserRole
+from app.routers import sync
+from app.routers.sync import encode_sync_token
+
+class TestSync:
+    def test_first_sync_requests_full_resync(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        
+        response = client.get("/sync", headers=auth_headers(user.email))
+        
+        assert response.status_code == 200
+        assert response.json()["full_resync"] is True
+        assert response.json()["token"]
+    
+    def test_delta_since_token(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        peer = create_user("peer@example.com", "Peer")
+        since = encode_sync_token(datetime.utcnow() - timedelta(minutes=1))
+        db.add(PeerReview(employee_id=user.id, reviewer_id=peer.id, liked=True, is_anonymous=True))
+        db.add(PeerReview(employee_id=peer.id, reviewer_id=user.id, liked=True, is_anonymous=False))
+        db.add(PointsTransaction(user_id=user.id, amount=5, action="peer_review_received_like"))
+        peer.is_active = False
+        db.commit()
+        
+        response = client.get(f"/sync?since={since}", headers=auth_headers(user.email))
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["full_resync"] is False
+        assert [u["id"] for u in body["users"]["created"]] == [user.id]
+        assert body["users"]["deactivated"] == [peer.id]
+        assert len(body["peer_reviews"]) == 1
+        assert body["peer_reviews"][0]["reviewer_id"] is None
+        assert [t["amount"] for t in body["points_transactions"]] == [5]
+    
+    def test_manager_syncs_only_own_reviews(self, client, db, create_user, auth_headers):
+        manager = create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        employee = create_user("employee@example.com", "Employee")
+        since = encode_sync_token(datetime.utcnow() - timedelta(minutes=1))
+        db.add(PeerReview(employee_id=employee.id, reviewer_id=manager.id, liked=True, is_anonymous=False))
+        db.add(PeerReview(employee_id=manager.id, reviewer_id=employee.id, liked=True, is_anonymous=False))
+        db.add(EmployerReview(employee_id=employee.id, reviewer_id=manager.id, performance_score=4))
+        db.commit()
+        
+        response = client.get(f"/sync?since={since}", headers=auth_headers(manager.email))
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert [r["employee_id"] for r in body["peer_reviews"]] == [manager.id]
+        assert body["employer_reviews"] == []
+    
+    def test_unchanged_since_token(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        since = encode_sync_token(datetime.utcnow() + timedelta(minutes=1))
+        
+        body = client.get(f"/sync?since={since}", headers=auth_headers(user.email)).json()
+        
+        assert body["full_resync"] is False
+        assert body["users"] == {"created": [], "updated": [], "deactivated": []}
+        assert body["peer_reviews"] == []
+    
+    def test_stale_or_oversized_delta_requests_full_resync(self, client, create_user, auth_headers, monkeypatch):
+        user = create_user("employee@example.com", "Employee")
+        create_user("peer@example.com", "Peer")
+        
+        stale = encode_sync_token(datetime.utcnow() - timedelta(days=365))
+        assert client.get(f"/sync?since={stale}", headers=auth_headers(user.email)).json()["full_resync"] is True
+        
+        monkeypatch.setattr(sync, "SYNC_MAX_CHANGES", 1)
+        recent = encode_sync_token(datetime.utcnow() - timedelta(minutes=1))
+        assert client.get(f"/sync?since={recent}", headers=auth_headers(user.email)).json()["full_resync"] is True
+    
+    def test_offset_aware_token(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        since = encode_sync_token(datetime.now(timezone(timedelta(hours=2))) - timedelta(minutes=1))
+        
+        response = client.get(f"/sync?since={since}", headers=auth_headers(user.email))
+        
+        assert response.status_code == 200
+        assert response.json()["full_resync"] is False
+        assert [u["id"] for u in response.json()["users"]["created"]] == [user.id]
+    
+    def test_invalid_token(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        
+        response = client.get("/sync?since=not-a-token", headers=auth_headers(user.email))
+        
+        assert response.status_code == 400
@@ -0,0 +1,273 @@
+from datetime import datetime, timedelta
+
+from app.models.user import User, UserRole
+from app.models.points import PointsTransaction
+
+class TestUsers:
+    def test_get_all_users(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        create_user("manager@example.com", "Manager", UserRole.MANAGER)
+        
+        response = client.get("/users", headers=auth_headers(user.email))
+        
+        assert response.status_code == 200
+        users = {u["email"]: u for u in response.json()}
+        assert set(users) == {"employee@example.com", "manager@example.com"}
+        assert users["manager@example.com"]["role"] == "manager"
+        assert set(users["employee@example.com"]) == {
+            "id", "email", "full_name", "role", "is_active", "created_at", "updated_at"
+        }
+    
+    def test_inactive_users_are_hidden(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        inactive = create_user("gone@example.com", "Gone")
+        inactive.is_active = False
+        db.commit()
+        
+        response = client.get("/users", headers=auth_headers(user.email))
+        
+        assert [u["id"] for u in response.json()] == [user.id]
+    
+    def test_sparse_fieldset(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        
+        response = client.get("/users?fields=full_name", headers=auth_headers(user.email))
+        assert response.status_code == 200
+        assert response.json() == [{"id": user.id, "full_name": "Employee"}]
+        
+        response = client.get(f"/users/{user.id}?fields=email,role", headers=auth_headers(user.email))
+        assert response.json() == {"id": user.id, "email": user.email, "role": "employee"}
+    
+    def test_unknown_field_is_rejected(self, client, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        
+        response = client.get("/users?fields=full_name,password", headers=auth_headers(user.email))
+        
+        assert response.status_code == 400
+        assert "password" in response.json()["detail"]
+    
+    def test_batch_lookup(self, client, create_user, auth_headers):
+        first = create_user("first@example.com", "First")
+        second = create_user("second@example.com", "Second")
+        headers = auth_headers(first.email)
+        
+        response = client.post(
+            "/users/lookup?fields=full_name",
+            json={"ids": [second.id, first.id, second.id, "user-unknown"]},
+            headers=headers
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "users": {
+                first.id: {"id": first.id, "full_name": "First"},
+                second.id: {"id": second.id, "full_name": "Second"},
+            },
+            "missing": ["user-unknown"],
+        }
+        
+        response = client.get(f"/users?ids={second.id},{second.id}", headers=headers)
+        assert [user["id"] for user in response.json()] == [second.id]
+    
+    def test_batch_lookup_is_capped(self, client, create_user, auth_headers):
+        from app.routers.users import MAX_LOOKUP_IDS
+        user = create_user("employee@example.com", "Employee")
+        
+        response = client.post(
+            "/users/lookup",
+            json={"ids": [f"user-{i}" for i in range(MAX_LOOKUP_IDS + 1)]},
+            headers=auth_headers(user.email)
+        )
+        
+        assert response.status_code == 400
+    
+    def test_conditional_get(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        headers = auth_headers(user.email)
+        
+        response = client.get("/users", headers=headers)
+        etag = response.headers["etag"]
+        
+        response = client.get("/users", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        
+        user.full_name = "Renamed Employee"
+        db.commit()
+        
+        response = client.get("/users", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+    
+    def test_delete_changes_etag(self, client, db, create_user, auth_headers):
+        departed = create_user("departed@example.com", "Departed")
+        user = create_user("employee@example.com", "Employee")
+        headers = auth_headers(user.email)
+        etag = client.get("/users", headers=headers).headers["etag"]
+        
+        # Not the newest row, so the newest updated_at stays the same
+        db.delete(departed)
+        db.commit()
+        
+        response = client.get("/users", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert [u["id"] for u in response.json()] == [user.id]
+
+class TestUserSearch:
+    def test_prefix_matches_rank_first(self, client, create_user, auth_headers):
+        viewer = create_user("viewer@example.com", "Viewer")
+        create_user("alice@example.com", "Alice Johnson")
+        create_user("bob@example.com", "Bob Alison")
+        create_user("carol@example.com", "Carol Smith")
+        
+        response = client.get("/users/search?q=ali", headers=auth_headers(viewer.email))
+        
+        assert response.status_code == 200
+        assert [user["full_name"] for user in response.json()] == ["Alice Johnson", "Bob Alison"]
+    
+    def test_fuzzy_match_and_fresh_index(self, client, create_user, auth_headers):
+        viewer = create_user("viewer@example.com", "Viewer")
+        create_user("jonathan@example.com", "Jonathan Smith")
+        
+        response = client.get("/users/search?q=jonathon", headers=auth_headers(viewer.email))
+        assert [user["full_name"] for user in response.json()] == ["Jonathan Smith"]
+        
+        create_user("jonas@example.com", "Jonas Berg")
+        response = client.get("/users/search?q=jonas", headers=auth_headers(viewer.email))
+        assert response.json()[0]["full_name"] == "Jonas Berg"
+
+    def test_short_queries_match_prefixes_only(self, client, create_user, auth_headers):
+        viewer = create_user("viewer@example.com", "Viewer")
+        create_user("al@example.com", "Al Stone")
+        create_user("sal@example.com", "Sally Brown")
+        
+        response = client.get("/users/search?q=al", headers=auth_headers(viewer.email))
+        
+        assert [user["full_name"] for user in response.json()] == ["Al Stone"]
+    
+    def test_index_follows_edits_and_deletes(self, db):
+        from app.services.search import UserSearchIndex
+        from app.routers.users import users_version
+        
+        index = UserSearchIndex()
+        renamed = User(id="user-renamed", email="renamed@example.com", full_name="Jonathan Smith", is_active=True)
+        departed = User(id="user-departed", email="departed@example.com", full_name="Jonas Berg", is_active=True)
+        db.add_all([renamed, departed])
+        db.commit()
+        index.ensure_fresh(db, users_version(db))
+        
+        renamed.full_name = "Joanna Smith"
+        db.commit()
+        index.ensure_fresh(db, users_version(db))
+        assert [user["full_name"] for user in index.search("joa", 10)] == ["Joanna Smith"]
+        assert index.search("jonathan", 10) == []
+        
+        db.delete(departed)
+        db.commit()
+        index.ensure_fresh(db, users_version(db))
+        assert index.search("jonas", 10) == []
+
+class TestPoints:
+    def test_leaderboard(self, client, db, create_user, auth_headers):
+        first = create_user("first@example.com", "First")
+        second = create_user("second@example.com", "Second")
+        db.add_all([
+            PointsTransaction(user_id=first.id, amount=10, action="peer_review_submitted"),
+            PointsTransaction(user_id=first.id, amount=5, action="peer_review_received_like"),
+            PointsTransaction(user_id=second.id, amount=10, action="peer_review_submitted"),
+        ])
+        db.commit()
+        
+        response = client.get("/points/leaderboard", headers=auth_headers(first.email))
+        
+        assert response.status_code == 200
+        board = response.json()
+        assert [(e["rank"], e["user"]["id"], e["points"]) for e in board] == [
+            (1, first.id, 15),
+            (2, second.id, 10),
+        ]
+        
+        response = client.get(
+            "/points/leaderboard",
+            headers={**auth_headers(first.email), "If-None-Match": response.headers["etag"]}
+        )
+        assert response.status_code == 304
+    
+    def test_leaderboard_etag_changes_on_correction(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        first = PointsTransaction(user_id=user.id, amount=10, action="peer_review_submitted")
+        db.add(first)
+        db.commit()
+        db.add(PointsTransaction(user_id=user.id, amount=5, action="peer_review_received_like"))
+        db.commit()
+        headers = auth_headers(user.email)
+        etag = client.get("/points/leaderboard", headers=headers).headers["etag"]
+        
+        db.delete(first)
+        db.commit()
+        
+        response = client.get("/points/leaderboard", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()[0]["points"] == 5
+    
+    def test_user_points(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        db.add(PointsTransaction(user_id=user.id, amount=10, action="peer_review_submitted"))
+        db.commit()
+        
+        response = client.get(f"/points/{user.id}", headers=auth_headers(user.email))
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["user"]["id"] == user.id
+        assert body["total_points"] == 10
+        assert body["badges"] == []
+        assert [t["action"] for t in body["transactions"]] == ["peer_review_submitted"]
+    
+    def test_points_summary(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        db.add_all([
+            PointsTransaction(user_id=user.id, amount=10, action="peer_review_submitted"),
+            PointsTransaction(user_id=user.id, amount=10, action="peer_review_submitted"),
+            PointsTransaction(user_id=user.id, amount=5, action="peer_review_received_like"),
+        ])
+        db.commit()
+        
+        response = client.get(f"/points/{user.id}/summary", headers=auth_headers(user.email))
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total_points"] == 25
+        assert body["breakdown"] == [
+            {"action": "peer_review_received_like", "count": 1, "total": 5},
+            {"action": "peer_review_submitted", "count": 2, "total": 20},
+        ]
+        assert "transactions" not in body
+    
+    def test_paged_transactions(self, client, db, create_user, auth_headers):
+        user = create_user("employee@example.com", "Employee")
+        start = datetime(2024, 1, 1)
+        db.add_all([
+            PointsTransaction(user_id=user.id, amount=i, action="peer_review_submitted", created_at=start + timedelta(days=i))
+            for i in range(5)
+        ])
+        db.commit()
+        headers = auth_headers(user.email)
+        
+        amounts, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = client.get(f"/points/{user.id}/transactions", params=params, headers=headers).json()
+            amounts += [item["amount"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert amounts == [4, 3, 2, 1, 0]
+        
+        page = client.get(
+            f"/points/{user.id}/transactions",
+            params={"since": "2024-01-02T00:00:00", "until": "2024-01-04T00:00:00", "fields": "amount"},
+            headers=headers
+        ).json()
+        assert [set(item) for item in page["items"]] == [{"id", "created_at", "amount"}] * 2
+        assert [item["amount"] for item in page["items"]] == [2, 1]